@@ -0,0 +1,65 @@
+"""Coste de autenticación por petición.
+
+Compara la validación anterior (jwt.decode + comparaciones con datetime en cada
+petición) con ``utils.security.verify_token``, en frío (primera vez que se ve
+el token) y en caliente (claims ya verificados en caché).
+
+    python -m benchmarks.bench_auth --iterations 50000
+"""
+import argparse
+import json
+import time
+from datetime import datetime
+
+import jwt
+
+import benchmarks.common  # noqa: F401  (variables de entorno por defecto)
+import utils.security as security
+
+
+def legacy_validate(token: str) -> dict:
+    """Réplica del cuerpo de los validadores anteriores"""
+    payload = jwt.decode(token, security.SECRET_KEY, algorithms=["HS256"])
+    if payload.get("email") is None:
+        raise ValueError("Token Invalid")
+    if datetime.utcfromtimestamp(payload.get("exp")) < datetime.utcnow():
+        raise ValueError("Expired token")
+    if not payload.get("active"):
+        raise ValueError("Inactive user")
+    return payload
+
+
+def time_per_call(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main(args):
+    if not security.SECRET_KEY:
+        security.SECRET_KEY = "benchmark-secret-key-with-32-bytes!!"
+    token = security.create_jwt_token("Ana", "Pérez", "ana@example.com", True, True, "1")
+
+    def cold():
+        security._verified_tokens.clear()
+        security.verify_token(token)
+
+    results = {
+        "legacy_us": time_per_call(lambda: legacy_validate(token), args.iterations),
+        "verify_cold_us": time_per_call(cold, args.iterations),
+        "verify_cached_us": time_per_call(lambda: security.verify_token(token), args.iterations),
+    }
+    results = {name: round(value, 2) for name, value in results.items()}
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for name, value in results.items():
+        print(f"{name:<18} {value:>8} µs/request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--json", action="store_true")
+    main(parser.parse_args())
@@ -0,0 +1,116 @@
+"""Arranque en frío: desde lanzar el proceso hasta la primera respuesta correcta.
+
+Lanza ``--runs`` veces un proceso nuevo que sirve ``main.app`` (contra el
+sustituto en memoria de Mongo o un mongod local con ``--mongo-uri``) y mide,
+desde fuera, cuánto tarda en contestar 200 a ``GET /shirts?limit=1``. Desde
+dentro, la app publica lo mismo en ``/metrics`` (ver utils/startup.py):
+importación, cada fase del lifespan y ``app_cold_start_seconds``. Firebase se
+inicializa con las credenciales del entorno, como en producción (sin red).
+
+    python -m benchmarks.bench_cold_start --runs 5 --cache-warmup 500
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+import benchmarks.common  # noqa: F401  (variables de entorno por defecto)
+
+FIRST_REQUEST = "/shirts?limit=1"
+
+
+def serve(args):
+    """Proceso hijo: siembra el catálogo, importa la app y la sirve"""
+    import uvicorn
+
+    import utils.mongodb as mongodb
+    from benchmarks.catalog import seed_catalog
+
+    if args.mongo_uri:
+        from pymongo import AsyncMongoClient, MongoClient
+
+        mongodb._client = AsyncMongoClient(args.mongo_uri)
+        with MongoClient(args.mongo_uri) as client:
+            seed_catalog(client[mongodb.DB], args.teams, args.shirts, 1)
+    else:
+        from benchmarks.fake_mongo import FakeAsyncClient
+
+        mongodb._client = FakeAsyncClient(latency=args.latency_ms / 1000)
+        seed_catalog(mongodb._client.raw(mongodb.DB), args.teams, args.shirts, 1)
+
+    from main import app
+
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+def parse_metrics(text: str) -> dict:
+    metrics = {}
+    for line in text.splitlines():
+        if line.startswith(("app_startup", "app_cold_start")):
+            name, value = line.rsplit(" ", 1)
+            metrics[name] = float(value)
+    return metrics
+
+
+def run_once(args) -> dict:
+    command = [sys.executable, "-m", "benchmarks.bench_cold_start", "--serve", "--port", str(args.port),
+               "--teams", str(args.teams), "--shirts", str(args.shirts), "--latency-ms", str(args.latency_ms)]
+    if args.mongo_uri:
+        command += ["--mongo-uri", args.mongo_uri]
+    env = {**os.environ, "CACHE_WARMUP_DOCUMENTS": str(args.cache_warmup)}
+    start = time.perf_counter()
+    process = subprocess.Popen(command, env=env)
+    try:
+        deadline = start + 60
+        with httpx.Client(base_url=f"http://127.0.0.1:{args.port}") as http:
+            while True:
+                try:
+                    response = http.get(FIRST_REQUEST)
+                    if response.status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.perf_counter() > deadline or process.poll() is not None:
+                    raise RuntimeError("Server did not answer in time")
+                time.sleep(0.01)
+            elapsed = time.perf_counter() - start
+            metrics = parse_metrics(http.get("/metrics").text)
+    finally:
+        process.terminate()
+        process.wait()
+    return {"spawn_to_first_response_s": round(elapsed, 3), **{k: round(v, 3) for k, v in metrics.items()}}
+
+
+def main(args):
+    runs = [run_once(args) for _ in range(args.runs)]
+    keys = sorted({key for run in runs for key in run})
+    results = {key: round(statistics.median(run[key] for run in runs if key in run), 3) for key in keys}
+    if args.json:
+        print(json.dumps({"median": results, "runs": runs}, indent=2))
+        return
+    print(f"{args.runs} cold starts, {args.shirts} shirts, cache warm-up={args.cache_warmup} (median)")
+    for key, value in results.items():
+        print(f"  {key:<48} {value:>8} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--teams", type=int, default=50)
+    parser.add_argument("--shirts", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=1.0)
+    parser.add_argument("--cache-warmup", type=int, default=0, help="CACHE_WARMUP_DOCUMENTS de la app")
+    parser.add_argument("--mongo-uri", help="mongod local en vez del sustituto (se vacían sus colecciones)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+    if args.serve:
+        serve(args)
+    else:
+        main(args)
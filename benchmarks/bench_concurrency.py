@@ -0,0 +1,91 @@
+"""p50/p99 de las lecturas por id bajo N peticiones concurrentes.
+
+Compara la capa de datos bloqueante (pymongo síncrono dentro de ``async def``,
+simulado con ``blocking=True``) contra la capa asíncrona actual, usando el
+sustituto en memoria de ``benchmarks.fake_mongo`` con latencia fija por operación.
+La app corre en un proceso aparte; en una máquina de un solo núcleo cliente y
+servidor compiten por la CPU, así que compara modos entre sí, no cifras absolutas.
+
+    python -m benchmarks.bench_concurrency --concurrency 50 --latency-ms 5
+"""
+import argparse
+import asyncio
+import json
+
+import httpx
+from fastapi import FastAPI
+
+from benchmarks.common import ServerProcess, run_concurrent
+from benchmarks.fake_mongo import FakeAsyncClient
+import utils.mongodb as mongodb
+from routes.futbol_team_routes import router as futbol_team_router
+from routes.shirt_routes import router as shirt_router
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(futbol_team_router)
+    app.include_router(shirt_router)
+    return app
+
+
+def seed(client: FakeAsyncClient, teams: int, shirts: int) -> tuple[list[str], list[str]]:
+    db = client.raw(mongodb.DB)
+    team_ids = [
+        str(db.futbol_teams.insert_one({"name": f"Team {i}", "country": "España"}).inserted_id)
+        for i in range(teams)
+    ]
+    shirt_ids = [
+        str(db.shirts.insert_one({
+            "team_id": team_ids[i % teams],
+            "name": f"Camiseta {i}",
+            "description": "Camiseta oficial",
+            "image": "https://images.com/shirt.jpg",
+            "price": 50.0 + i % 40,
+            "discount": i % 30,
+            "size": "SMLX"[i % 3] if i % 4 else "XL",
+        }).inserted_id)
+        for i in range(shirts)
+    ]
+    return team_ids, shirt_ids
+
+
+async def run_mode(blocking: bool, args) -> dict:
+    mongodb._client = FakeAsyncClient(latency=args.latency_ms / 1000, blocking=blocking)
+    team_ids, shirt_ids = seed(mongodb._client, args.teams, args.shirts)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    with ServerProcess(build_app(), args.port) as server:
+        async with httpx.AsyncClient(base_url=server.base_url, limits=limits) as http:
+            async def request(i):
+                if i % 2:
+                    response = await http.get(f"/shirts/{shirt_ids[i % len(shirt_ids)]}")
+                else:
+                    response = await http.get(f"/futbol_teams/{team_ids[i % len(team_ids)]}")
+                response.raise_for_status()
+
+            return await run_concurrent(request, args.requests, args.concurrency)
+
+
+async def main(args):
+    results = {
+        "blocking (before)": await run_mode(True, args),
+        "async (after)": await run_mode(False, args),
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.requests} requests, concurrency={args.concurrency}, latency={args.latency_ms}ms")
+    for mode, stats in results.items():
+        print(f"{mode:<20} rps={stats['rps']:>8}  p50={stats['p50_ms']:>8}ms  p99={stats['p99_ms']:>8}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--teams", type=int, default=20)
+    parser.add_argument("--shirts", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--json", action="store_true")
+    asyncio.run(main(parser.parse_args()))
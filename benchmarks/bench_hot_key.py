@@ -0,0 +1,77 @@
+"""Lecturas de una misma camiseta a la vez (un lanzamiento), con y sin single-flight.
+
+Todas las peticiones piden el mismo ``GET /shirts/{id}`` (y una parte la misma
+página de ``GET /shirts``). Por defecto la caché de lecturas caduca al instante
+(``--cache-ttl 0``), como si cada oleada llegara justo tras expirar la entrada:
+sin coalescencia cada petición hace su find_one; con ella, las concurrentes
+comparten uno. Las lecturas a Mongo se cuentan con ``singleflight_calls`` de
+``/metrics``.
+
+    python -m benchmarks.bench_hot_key --requests 2000 --concurrency 100 --latency-ms 5
+"""
+import argparse
+import asyncio
+import json
+import logging
+
+import httpx
+
+from benchmarks.common import ServerProcess, run_concurrent
+from benchmarks.catalog import seed_catalog
+from benchmarks.fake_mongo import FakeAsyncClient
+import utils.mongodb as mongodb
+import utils.singleflight as singleflight
+from utils.cache import LRUTTLCache, set_cache_backend
+from main import app
+
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def scrape(text: str, metric: str) -> float:
+    return sum(float(line.rsplit(" ", 1)[1]) for line in text.splitlines() if line.startswith(metric + "{"))
+
+
+async def run_mode(enabled: bool, args) -> dict:
+    singleflight.SINGLEFLIGHT_ENABLED = enabled
+    set_cache_backend(lambda: LRUTTLCache(ttl=args.cache_ttl))
+    mongodb._client = FakeAsyncClient(latency=args.latency_ms / 1000)
+    catalog = seed_catalog(mongodb._client.raw(mongodb.DB), 5, 50, 1)
+    shirt_id = catalog["shirts"][0]
+    limits = httpx.Limits(max_connections=args.concurrency)
+    with ServerProcess(app, args.port) as server:
+        async with httpx.AsyncClient(base_url=server.base_url, limits=limits, timeout=60) as http:
+            async def request(i):
+                response = await http.get("/shirts?limit=20" if i % 10 == 0 else f"/shirts/{shirt_id}")
+                response.raise_for_status()
+
+            stats = await run_concurrent(request, args.requests, args.concurrency)
+            metrics = (await http.get("/metrics")).text
+    stats["db_reads"] = int(scrape(metrics, "singleflight_calls")) if enabled else args.requests
+    stats["coalesced"] = int(scrape(metrics, "singleflight_coalesced"))
+    return stats
+
+
+async def main(args):
+    results = {
+        "without single-flight": await run_mode(False, args),
+        "with single-flight": await run_mode(True, args),
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.requests} requests to one key, concurrency={args.concurrency}, "
+          f"latency={args.latency_ms}ms, cache_ttl={args.cache_ttl}s")
+    for mode, stats in results.items():
+        print(f"{mode:<22} rps={stats['rps']:>8}  p50={stats['p50_ms']:>8}ms  p99={stats['p99_ms']:>8}ms  "
+              f"db_reads={stats['db_reads']:>6}  coalesced={stats['coalesced']:>6}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--cache-ttl", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--json", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,115 @@
+"""Coste por documento de construir los modelos a partir de lo leído de Mongo.
+
+- ``validated``: el camino anterior, ``Shirt(id=str(doc["_id"]), **doc)``.
+- ``strict``: ``from_document`` con ``MODEL_HYDRATION_STRICT=true`` (validación completa).
+- ``trusted``: ``from_document`` por defecto (validador compilado en contexto ``TRUSTED``).
+- ``construct``: ``model_construct`` sin validar, como referencia: con pydantic 2 es más
+  lento que el validador compilado, por eso ``from_document`` no lo usa.
+- ``unvalidated``: sin validar y sin ``model_construct``, rellenando ``__dict__`` a mano;
+  el límite de lo que se puede ahorrar desde Python. Tampoco mejora a ``trusted``.
+
+Los documentos salen de ``benchmarks.catalog``, con ``_id`` como los devuelve Mongo.
+
+    python -m benchmarks.bench_hydration --sizes 10000 100000
+"""
+import argparse
+import json
+import random
+import time
+
+from bson import ObjectId
+
+import benchmarks.common  # noqa: F401  (variables de entorno por defecto)
+import models.document as document
+from benchmarks.catalog import generate_shirts, generate_teams
+from models.futbol_team import FutbolTeam
+from models.shirt import Shirt
+
+
+def make_documents(n: int) -> tuple[list[dict], list[dict]]:
+    rng = random.Random(0)
+    teams = generate_teams(max(1, n // 100), rng)
+    for team in teams:
+        team["_id"] = ObjectId()
+    shirts = generate_shirts(n, teams, rng)
+    for shirt in shirts:
+        shirt["_id"] = ObjectId()
+    return teams, shirts
+
+
+def best_of(fn, docs: list[dict], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for doc in docs:
+            fn(doc)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def hydrators(model):
+    def strict(doc):
+        document.MODEL_HYDRATION_STRICT = True
+        try:
+            return model.from_document(doc)
+        finally:
+            document.MODEL_HYDRATION_STRICT = False
+
+    if model is FutbolTeam:
+        validated = lambda doc: FutbolTeam(id=str(doc["_id"]), name=doc["name"], country=doc["country"])  # noqa: E731
+    else:
+        validated = lambda doc: model(id=str(doc["_id"]), **doc)  # noqa: E731
+    fields = tuple(model.model_fields)
+
+    def construct(doc):
+        return model.model_construct(**{name: doc[name] for name in fields if name in doc}, id=str(doc["_id"]))
+
+    defaults = {name: field.default for name, field in model.model_fields.items() if not field.is_required()}
+
+    def unvalidated(doc):
+        item = model.__new__(model)
+        values = {name: doc.get(name, defaults.get(name)) for name in fields}
+        values["id"] = str(doc["_id"])
+        object.__setattr__(item, "__dict__", values)
+        object.__setattr__(item, "__pydantic_fields_set__", set(fields))
+        object.__setattr__(item, "__pydantic_extra__", None)
+        object.__setattr__(item, "__pydantic_private__", None)
+        return item
+
+    return {"validated": validated, "strict": strict, "trusted": model.from_document, "construct": construct,
+            "unvalidated": unvalidated}
+
+
+def run(n: int, repeat: int) -> dict:
+    teams, shirts = make_documents(n)
+    results = {}
+    for model, docs in ((Shirt, shirts), (FutbolTeam, teams)):
+        for mode, fn in hydrators(model).items():
+            seconds = best_of(fn, docs, repeat)
+            results[f"{model.__name__}.{mode}"] = {
+                "documents": len(docs),
+                "total_ms": round(seconds * 1000, 2),
+                "per_document_us": round(seconds / len(docs) * 1e6, 3),
+            }
+    return results
+
+
+def main(args):
+    results = {n: run(n, args.repeat) for n in args.sizes}
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for n, stats in results.items():
+        print(f"{n} shirts")
+        for name, entry in stats.items():
+            speedup = stats[name.split(".")[0] + ".validated"]["total_ms"] / entry["total_ms"]
+            print(f"  {name:<22} {entry['documents']:>7} docs  {entry['total_ms']:>9} ms  "
+                  f"{entry['per_document_us']:>7} us/doc  x{speedup:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true")
+    main(parser.parse_args())
@@ -0,0 +1,94 @@
+"""Latencia de ``GET /shirts`` con el logging apagado, encendido y muestreado.
+
+El modo "legacy" reproduce lo que hacían antes los listados: handler síncrono y
+un ``logger.info(f"Shirts data: {...}")`` con la página entera en cada petición.
+
+    python -m benchmarks.bench_logging --shirts 1000 --limit 1000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+
+import httpx
+
+from benchmarks.common import summarize
+from benchmarks.fake_mongo import FakeAsyncClient
+from benchmarks.bench_concurrency import seed
+import utils.mongodb as mongodb
+from utils.logging_config import setup_logging, stop_logging
+import controllers.shirt_controller as shirt_controller
+from main import app
+
+
+def configure(mode: str, devnull):
+    stop_logging()
+    if mode == "legacy":
+        root = logging.getLogger()
+        root.handlers = [logging.StreamHandler(devnull)]
+        root.setLevel(logging.INFO)
+    elif mode == "off":
+        setup_logging(level="WARNING", stream=devnull)
+    elif mode == "on":
+        setup_logging(level="INFO", stream=devnull, sample_rates="")
+    elif mode == "sampled":
+        setup_logging(level="INFO", stream=devnull, sample_rates="controllers=0.1")
+
+
+async def run_mode(mode: str, args, devnull) -> dict:
+    configure(mode, devnull)
+    list_shirts = shirt_controller.list_shirts
+
+    async def legacy_list_shirts(*a, **kw):
+        page = await list_shirts(*a, **kw)
+        shirt_controller.logger.info(f"Shirts data: {page['items']}")
+        return page
+
+    if mode == "legacy":
+        shirt_controller.list_shirts = legacy_list_shirts
+    # La ruta importó la función por nombre; se parchea también ahí
+    import routes.shirt_routes as shirt_routes
+    shirt_routes.list_shirts = shirt_controller.list_shirts
+
+    samples = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            t0 = time.perf_counter()
+            response = await http.get("/shirts", params={"limit": args.limit})
+            response.raise_for_status()
+            samples.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - start
+
+    shirt_controller.list_shirts = list_shirts
+    shirt_routes.list_shirts = list_shirts
+    return summarize(samples, elapsed)
+
+
+async def main(args):
+    mongodb._client = FakeAsyncClient()
+    seed(mongodb._client, 20, args.shirts)
+    # Solo interesa el logging de la app, no el del cliente de carga
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    with open(os.devnull, "w") as devnull:
+        results = {mode: await run_mode(mode, args, devnull) for mode in ("legacy", "off", "on", "sampled")}
+        stop_logging()
+    setup_logging()
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"GET /shirts?limit={args.limit}, {args.requests} sequential requests")
+    for mode, stats in results.items():
+        print(f"{mode:<8} p50={stats['p50_ms']:>8}ms  p99={stats['p99_ms']:>8}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--shirts", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--json", action="store_true")
+    asyncio.run(main(parser.parse_args()))
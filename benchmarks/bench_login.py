@@ -0,0 +1,78 @@
+"""Rendimiento de ``POST /login`` contra un Firebase local simulado.
+
+Compara la llamada bloqueante anterior (``requests.post`` sin pool dentro del
+event loop) con el cliente ``httpx`` compartido de ``utils.http_client``.
+
+    python -m benchmarks.bench_login --requests 300 --concurrency 20 --firebase-latency-ms 20
+"""
+import argparse
+import asyncio
+import json
+import os
+
+import httpx
+
+from benchmarks.common import ServerProcess, run_concurrent
+
+FIREBASE_PORT = 8766
+os.environ["FIREBASE_AUTH_URL"] = f"http://127.0.0.1:{FIREBASE_PORT}"
+
+from benchmarks import fake_firebase  # noqa: E402
+from benchmarks.fake_mongo import FakeAsyncClient  # noqa: E402
+import utils.mongodb as mongodb  # noqa: E402
+import controllers.user_controller as user_controller  # noqa: E402
+from main import app  # noqa: E402
+
+original_post_json = user_controller.post_json
+
+
+async def legacy_post_json(url, payload, params=None):
+    """Comportamiento anterior: conexión nueva, sin timeout y bloqueando el event loop"""
+    import requests
+
+    return requests.post(url, json=payload, params=params)
+
+
+async def run_mode(legacy: bool, args) -> dict:
+    mongodb._client = FakeAsyncClient()
+    mongodb._client.raw(mongodb.DB).users.insert_many([
+        {"name": "Bench", "lastname": "User", "email": f"user{i}@example.com", "active": True, "admin": False}
+        for i in range(args.users)
+    ])
+    user_controller.post_json = legacy_post_json if legacy else original_post_json
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    with ServerProcess(app, args.port) as server:
+        async with httpx.AsyncClient(base_url=server.base_url, limits=limits, timeout=60) as http:
+            async def request(i):
+                body = {"email": f"user{i % args.users}@example.com", "password": fake_firebase.PASSWORD}
+                response = await http.post("/login", json=body)
+                response.raise_for_status()
+
+            return await run_concurrent(request, args.requests, args.concurrency)
+
+
+async def main(args):
+    firebase = fake_firebase.build_app(args.firebase_latency_ms / 1000)
+    with ServerProcess(firebase, FIREBASE_PORT):
+        results = {
+            "requests.post (before)": await run_mode(True, args),
+            "pooled httpx (after)": await run_mode(False, args),
+        }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.requests} logins, concurrency={args.concurrency}, firebase latency={args.firebase_latency_ms}ms")
+    for mode, stats in results.items():
+        print(f"{mode:<24} rps={stats['rps']:>8}  p50={stats['p50_ms']:>8}ms  p99={stats['p99_ms']:>8}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--firebase-latency-ms", type=float, default=20.0)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--json", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,97 @@
+"""Coste de serializar ``list[Shirt]`` y de comprimir el resultado.
+
+Serialización (lo que hace cada camino de FastAPI con la lista de un listado):
+
+- ``jsonable_encoder``: el camino anterior (JSONResponse): dicts intermedios + json.dumps.
+- ``pydantic``: TypeAdapter(list[Shirt]).dump_json, lo que FastAPI hace hoy con response_model.
+- ``orjson``: FastJSONResponse con los documentos ya en dict (proyecciones y streaming).
+
+Compresión: gzip y brotli (si está instalado) con los niveles de utils/compression.py.
+
+    python -m benchmarks.bench_serialization --sizes 1000 10000 100000
+"""
+import argparse
+import gzip
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+import benchmarks.common  # noqa: F401  (variables de entorno por defecto)
+from models.shirt import Shirt
+from utils.compression import COMPRESSION_BROTLI_QUALITY, COMPRESSION_GZIP_LEVEL, brotli
+from utils.responses import dumps
+
+SHIRT_LIST = TypeAdapter(list[Shirt])
+
+
+def make_shirts(n: int) -> list[Shirt]:
+    return [
+        Shirt(
+            id=f"{i:024x}",
+            team_id=f"{i % 50:024x}",
+            name=f"Camiseta local {2000 + i % 26}",
+            description="Camiseta oficial del Atlético de Madrid, edición aniversario",
+            image="https://images.com/shirt.jpg",
+            price=50.0 + i % 40,
+            discount=i % 30,
+            size=("S", "M", "L", "XL")[i % 4],
+        )
+        for i in range(n)
+    ]
+
+
+def best_of(fn, repeat: int) -> tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def run(n: int, repeat: int) -> dict:
+    shirts = make_shirts(n)
+    docs = [shirt.model_dump() for shirt in shirts]
+    serializers = {
+        "jsonable_encoder": lambda: json.dumps(jsonable_encoder(shirts), ensure_ascii=False).encode(),
+        "pydantic": lambda: SHIRT_LIST.dump_json(shirts),
+        "orjson": lambda: dumps(docs),
+    }
+    results = {}
+    body = b""
+    for name, fn in serializers.items():
+        ms, body = best_of(fn, repeat)
+        results[f"{name}_ms"] = round(ms, 2)
+
+    results["bytes"] = len(body)
+    compressors = {"gzip": lambda: gzip.compress(body, COMPRESSION_GZIP_LEVEL)}
+    if brotli is not None:
+        compressors["br"] = lambda: brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY)
+    for name, fn in compressors.items():
+        ms, compressed = best_of(fn, repeat)
+        results[f"{name}_ms"] = round(ms, 2)
+        results[f"{name}_bytes"] = len(compressed)
+    return results
+
+
+def main(args):
+    results = {n: run(n, args.repeat) for n in args.sizes}
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for n, stats in results.items():
+        print(f"list[Shirt] x {n}  ({stats['bytes'] / 1024:.0f} KiB)")
+        for key in ("jsonable_encoder", "pydantic", "orjson", "gzip", "br"):
+            if f"{key}_ms" in stats:
+                size = f"  -> {stats[f'{key}_bytes'] / 1024:.0f} KiB" if f"{key}_bytes" in stats else ""
+                print(f"  {key:<17} {stats[f'{key}_ms']:>9} ms{size}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true")
+    main(parser.parse_args())
@@ -0,0 +1,90 @@
+"""GET /shirts y /futbol_teams sin filtros, con y sin el catálogo serializado en memoria.
+
+Sin ``CATALOG_SNAPSHOT`` cada petición consulta el sustituto de Mongo, construye
+los modelos y serializa; con él la página se une a partir de bytes ya
+codificados (y la primera página por defecto sale ya comprimida). Además mide,
+en este proceso, cuánto tarda la carga completa y la reconstrucción tras
+cambiar un documento.
+
+    python -m benchmarks.bench_snapshot --shirts 5000 --requests 1000 --concurrency 50
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+
+import httpx
+
+from benchmarks.common import ServerProcess, run_concurrent
+from benchmarks.catalog import seed_catalog
+from benchmarks.fake_mongo import FakeAsyncClient
+import main
+import utils.mongodb as mongodb
+from controllers.shirt_controller import shirt_snapshot
+from utils.conditional import versions
+
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+PATHS = ["/shirts", "/shirts?limit=1000", "/futbol_teams"]
+
+
+async def run_mode(enabled: bool, args) -> dict:
+    main.CATALOG_SNAPSHOT = enabled
+    mongodb._client = FakeAsyncClient(latency=args.latency_ms / 1000)
+    seed_catalog(mongodb._client.raw(mongodb.DB), args.teams, args.shirts, 1)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    results = {}
+    with ServerProcess(main.app, args.port) as server:
+        headers = {"Accept-Encoding": "br, gzip"}
+        async with httpx.AsyncClient(base_url=server.base_url, limits=limits, headers=headers, timeout=60) as http:
+            for path in PATHS:
+                async def request(i):
+                    response = await http.get(path)
+                    response.raise_for_status()
+
+                results[path] = await run_concurrent(request, args.requests, args.concurrency)
+    return results
+
+
+async def rebuild_times(args) -> dict:
+    mongodb._client = FakeAsyncClient()
+    catalog = seed_catalog(mongodb._client.raw(mongodb.DB), args.teams, args.shirts, 1)
+    start = time.perf_counter()
+    await shirt_snapshot.load()
+    loaded = time.perf_counter() - start
+    start = time.perf_counter()
+    versions.bump("shirts", catalog["shirts"][0])
+    await shirt_snapshot._task
+    rebuilt = time.perf_counter() - start
+    await shirt_snapshot.stop()
+    return {"full_load_ms": round(loaded * 1000, 2), "one_document_ms": round(rebuilt * 1000, 2)}
+
+
+async def main_(args):
+    results = {
+        "mongo": await run_mode(False, args),
+        "snapshot": await run_mode(True, args),
+    }
+    rebuild = await rebuild_times(args)
+    if args.json:
+        print(json.dumps({**results, "rebuild": rebuild}, indent=2))
+        return
+    print(f"{args.requests} requests per path, concurrency={args.concurrency}, "
+          f"{args.shirts} shirts, latency={args.latency_ms}ms")
+    for mode, paths in results.items():
+        for path, stats in paths.items():
+            print(f"{mode:<9} {path:<20} rps={stats['rps']:>8}  p50={stats['p50_ms']:>8}ms  p99={stats['p99_ms']:>8}ms")
+    print(f"snapshot full load {rebuild['full_load_ms']}ms, rebuild after one write {rebuild['one_document_ms']}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=1.0)
+    parser.add_argument("--teams", type=int, default=50)
+    parser.add_argument("--shirts", type=int, default=5000)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--json", action="store_true")
+    asyncio.run(main_(parser.parse_args()))
@@ -0,0 +1,372 @@
+"""Carga sobre todas las rutas de la app, con línea base y umbrales de regresión.
+
+Levanta ``main.app`` en un proceso aparte contra el sustituto en memoria de Mongo
+(o un mongod local con ``--mongo-uri``) y un Firebase simulado, siembra un
+catálogo sintético (``benchmarks.catalog``) y lanza ``--requests`` peticiones
+concurrentes por escenario. Cada ruta de ``routes/`` y de ``main.py`` tiene al
+menos un escenario; si se añade una ruta sin escenario el benchmark falla.
+
+    python -m benchmarks.bench_suite --update-baseline        # graba benchmarks/baseline.json
+    python -m benchmarks.bench_suite                          # compara; sale con 1 si hay regresión
+
+Un escenario regresa si su RPS cae más de ``--max-rps-drop`` o su p99 sube más
+de ``--max-p99-increase`` (más ``--p99-slack-ms``, para que las latencias de
+pocos milisegundos no fallen por ruido) respecto a la línea base, o si alguna
+respuesta no tiene el código esperado. La línea base solo es comparable en la
+misma máquina y con la misma configuración; se graba con cada cambio de entorno.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Callable, Optional
+
+import httpx
+
+from benchmarks.common import ServerProcess, run_concurrent
+
+FIREBASE_PORT = 8766
+# Ambas variables se leen al importar la app / al crear el cliente de firebase_admin
+os.environ["FIREBASE_AUTH_URL"] = f"http://127.0.0.1:{FIREBASE_PORT}"
+os.environ["FIREBASE_AUTH_EMULATOR_HOST"] = f"127.0.0.1:{FIREBASE_PORT}"
+# La resincronización periódica del índice de búsqueda no debe caer en mitad de una medida
+os.environ.setdefault("SEARCH_INDEX_RESYNC_SECONDS", "0")
+
+import firebase_admin  # noqa: E402
+
+# Con una app ya inicializada user_controller no busca credenciales reales;
+# con el emulador configurado firebase_admin no las necesita
+if not firebase_admin._apps:
+    firebase_admin.initialize_app(options={"projectId": "benchmark"})
+
+from fastapi.routing import APIRoute  # noqa: E402
+
+from benchmarks import fake_firebase  # noqa: E402
+from benchmarks.catalog import seed_catalog  # noqa: E402
+from benchmarks.fake_mongo import FakeAsyncClient  # noqa: E402
+import utils.mongodb as mongodb  # noqa: E402
+import utils.security as security  # noqa: E402
+from main import app  # noqa: E402
+
+# Una línea de log por petición del generador de carga taparía los resultados
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+BULK_SIZE = 20
+
+
+class Scenario:
+    """Una forma de llamar a una ruta: ``build(i)`` devuelve los argumentos de la petición i"""
+
+    def __init__(self, name: str, route: str, build: Callable[[int], dict], expect: tuple = (200,),
+                 prepare: Optional[Callable] = None, collect: Optional[Callable] = None):
+        self.name = name
+        self.route = route
+        self.method = route.split()[0]
+        self.build = build
+        self.expect = expect
+        self.prepare = prepare      # async (http) -> None, antes de medir
+        self.collect = collect      # (i, response) -> None, tras cada respuesta esperada
+
+
+def shirt_body(team_id: str, i: int) -> dict:
+    return {
+        "team_id": team_id,
+        "name": f"Camiseta benchmark {i % 50}",
+        "description": "Camiseta creada por el benchmark",
+        "image": "https://images.com/benchmark.jpg",
+        "price": 49.9 + i % 30,
+        "discount": i % 4 * 10,
+        "size": "SMLX"[i % 3] if i % 4 else "XL",
+    }
+
+
+def build_scenarios(catalog: dict, args) -> list[Scenario]:
+    teams, shirts, users = catalog["futbol_teams"], catalog["shirts"], catalog["users"]
+    admin = users[0]
+    user_token = security.create_jwt_token("Bench", "User", users[-1], True, False, "user")
+    admin_token = security.create_jwt_token("Bench", "Admin", admin, True, True, "admin")
+    auth = {"Authorization": f"Bearer {user_token}"}
+    admin_auth = {"Authorization": f"Bearer {admin_token}"}
+    # Lo que unos escenarios crean o descubren y otros consumen
+    state = {"shirts_created": [], "teams_created": [], "etags": {}, "cursors": {}}
+
+    def team(i):
+        return teams[i % len(teams)]
+
+    def shirt(i):
+        return shirts[i % len(shirts)]
+
+    def get(url, **kwargs):
+        return lambda i: {"method": "GET", "url": url(i) if callable(url) else url, **kwargs}
+
+    # Los 304 necesitan el ETag vigente, que solo se conoce tras una petición previa
+    def remember_etag(key, url):
+        async def prepare(http):
+            response = await http.get(url)
+            state["etags"][key] = response.headers["etag"]
+        return prepare
+
+    def remember_cursor(key, url):
+        async def prepare(http):
+            response = await http.get(url)
+            state["cursors"][key] = response.headers.get("x-next-cursor", "")
+        return prepare
+
+    def created(key):
+        return lambda i, response: state[key].append(response.json()["id"])
+
+    def ids_param(pick, n=20):
+        return lambda i: ",".join(pick(i + k) for k in range(n))
+
+    scenarios = [
+        # --- main.py -----------------------------------------------------------
+        Scenario("root", "GET /", get("/")),
+        Scenario("health", "GET /health", get("/health")),
+        Scenario("ready", "GET /ready", get("/ready")),
+        Scenario("metrics", "GET /metrics", get("/metrics")),
+        Scenario("example_user", "GET /exampleuser", get("/exampleuser", headers=auth)),
+        Scenario("example_admin", "GET /exampleadmin", get("/exampleadmin", headers=admin_auth)),
+        Scenario("cache_stats", "GET /cache/stats", get("/cache/stats", headers=admin_auth)),
+        Scenario("indexes_explain", "GET /admin/indexes/explain", get("/admin/indexes/explain", headers=admin_auth)),
+        Scenario("login", "POST /login", lambda i: {
+            "method": "POST", "url": "/login",
+            "json": {"email": users[i % len(users)], "password": fake_firebase.PASSWORD},
+        }),
+        Scenario("create_user", "POST /users", lambda i: {
+            "method": "POST", "url": "/users",
+            "json": {"name": "Carga", "lastname": "Sintética", "email": f"load{i}@bench.example.com",
+                     "password": fake_firebase.PASSWORD},
+        }),
+
+        # --- Lecturas de camisetas ---------------------------------------------
+        Scenario("shirts.list", "GET /shirts", get("/shirts")),
+        Scenario("shirts.list.next_page", "GET /shirts",
+                 get(lambda i: f"/shirts?after={state['cursors']['shirts']}"),
+                 prepare=remember_cursor("shirts", "/shirts")),
+        Scenario("shirts.list.filtered", "GET /shirts", get(
+            lambda i: f"/shirts?team_id={team(i)}&size=M&min_price=40&max_price=90&sort=price&order=desc")),
+        Scenario("shirts.list.effective_price", "GET /shirts", get(
+            lambda i: f"/shirts?team_id={team(i)}&max_effective_price=50&sort=effective_price")),
+        Scenario("shirts.list.fields", "GET /shirts", get("/shirts?fields=name,price&limit=100")),
+        Scenario("shirts.list.ids", "GET /shirts", get(lambda i: f"/shirts?ids={ids_param(shirt)(i)}")),
+        Scenario("shirts.list.stream", "GET /shirts", get("/shirts?stream=true")),
+        Scenario("shirts.list.not_modified", "GET /shirts",
+                 lambda i: {"method": "GET", "url": "/shirts", "headers": {"If-None-Match": state["etags"]["shirts"]}},
+                 expect=(304,),
+                 prepare=remember_etag("shirts", "/shirts")),
+        Scenario("shirts.get", "GET /shirts/{shirt_id}", get(lambda i: f"/shirts/{shirt(i)}")),
+        Scenario("shirts.search", "GET /shirts/search",
+                 get(lambda i: f"/shirts/search?q={('local 2024', 'retro', 'atletico madrid', 'visitante')[i % 4]}")),
+        Scenario("shirts.autocomplete", "GET /shirts/autocomplete",
+                 get(lambda i: f"/shirts/autocomplete?q={('c', 'camiseta lo', 'real', 'ret')[i % 4]}")),
+        Scenario("shirts.batch", "POST /shirts/batch", lambda i: {
+            "method": "POST", "url": "/shirts/batch", "json": {"ids": [shirt(i + k) for k in range(50)]},
+        }),
+
+        # --- Lecturas de equipos -----------------------------------------------
+        Scenario("teams.list", "GET /futbol_teams", get("/futbol_teams")),
+        Scenario("teams.list.shirt_counts", "GET /futbol_teams", get("/futbol_teams?include=shirt_counts")),
+        Scenario("teams.list.ids", "GET /futbol_teams", get(lambda i: f"/futbol_teams?ids={ids_param(team, 10)(i)}")),
+        Scenario("teams.list.stream", "GET /futbol_teams", get("/futbol_teams?stream=true")),
+        Scenario("teams.get", "GET /futbol_teams/{team_id}", get(lambda i: f"/futbol_teams/{team(i)}")),
+        Scenario("teams.get.not_modified", "GET /futbol_teams/{team_id}",
+                 lambda i: {"method": "GET", "url": f"/futbol_teams/{teams[0]}",
+                            "headers": {"If-None-Match": state["etags"]["team"]}},
+                 expect=(304,), prepare=remember_etag("team", f"/futbol_teams/{teams[0]}")),
+        Scenario("teams.shirts", "GET /futbol_teams/{team_id}/shirts",
+                 get(lambda i: f"/futbol_teams/{team(i)}/shirts")),
+        Scenario("teams.batch", "POST /futbol_teams/batch", lambda i: {
+            "method": "POST", "url": "/futbol_teams/batch", "json": {"ids": [team(i + k) for k in range(20)]},
+        }),
+
+        # --- Escrituras (después de las lecturas, que no deben verlas a medias) --
+        Scenario("shirts.create", "POST /shirts", lambda i: {
+            "method": "POST", "url": "/shirts", "json": shirt_body(team(i), i), "headers": auth,
+        }, collect=created("shirts_created")),
+        Scenario("shirts.bulk_create", "POST /shirts/bulk", lambda i: {
+            "method": "POST", "url": "/shirts/bulk", "headers": auth,
+            "json": [shirt_body(team(i + k), i + k) for k in range(BULK_SIZE)],
+        }),
+        Scenario("shirts.bulk_upsert", "PUT /shirts/bulk", lambda i: {
+            "method": "PUT", "url": "/shirts/bulk", "headers": auth,
+            "json": [{**shirt_body(team(i + k), i + k), "id": shirt(i * BULK_SIZE + k)} for k in range(BULK_SIZE)],
+        }),
+        Scenario("shirts.update", "PUT /shirts/{shirt_id}", lambda i: {
+            "method": "PUT", "url": f"/shirts/{shirt(i)}", "json": shirt_body(team(i), i), "headers": auth,
+        }),
+        Scenario("shirts.patch", "PATCH /shirts/{shirt_id}", lambda i: {
+            "method": "PATCH", "url": f"/shirts/{shirt(i)}", "json": {"price": 45.0 + i % 40}, "headers": auth,
+        }),
+        Scenario("shirts.delete", "DELETE /shirts/{shirt_id}", lambda i: {
+            "method": "DELETE", "url": f"/shirts/{state['shirts_created'][i]}", "headers": auth,
+        }),
+        Scenario("teams.create", "POST /futbol_teams", lambda i: {
+            "method": "POST", "url": "/futbol_teams", "headers": auth,
+            "json": {"name": f"Benchmark FC {i}", "country": "España"},
+        }, collect=created("teams_created")),
+        Scenario("teams.bulk_create", "POST /futbol_teams/bulk", lambda i: {
+            "method": "POST", "url": "/futbol_teams/bulk", "headers": auth,
+            "json": [{"name": f"Benchmark Bulk {i}-{k}", "country": "Italia"} for k in range(BULK_SIZE)],
+        }),
+        Scenario("teams.bulk_upsert", "PUT /futbol_teams/bulk", lambda i: {
+            "method": "PUT", "url": "/futbol_teams/bulk", "headers": auth,
+            "json": [{"id": team(i + k), "name": f"Equipo {i + k}", "country": "España"} for k in range(BULK_SIZE)],
+        }),
+        Scenario("teams.update", "PUT /futbol_teams/{team_id}", lambda i: {
+            "method": "PUT", "url": f"/futbol_teams/{team(i)}", "headers": auth,
+            "json": {"name": f"Equipo {i}", "country": "España"},
+        }),
+        Scenario("teams.patch", "PATCH /futbol_teams/{team_id}", lambda i: {
+            "method": "PATCH", "url": f"/futbol_teams/{team(i)}", "json": {"country": "Portugal"}, "headers": auth,
+        }),
+        Scenario("teams.delete", "DELETE /futbol_teams/{team_id}", lambda i: {
+            "method": "DELETE", "url": f"/futbol_teams/{state['teams_created'][i]}", "headers": auth,
+        }),
+    ]
+
+    return scenarios
+
+
+def uncovered_routes(scenarios: list[Scenario]) -> list[str]:
+    """Rutas de la app (método y plantilla) sin ningún escenario"""
+    covered = {scenario.route for scenario in scenarios}
+    routes = {
+        f"{method} {route.path}"
+        for route in app.routes if isinstance(route, APIRoute)
+        for method in route.methods if method != "HEAD"
+    }
+    return sorted(routes - covered)
+
+
+async def run_scenario(http: httpx.AsyncClient, scenario: Scenario, args) -> dict:
+    if scenario.prepare:
+        await scenario.prepare(http)
+    errors = []
+
+    async def request(i):
+        response = await http.request(**scenario.build(i))
+        if response.status_code not in scenario.expect:
+            errors.append(f"{response.status_code} {response.text[:200]}")
+        elif scenario.collect:
+            scenario.collect(i, response)
+
+    stats = await run_concurrent(request, args.requests, args.concurrency)
+    stats = {"route": scenario.route, **stats, "errors": len(errors)}
+    if errors:
+        stats["first_error"] = errors[0]
+    return stats
+
+
+def seed(args) -> dict:
+    if args.mongo_uri:
+        from pymongo import AsyncMongoClient, MongoClient
+
+        mongodb._client = AsyncMongoClient(args.mongo_uri)
+        with MongoClient(args.mongo_uri) as client:
+            return seed_catalog(client[mongodb.DB], args.teams, args.shirts, args.users, args.seed)
+    mongodb._client = FakeAsyncClient(latency=args.latency_ms / 1000)
+    return seed_catalog(mongodb._client.raw(mongodb.DB), args.teams, args.shirts, args.users, args.seed)
+
+
+def config(args) -> dict:
+    """Parámetros que deben coincidir para que dos ejecuciones sean comparables"""
+    keys = ("teams", "shirts", "users", "seed", "requests", "concurrency", "latency_ms", "firebase_latency_ms")
+    return {
+        **{key: getattr(args, key) for key in keys},
+        "mongo": "mongod" if args.mongo_uri else "fake",
+    }
+
+
+def compare(results: dict, baseline: dict, args) -> list[str]:
+    """Regresiones de ``results`` respecto a ``baseline`` (vacía si no hay ninguna)"""
+    failures = []
+    for name, stats in results["scenarios"].items():
+        if stats["errors"]:
+            failures.append(f"{name}: {stats['errors']} unexpected responses ({stats.get('first_error')})")
+        base = baseline["scenarios"].get(name)
+        if base is None:
+            continue
+        min_rps = base["rps"] * (1 - args.max_rps_drop)
+        if stats["rps"] < min_rps:
+            failures.append(f"{name}: rps {stats['rps']} < {min_rps:.1f} (baseline {base['rps']})")
+        max_p99 = base["p99_ms"] * (1 + args.max_p99_increase) + args.p99_slack_ms
+        if stats["p99_ms"] > max_p99:
+            failures.append(f"{name}: p99 {stats['p99_ms']}ms > {max_p99:.2f}ms (baseline {base['p99_ms']}ms)")
+    return failures
+
+
+async def run(args) -> dict:
+    catalog = seed(args)
+    if not security.SECRET_KEY:
+        security.SECRET_KEY = "benchmark-secret-key-with-32-bytes!!"
+    scenarios = build_scenarios(catalog, args)
+    missing = uncovered_routes(scenarios)
+    if missing:
+        raise SystemExit(f"Routes without a benchmark scenario: {', '.join(missing)}")
+    if args.only:
+        scenarios = [s for s in scenarios if any(s.name.startswith(prefix) for prefix in args.only)]
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    firebase = fake_firebase.build_app(args.firebase_latency_ms / 1000)
+    results = {"config": config(args), "scenarios": {}}
+    with ServerProcess(firebase, FIREBASE_PORT), ServerProcess(app, args.port) as server:
+        async with httpx.AsyncClient(base_url=server.base_url, limits=limits, timeout=60) as http:
+            for scenario in scenarios:
+                results["scenarios"][scenario.name] = await run_scenario(http, scenario, args)
+                if not args.json:
+                    stats = results["scenarios"][scenario.name]
+                    print(f"{scenario.name:<26} rps={stats['rps']:>8}  p50={stats['p50_ms']:>8}ms  "
+                          f"p99={stats['p99_ms']:>8}ms  errors={stats['errors']}")
+    return results
+
+
+def main(args) -> int:
+    results = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+        return 0
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline first", file=sys.stderr)
+        return 1 if any(stats["errors"] for stats in results["scenarios"].values()) else 0
+
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("config") != results["config"]:
+        print(f"Baseline config {baseline.get('config')} differs from {results['config']}", file=sys.stderr)
+        return 2
+    failures = compare(results, baseline, args)
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--teams", type=int, default=50)
+    parser.add_argument("--shirts", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--requests", type=int, default=200, help="Peticiones por escenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="Latencia por operación del sustituto de Mongo")
+    parser.add_argument("--firebase-latency-ms", type=float, default=10.0)
+    parser.add_argument("--mongo-uri", help="mongod local en vez del sustituto (se vacían sus colecciones)")
+    parser.add_argument("--only", nargs="+", help="Solo los escenarios que empiezan por estos prefijos")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--max-rps-drop", type=float, default=0.25)
+    parser.add_argument("--max-p99-increase", type=float, default=0.5)
+    parser.add_argument("--p99-slack-ms", type=float, default=2.0)
+    parser.add_argument("--output", help="Guarda también los resultados en este fichero")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--json", action="store_true")
+    sys.exit(main(parser.parse_args()))
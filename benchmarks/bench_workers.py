@@ -0,0 +1,74 @@
+"""Escalado del throughput de lecturas de 1 a N procesos worker.
+
+Sirve ``main.app`` con ``--workers`` procesos que comparten el socket (fork tras
+sembrar el sustituto de Mongo, como ``gunicorn --preload``) y lanza la misma
+mezcla de lecturas contra cada configuración. Solo lecturas: cada worker tiene
+su propia copia del sustituto en memoria.
+
+El generador de carga es un único proceso: en máquinas con pocos núcleos compite
+con los workers, así que el escalado medido es una cota inferior.
+
+    python -m benchmarks.bench_workers --workers 1 2 4 --requests 4000 --concurrency 100
+"""
+import argparse
+import asyncio
+import json
+import os
+
+import httpx
+
+from benchmarks.common import ServerProcess, run_concurrent
+from benchmarks.catalog import seed_catalog
+from benchmarks.fake_mongo import FakeAsyncClient
+import utils.mongodb as mongodb
+from main import app
+
+
+async def run_workers(workers: int, args) -> dict:
+    mongodb._client = FakeAsyncClient(latency=args.latency_ms / 1000)
+    catalog = seed_catalog(mongodb._client.raw(mongodb.DB), args.teams, args.shirts, 1)
+    teams, shirts = catalog["futbol_teams"], catalog["shirts"]
+    paths = [
+        lambda i: f"/shirts/{shirts[i % len(shirts)]}",
+        lambda i: f"/futbol_teams/{teams[i % len(teams)]}",
+        lambda i: f"/shirts?team_id={teams[i % len(teams)]}&limit=20",
+        lambda i: f"/shirts/search?q={('local', 'retro 2020', 'madrid')[i % 3]}",
+    ]
+    limits = httpx.Limits(max_connections=args.concurrency)
+    with ServerProcess(app, args.port, workers=workers) as server:
+        async with httpx.AsyncClient(base_url=server.base_url, limits=limits, timeout=60) as http:
+            async def request(i):
+                response = await http.get(paths[i % len(paths)](i))
+                response.raise_for_status()
+
+            # Calienta cachés e índices de todos los workers antes de medir
+            await run_concurrent(request, args.concurrency * 2, args.concurrency)
+            return await run_concurrent(request, args.requests, args.concurrency)
+
+
+async def main(args):
+    results = {}
+    for workers in args.workers:
+        results[workers] = await run_workers(workers, args)
+        results[workers]["speedup"] = round(results[workers]["rps"] / results[args.workers[0]]["rps"], 2)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.requests} reads, concurrency={args.concurrency}, latency={args.latency_ms}ms, "
+          f"{os.cpu_count()} CPUs")
+    for workers, stats in results.items():
+        print(f"workers={workers:<3} rps={stats['rps']:>8}  p50={stats['p50_ms']:>8}ms  "
+              f"p99={stats['p99_ms']:>8}ms  x{stats['speedup']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, os.cpu_count() or 1}))
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=1.0)
+    parser.add_argument("--teams", type=int, default=50)
+    parser.add_argument("--shirts", type=int, default=2000)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--json", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,122 @@
+"""Catálogo sintético y reproducible para los benchmarks: equipos, camisetas y usuarios.
+
+Con la misma semilla genera siempre los mismos documentos. Los nombres se repiten
+lo suficiente para que búsqueda, autocompletado y filtros devuelvan resultados
+parecidos a los de un catálogo real (muchas camisetas por equipo y temporada,
+la mayoría sin descuento).
+
+    python -m benchmarks.catalog --teams 50 --shirts 5000 --users 100 > catalog.json
+"""
+import argparse
+import json
+import random
+
+from benchmarks.fake_firebase import PASSWORD
+from models.shirt import effective_price
+
+COUNTRIES = {
+    "España": ["Madrid", "Barcelona", "Sevilla", "Valencia", "Bilbao", "Vigo", "Zaragoza"],
+    "Argentina": ["Buenos Aires", "Rosario", "Córdoba", "La Plata", "Mendoza"],
+    "México": ["Guadalajara", "Monterrey", "Puebla", "Toluca", "León"],
+    "Colombia": ["Medellín", "Bogotá", "Cali", "Barranquilla"],
+    "Italia": ["Milán", "Turín", "Roma", "Nápoles", "Génova"],
+    "Inglaterra": ["Liverpool", "Manchester", "Londres", "Newcastle", "Leeds"],
+}
+TEAM_PREFIXES = ["Atlético", "Real", "Deportivo", "Club", "Sporting", "Unión", "Racing", "Independiente"]
+KINDS = ["local", "visitante", "tercera", "portero", "entrenamiento", "retro", "aniversario"]
+SIZES = ["S", "M", "L", "XL"]
+SIZE_WEIGHTS = [2, 4, 4, 1]
+FIRST_NAMES = ["Ana", "Luis", "María", "José", "Lucía", "Carlos", "Sofía", "Javier", "Elena", "Diego"]
+LAST_NAMES = ["Pérez", "García", "López", "Martínez", "Sánchez", "Romero", "Torres", "Ruiz", "Díaz"]
+
+
+def generate_teams(n: int, rng: random.Random) -> list[dict]:
+    teams = []
+    places = [(country, city) for country, cities in COUNTRIES.items() for city in cities]
+    for i in range(n):
+        country, city = places[i % len(places)]
+        prefix = TEAM_PREFIXES[(i // len(places)) % len(TEAM_PREFIXES)]
+        suffix = f" {i // (len(places) * len(TEAM_PREFIXES)) + 1}" if i >= len(places) * len(TEAM_PREFIXES) else ""
+        teams.append({"name": f"{prefix} {city}{suffix}", "country": country})
+    rng.shuffle(teams)
+    return teams
+
+
+def generate_shirts(n: int, teams: list[dict], rng: random.Random) -> list[dict]:
+    """``teams`` deben llevar ya su ``_id``: cada camiseta apunta a uno de ellos"""
+    shirts = []
+    # Unos pocos equipos concentran buena parte del catálogo, como en una tienda real
+    weights = [1 / (rank + 1) for rank in range(len(teams))]
+    for team in rng.choices(teams, weights=weights, k=n):
+        season = rng.randint(2010, 2026)
+        kind = rng.choice(KINDS)
+        price = rng.choice([39.9, 49.9, 59.9, 69.9, 79.9, 89.9]) + (10 if kind == "retro" else 0)
+        discount = rng.choice([0, 0, 0, 0, 10, 15, 20, 30, 50])
+        shirts.append({
+            "team_id": str(team["_id"]),
+            "name": f"Camiseta {kind} {season}",
+            "description": f"Camiseta {kind} oficial del {team['name']} temporada {season}",
+            "image": f"https://images.com/{season}/{kind}.jpg",
+            "price": price,
+            "discount": discount,
+            "size": rng.choices(SIZES, weights=SIZE_WEIGHTS)[0],
+            # Como si ya se hubiera ejecutado la migración (python -m utils.migrations effective_price)
+            "effective_price": effective_price(price, discount),
+        })
+    return shirts
+
+
+def generate_users(n: int, rng: random.Random) -> list[dict]:
+    """El primero es administrador; todos inician sesión en el Firebase simulado con ``PASSWORD``"""
+    return [
+        {
+            "name": rng.choice(FIRST_NAMES),
+            "lastname": rng.choice(LAST_NAMES),
+            "email": f"user{i}@example.com",
+            "active": True,
+            "admin": i == 0,
+        }
+        for i in range(n)
+    ]
+
+
+def seed_catalog(db, teams: int, shirts: int, users: int, seed: int = 0) -> dict:
+    """Borra y vuelve a sembrar futbol_teams, shirts y users en ``db`` (mongomock o pymongo síncrono).
+
+    Devuelve los ids generados por colección, en el orden de inserción.
+    """
+    rng = random.Random(seed)
+    for name in ("futbol_teams", "shirts", "users"):
+        db[name].delete_many({})
+    team_docs = generate_teams(teams, rng)
+    db.futbol_teams.insert_many(team_docs)
+    shirt_docs = generate_shirts(shirts, team_docs, rng) if team_docs else []
+    if shirt_docs:
+        db.shirts.insert_many(shirt_docs)
+    user_docs = generate_users(users, rng)
+    if user_docs:
+        db.users.insert_many(user_docs)
+    return {
+        "futbol_teams": [str(doc["_id"]) for doc in team_docs],
+        "shirts": [str(doc["_id"]) for doc in shirt_docs],
+        "users": [doc["email"] for doc in user_docs],
+        "password": PASSWORD,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--teams", type=int, default=50)
+    parser.add_argument("--shirts", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    teams = generate_teams(args.teams, rng)
+    for i, team in enumerate(teams):
+        team["_id"] = f"{i:024x}"
+    print(json.dumps({
+        "futbol_teams": teams,
+        "shirts": generate_shirts(args.shirts, teams, rng),
+        "users": generate_users(args.users, rng),
+    }, ensure_ascii=False, indent=2))
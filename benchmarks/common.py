@@ -0,0 +1,106 @@
+"""Utilidades compartidas por los scripts de benchmark."""
+import asyncio
+import os
+import time
+
+# utils.mongodb exige estas variables al importarse; el benchmark nunca conecta
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("MONGO_DB_NAME", "benchmark")
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: list[float], elapsed: float) -> dict:
+    """Resume latencias (en segundos) en milisegundos y peticiones por segundo"""
+    return {
+        "requests": len(samples),
+        "rps": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+        "max_ms": round(max(samples, default=0.0) * 1000, 2),
+    }
+
+
+async def run_concurrent(make_request, total: int, concurrency: int) -> dict:
+    """Lanza ``total`` llamadas a ``make_request(i)`` con ``concurrency`` en vuelo"""
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: list[float] = []
+
+    async def one(i):
+        async with semaphore:
+            start = time.perf_counter()
+            await make_request(i)
+            samples.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return summarize(samples, time.perf_counter() - start)
+
+
+class ServerProcess:
+    """Sirve una app ASGI con uvicorn en procesos hijos (fork).
+
+    Los hijos heredan el estado ya sembrado (p. ej. el sustituto de Mongo) y no comparten
+    GIL ni event loop con el generador de carga, que así mide el tiempo real de
+    respuesta aunque la app bloquee su event loop. Con ``workers`` > 1 todos aceptan
+    conexiones del mismo socket, como los workers de gunicorn.
+    """
+
+    def __init__(self, app, port: int = 8765, workers: int = 1):
+        self.app = app
+        self.port = port
+        self.workers = workers
+        self.base_url = f"http://127.0.0.1:{port}"
+        self._processes = []
+        self._socket = None
+
+    def _serve(self):
+        import uvicorn
+
+        if self._socket is None:
+            uvicorn.run(self.app, host="127.0.0.1", port=self.port, log_level="warning")
+            return
+        config = uvicorn.Config(self.app, log_level="warning")
+        uvicorn.Server(config).run(sockets=[self._socket])
+
+    def __enter__(self):
+        import multiprocessing
+        import socket
+
+        if self.workers > 1:
+            self._socket = socket.create_server(("127.0.0.1", self.port), backlog=2048)
+        context = multiprocessing.get_context("fork")
+        self._processes = [context.Process(target=self._serve, daemon=True) for _ in range(self.workers)]
+        for process in self._processes:
+            process.start()
+        deadline = time.monotonic() + 10
+        while not self._responds():
+            if time.monotonic() > deadline or not all(p.is_alive() for p in self._processes):
+                raise RuntimeError(f"Benchmark server did not start on port {self.port}")
+            time.sleep(0.05)
+        return self
+
+    def _responds(self) -> bool:
+        # Conectar no basta: con socket compartido el kernel acepta antes de que haya workers
+        import socket
+
+        try:
+            with socket.create_connection(("127.0.0.1", self.port), timeout=1) as conn:
+                conn.sendall(b"GET / HTTP/1.0\r\nHost: 127.0.0.1\r\n\r\n")
+                return bool(conn.recv(1))
+        except OSError:
+            return False
+
+    def __exit__(self, *exc):
+        for process in self._processes:
+            process.terminate()
+        for process in self._processes:
+            process.join()
+        if self._socket is not None:
+            self._socket.close()
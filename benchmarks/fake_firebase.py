@@ -0,0 +1,59 @@
+"""Servidor local que imita la parte de Firebase Auth que usa la app.
+
+- ``accounts:signInWithPassword`` de la API REST (``/login``): se usa apuntando
+  ``FIREBASE_AUTH_URL`` a su dirección.
+- Las llamadas de ``firebase_admin`` para crear, consultar y borrar usuarios
+  (``POST /users``): se usa apuntando ``FIREBASE_AUTH_EMULATOR_HOST`` a su
+  dirección, igual que con el emulador oficial.
+
+Así se miden ``/login`` y ``/users`` sin red.
+"""
+import asyncio
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+PASSWORD = "Benchmark123!"
+
+ADMIN_PREFIX = "/identitytoolkit.googleapis.com/v1/projects/{project}"
+
+
+def build_app(latency: float = 0.0) -> FastAPI:
+    app = FastAPI()
+    accounts: dict[str, dict] = {}
+
+    async def delay():
+        if latency:
+            await asyncio.sleep(latency)
+
+    @app.post("/v1/accounts:signInWithPassword")
+    async def sign_in(request: Request):
+        body = await request.json()
+        await delay()
+        if body.get("password") != PASSWORD:
+            return JSONResponse({"error": {"code": 400, "message": "INVALID_PASSWORD"}}, status_code=400)
+        return {"kind": "identitytoolkit#VerifyPasswordResponse", "email": body["email"], "idToken": "fake"}
+
+    @app.post(ADMIN_PREFIX + "/accounts")
+    async def create_account(project: str, request: Request):
+        body = await request.json()
+        await delay()
+        uid = body.get("localId") or uuid.uuid4().hex
+        accounts[uid] = {"localId": uid, "email": body.get("email")}
+        return {"kind": "identitytoolkit#SignupNewUserResponse", "localId": uid}
+
+    @app.post(ADMIN_PREFIX + "/accounts:lookup")
+    async def lookup_accounts(project: str, request: Request):
+        body = await request.json()
+        await delay()
+        return {"users": [accounts[uid] for uid in body.get("localId", []) if uid in accounts]}
+
+    @app.post(ADMIN_PREFIX + "/accounts:delete")
+    async def delete_account(project: str, request: Request):
+        body = await request.json()
+        await delay()
+        accounts.pop(body.get("localId"), None)
+        return {"kind": "identitytoolkit#DeleteAccountResponse"}
+
+    return app
@@ -0,0 +1,201 @@
+"""Sustituto en memoria del cliente asíncrono de MongoDB para los benchmarks.
+
+Envuelve mongomock con la misma superficie que usa ``utils.mongodb`` (colecciones
+con métodos ``await``-ables y cursores con ``to_list``/``async for``) y añade una
+latencia artificial por operación. Con ``blocking=True`` la latencia se paga con
+``time.sleep`` dentro del event loop, reproduciendo el comportamiento de pymongo
+síncrono llamado desde un ``async def``.
+"""
+import asyncio
+import time
+
+import mongomock
+from pymongo import DeleteOne, InsertOne, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+from pymongo.results import BulkWriteResult
+
+
+class _Delay:
+    def __init__(self, latency: float, blocking: bool):
+        self.latency = latency
+        self.blocking = blocking
+
+    def run(self, fn, *args, **kwargs):
+        if self.blocking:
+            # Igual que pymongo síncrono: el hilo del event loop queda bloqueado
+            time.sleep(self.latency)
+            result = fn(*args, **kwargs)
+
+            async def done():
+                return result
+            return done()
+
+        async def delayed():
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return fn(*args, **kwargs)
+        return delayed()
+
+
+class FakeCursor:
+    def __init__(self, cursor, delay: _Delay):
+        self._cursor = cursor
+        self._delay = delay
+
+    def sort(self, *args, **kwargs):
+        self._cursor = self._cursor.sort(*args, **kwargs)
+        return self
+
+    def limit(self, n):
+        self._cursor = self._cursor.limit(n)
+        return self
+
+    def skip(self, n):
+        self._cursor = self._cursor.skip(n)
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    def to_list(self, length=None):
+        def collect():
+            docs = list(self._cursor)
+            return docs if length is None else docs[:length]
+        return self._delay.run(collect)
+
+    async def __aiter__(self):
+        for doc in await self.to_list():
+            yield doc
+
+
+class FakeCollection:
+    _ASYNC_METHODS = {
+        "find_one", "insert_one", "insert_many", "update_one", "update_many",
+        "replace_one", "delete_one", "delete_many", "count_documents",
+        "find_one_and_update", "create_index", "create_indexes",
+        "distinct",
+    }
+
+    def __init__(self, collection, delay: _Delay):
+        self._collection = collection
+        self._delay = delay
+        self.name = collection.name
+
+    def find(self, *args, **kwargs):
+        return FakeCursor(self._collection.find(*args, **kwargs), self._delay)
+
+    async def aggregate(self, pipeline, **kwargs):
+        return FakeCursor(iter(self._aggregate(pipeline)), self._delay)
+
+    def _aggregate(self, pipeline):
+        # mongomock no implementa $lookup con "pipeline": esas etapas se resuelven aquí
+        # y el resto del pipeline se ejecuta con mongomock por tramos
+        docs, stages = None, []
+        for stage in [*pipeline, None]:
+            lookup = stage.get("$lookup") if stage else None
+            if stage is not None and not (lookup and "pipeline" in lookup):
+                stages.append(stage)
+                continue
+            docs = self._run_stages(docs, stages)
+            stages = []
+            if stage is None:
+                return docs
+            foreign = self._collection.database[lookup["from"]]
+            for doc in docs:
+                match = {"$match": {lookup["foreignField"]: doc.get(lookup["localField"])}}
+                doc[lookup["as"]] = list(foreign.aggregate([match, *lookup["pipeline"]]))
+
+    def _run_stages(self, docs, stages):
+        if docs is None:
+            return list(self._collection.aggregate(stages)) if stages else list(self._collection.find())
+        if not stages or not docs:
+            return docs
+        scratch = self._collection.database["_fake_aggregate"]
+        scratch.drop()
+        scratch.insert_many(docs)
+        try:
+            return list(scratch.aggregate(stages))
+        finally:
+            scratch.drop()
+
+    def bulk_write(self, operations, ordered=True, **kwargs):
+        return self._delay.run(self._bulk_write, operations, ordered)
+
+    def _bulk_write(self, operations, ordered):
+        # mongomock no entiende las operaciones de pymongo 4.x; se aplican una a una
+        counts = {"nInserted": 0, "nUpserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0}
+        upserted, write_errors = [], []
+        coll = self._collection
+        for index, op in enumerate(operations):
+            try:
+                if isinstance(op, InsertOne):
+                    coll.insert_one(op._doc)
+                    counts["nInserted"] += 1
+                    continue
+                if isinstance(op, DeleteOne):
+                    counts["nRemoved"] += coll.delete_one(op._filter).deleted_count
+                    continue
+                if isinstance(op, UpdateOne):
+                    result = coll.update_one(op._filter, op._doc, upsert=op._upsert)
+                elif isinstance(op, ReplaceOne):
+                    result = coll.replace_one(op._filter, op._doc, upsert=op._upsert)
+                else:
+                    raise TypeError(f"Unsupported bulk operation {op!r}")
+                counts["nMatched"] += result.matched_count
+                counts["nModified"] += result.modified_count
+                if result.upserted_id is not None:
+                    counts["nUpserted"] += 1
+                    upserted.append({"index": index, "_id": result.upserted_id})
+            except PyMongoError as e:
+                write_errors.append({"index": index, "code": getattr(e, "code", None), "errmsg": str(e)})
+                if ordered:
+                    break
+        details = {**counts, "upserted": upserted, "writeErrors": write_errors, "writeConcernErrors": []}
+        if write_errors:
+            raise BulkWriteError(details)
+        return BulkWriteResult(details, True)
+
+    def __getattr__(self, name):
+        if name in self._ASYNC_METHODS:
+            fn = getattr(self._collection, name)
+            return lambda *args, **kwargs: self._delay.run(fn, *args, **kwargs)
+        raise AttributeError(name)
+
+
+class FakeDatabase:
+    def __init__(self, database, delay: _Delay):
+        self._database = database
+        self._delay = delay
+
+    def __getitem__(self, name):
+        return FakeCollection(self._database[name], self._delay)
+
+    def command(self, name, *args, **kwargs):
+        if name == "ping":
+            return self._delay.run(lambda: {"ok": 1.0})
+        if name == "explain":
+            # mongomock no tiene planificador: recorre siempre la colección entera
+            return self._delay.run(lambda: {"queryPlanner": {"winningPlan": {"stage": "COLLSCAN"}}, "ok": 1.0})
+        return self._delay.run(self._database.command, name, *args, **kwargs)
+
+
+class FakeAsyncClient:
+    """Reemplazo de ``AsyncMongoClient`` para asignar a ``utils.mongodb._client``"""
+
+    def __init__(self, latency: float = 0.0, blocking: bool = False):
+        self._client = mongomock.MongoClient()
+        self._delay = _Delay(latency, blocking)
+
+    def __getitem__(self, name):
+        return FakeDatabase(self._client[name], self._delay)
+
+    @property
+    def admin(self):
+        return self["admin"]
+
+    def raw(self, name):
+        """Base de datos mongomock sin latencia, para sembrar datos"""
+        return self._client[name]
+
+    async def close(self):
+        self._client.close()
@@ -1,61 +1,140 @@
 import logging
+from typing import Optional
 from fastapi import HTTPException
-from models.futbol_team import FutbolTeam
+from pydantic import ValidationError
+from pymongo import InsertOne, ReturnDocument, UpdateOne
+from models.bulk import BatchItem, BulkItemResult, BulkResult
+from models.futbol_team import FutbolTeam, FutbolTeamPatch, FutbolTeamShirts, FutbolTeamWithCount
+from models.shirt import Shirt
+from utils.bulk import collect_results, execute_bulk, fetch_by_ids, patch_changes, validation_message
+from utils.cache import get_cache
+from utils.conditional import versions
+from utils.indexes import register_query
 from utils.mongodb import get_collection
+from utils.search_index import search_index
+from utils.singleflight import get_flight
+from utils.snapshot import CatalogSnapshot
+from utils.team_index import team_index
+from utils.pagination import (
+    PAGE_SIZE_DEFAULT,
+    STREAM_BATCH_SIZE,
+    document_to_dict,
+    encode_cursor,
+    iter_documents,
+    keyset_filter,
+    parse_projection,
+)
 from bson import ObjectId
 
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+TEAM_FIELDS = set(FutbolTeam.model_fields) - {"id"}
+
+# GET /futbol_teams sin filtros servido ya serializado desde memoria (CATALOG_SNAPSHOT=true, ver utils/snapshot.py)
+futbol_team_snapshot = CatalogSnapshot("futbol_teams", FutbolTeam.from_document)
+
+# Consultas que emite este controlador (python -m utils.indexes explain)
+register_query("get_futbol_team", "futbol_teams", {"_id": ObjectId()})
+register_query("list_futbol_teams", "futbol_teams", {"_id": {"$gt": ObjectId()}}, [("_id", 1)])
+register_query("delete_futbol_team.shirts", "shirts", {"team_id": str(ObjectId())})
+register_query("get_futbol_teams_by_ids", "futbol_teams", {"_id": {"$in": [ObjectId()]}})
+register_query("get_futbol_team_shirts", "shirts", {"team_id": str(ObjectId()), "_id": {"$gt": ObjectId()}}, [("_id", 1)])
+
 
 async def create_futbol_team(team: FutbolTeam) -> FutbolTeam: 
     try:
         coll = get_collection("futbol_teams") 
         team_dict = team.model_dump(exclude={"id"})
-        inserted = coll.insert_one(team_dict)
+        inserted = await coll.insert_one(team_dict)
         team.id = str(inserted.inserted_id)
+        team_index.add(team.id)
+        search_index.set_team(team.id, team.name, team.country)
+        versions.bump("futbol_teams", team.id)
         return team
     except Exception as e:
-        logger.error(f"Error creating futbol team: {str(e)}")  
+        logger.error("Error creating futbol team: %s", e)  
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
 async def get_futbol_team(team_id: str) -> FutbolTeam:  
     try:
-        coll = get_collection("futbol_teams") 
-        # Convierte el ID a ObjectId
-        team_data = coll.find_one({"_id": ObjectId(team_id)})  # Cambia a ObjectId
-        if not team_data:
+        cache = get_cache("futbol_teams")
+        cached = await cache.get(team_id)
+        if cached is not None:
+            return cached
+
+        # Las peticiones simultáneas al mismo equipo comparten un solo find_one
+        version = versions.document("futbol_teams", team_id)
+        team = await get_flight("futbol_teams").do((team_id, version), lambda: _load_futbol_team(team_id, version))
+        if team is None:
             raise HTTPException(status_code=404, detail="Futbol team not found")
-        return FutbolTeam(id=str(team_data['_id']), name=team_data['name'], country=team_data['country'])  
+        return team
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error fetching futbol team: {str(e)}")  
+        logger.error("Error fetching futbol team: %s", e)  
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
-async def update_futbol_team(team_id: str, team: FutbolTeam) -> FutbolTeam: 
-    try:
-        coll = get_collection("futbol_teams")
-        team_dict = team.model_dump(exclude={"id"})  # Excluye el id del dict
+async def _load_futbol_team(team_id: str, version: int) -> Optional[FutbolTeam]:
+    # Convierte el ID a ObjectId
+    team_data = await get_collection("futbol_teams").find_one({"_id": ObjectId(team_id)})
+    if not team_data:
+        return None
+    team = FutbolTeam.from_document(team_data)
+    # Si hubo una escritura mientras tanto, el documento leído puede ser el anterior: no se cachea
+    if versions.document("futbol_teams", team_id) == version:
+        await get_cache("futbol_teams").set(team_id, team)
+    return team
 
-        # Convierte el ID a ObjectId y actualiza el documento
-        result = coll.update_one({"_id": ObjectId(team_id)}, {"$set": team_dict})
 
-        if result.modified_count == 0:
-            raise HTTPException(status_code=404, detail="Futbol team not found")
+async def warm_futbol_team_cache(limit: int) -> int:
+    """Precarga en la caché de lecturas los ``limit`` equipos más recientes (al arrancar)"""
+    cache = get_cache("futbol_teams")
+    docs = await get_collection("futbol_teams").find({}).sort("_id", -1).limit(limit).to_list()
+    for doc in docs:
+        await cache.set(str(doc["_id"]), FutbolTeam.from_document(doc))
+    return len(docs)
+
 
-        # Obtiene el documento actualizado
-        updated_team_data = coll.find_one({"_id": ObjectId(team_id)})
-        if not updated_team_data:
-            raise HTTPException(status_code=404, detail="Futbol team not found after update")
+async def update_futbol_team(team_id: str, team: FutbolTeam) -> FutbolTeam:
+    """PUT: sustituye todos los campos del equipo"""
+    return await _apply_team_changes(team_id, team.model_dump(exclude={"id"}))
 
-        # Devuelve el equipo actualizado incluyendo el id
-        return FutbolTeam(id=str(updated_team_data['_id']), name=updated_team_data['name'], country=updated_team_data['country'])
 
+async def patch_futbol_team(team_id: str, patch: FutbolTeamPatch) -> FutbolTeam:
+    """PATCH: modifica solo los campos enviados"""
+    changes = patch_changes(patch)
+    if not changes:
+        return await get_futbol_team(team_id)
+    return await _apply_team_changes(team_id, changes)
+
+
+async def _apply_team_changes(team_id: str, changes: dict) -> FutbolTeam:
+    """Escribe y lee el equipo en una sola operación atómica (find_one_and_update)"""
+    if not ObjectId.is_valid(team_id):
+        raise HTTPException(status_code=404, detail="Futbol team not found")
+    try:
+        updated = await get_collection("futbol_teams").find_one_and_update(
+            {"_id": ObjectId(team_id)},
+            {"$set": changes},
+            return_document=ReturnDocument.AFTER,
+        )
     except Exception as e:
-        logger.error(f"Error updating futbol team: {str(e)}") 
+        logger.error("Error updating futbol team: %s", e)
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    # Un PUT idéntico al documento actual no es un 404: solo falta si no hay documento
+    if updated is None:
+        raise HTTPException(status_code=404, detail="Futbol team not found")
+
+    team = FutbolTeam.from_document(updated)
+    search_index.set_team(team_id, team.name, team.country)
+    versions.bump("futbol_teams", team_id)
+    # Se invalida en vez de guardar el resultado: dos escrituras simultáneas pueden terminar en otro orden
+    # y dejar cacheada la anterior. La siguiente lectura la rellena si la versión no cambia.
+    await get_cache("futbol_teams").delete(team_id)
+    return team
 
 
 async def delete_futbol_team(team_id: str) -> dict:
@@ -65,7 +144,7 @@ async def delete_futbol_team(team_id: str) -> dict:
         shirts_coll = get_collection("shirts")
 
         # Verificar si alguna camiseta está asociada al equipo
-        associated_shirts = shirts_coll.count_documents({"team_id": team_id})
+        associated_shirts = await shirts_coll.count_documents({"team_id": team_id})
         if associated_shirts > 0:
             # Si hay camisetas asociadas, no permitir eliminación
             raise HTTPException(
@@ -74,36 +153,208 @@ async def delete_futbol_team(team_id: str) -> dict:
             )
 
         # Intentar eliminar el equipo
-        result = teams_coll.delete_one({"_id": ObjectId(team_id)})
+        result = await teams_coll.delete_one({"_id": ObjectId(team_id)})
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Equipo no encontrado")
+        await get_cache("futbol_teams").delete(team_id)
+        team_index.discard(team_id)
+        search_index.remove_team(team_id)
+        versions.bump("futbol_teams", team_id)
 
         return {"message": "Equipo eliminado exitosamente"}
 
     except HTTPException:
         raise  # Re-lanzar excepciones HTTP explícitas
     except Exception as e:
-        logger.error(f"Error deleting futbol team: {str(e)}")
+        logger.error("Error deleting futbol team: %s", e)
         raise HTTPException(status_code=500, detail=f"Error en la base de datos: {str(e)}")
 
-def list_futbol_teams() -> list[FutbolTeam]:
+async def list_futbol_teams(limit: int = PAGE_SIZE_DEFAULT, after: Optional[str] = None, fields: Optional[str] = None) -> dict:
+    """Página de equipos ordenada por _id; devuelve los items y el cursor de la siguiente"""
+    # Las peticiones simultáneas de la misma página comparten la consulta
+    key = (versions.collection("futbol_teams"), limit, after, fields)
+    try:
+        return await get_flight("futbol_teams_list").do(key, lambda: _list_futbol_teams(limit, after, fields))
+    except TimeoutError as e:
+        logger.error("Error al obtener equipos: %s", e)
+        raise HTTPException(status_code=500, detail="Error interno al obtener la lista de equipos")
+
+
+async def _list_futbol_teams(limit: int, after: Optional[str], fields: Optional[str]) -> dict:
     try:
         coll = get_collection("futbol_teams")
+        projection = parse_projection(fields, TEAM_FIELDS)
 
-        # Obtiene todos los equipos de forma sincrónica
-        teams_data = list(coll.find({}))  # Convierte el cursor a lista
+        # Se pide un documento extra para saber si hay otra página
+        teams_data = await coll.find(keyset_filter(after), projection).sort("_id", 1).limit(limit + 1).to_list()
 
-        if not teams_data:
-            return []  # Devuelve una lista vacía si no hay equipos
+        next_cursor = None
+        if len(teams_data) > limit:
+            teams_data = teams_data[:limit]
+            next_cursor = encode_cursor(teams_data[-1]["_id"])
 
-        logger.info(f"Teams data: {teams_data}")
+        logger.info("Listed futbol teams", extra={"count": len(teams_data), "has_next": next_cursor is not None})
 
-        # Convierte cada documento a objeto FutbolTeam
-        return [FutbolTeam(id=str(team['_id']), name=team['name'], country=team['country']) for team in teams_data]
+        # Convierte cada documento a objeto FutbolTeam (o dict si hay proyección)
+        if projection:
+            items = [document_to_dict(team) for team in teams_data]
+        else:
+            items = [FutbolTeam.from_document(team) for team in teams_data]
+        return {"items": items, "next_cursor": next_cursor}
 
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error al obtener equipos: {str(e)}", exc_info=True)
+        logger.error("Error al obtener equipos: %s", e, exc_info=True)
         raise HTTPException(
             status_code=500,
             detail="Error interno al obtener la lista de equipos"
         )
+
+
+async def stream_futbol_teams(after: Optional[str] = None, fields: Optional[str] = None):
+    """Iterador asíncrono sobre todos los equipos, sin cargarlos en memoria"""
+    coll = get_collection("futbol_teams")
+    projection = parse_projection(fields, TEAM_FIELDS)
+    cursor = coll.find(keyset_filter(after), projection).sort("_id", 1).batch_size(STREAM_BATCH_SIZE)
+    return iter_documents(cursor)
+
+
+async def bulk_write_futbol_teams(items: list, upsert: bool = False) -> BulkResult:
+    """Crea (o con upsert, crea/actualiza por id) un lote de equipos con un solo bulk_write"""
+    results: list[Optional[BulkItemResult]] = [None] * len(items)
+    operations, written, teams_by_index = [], [], {}
+    for index, item in enumerate(items):
+        try:
+            team = FutbolTeam.model_validate(item)
+        except ValidationError as e:
+            results[index] = BulkItemResult(index=index, status="error", error=validation_message(e))
+            continue
+        teams_by_index[index] = team
+
+        team_dict = team.model_dump(exclude={"id"})
+        if upsert and team.id:
+            if not ObjectId.is_valid(team.id):
+                results[index] = BulkItemResult(index=index, status="error", error="ID no válido.")
+                continue
+            operations.append(UpdateOne({"_id": ObjectId(team.id)}, {"$set": team_dict}, upsert=True))
+            written.append((index, team.id, True))
+        else:
+            team_dict["_id"] = ObjectId()
+            operations.append(InsertOne(team_dict))
+            written.append((index, str(team_dict["_id"]), False))
+
+    try:
+        upserted, errors = await execute_bulk(get_collection("futbol_teams"), operations)
+    except Exception as e:
+        logger.error("Error in futbol teams bulk write: %s", e)
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    versions.bump("futbol_teams", *(team_id for _, team_id, _ in written))
+    cache = get_cache("futbol_teams")
+    for op_index, (index, team_id, is_upsert) in enumerate(written):
+        if op_index in errors:
+            continue
+        team_index.add(team_id)
+        search_index.set_team(team_id, teams_by_index[index].name, teams_by_index[index].country)
+        if is_upsert:
+            await cache.delete(team_id)
+    return collect_results(results, written, upserted, errors)
+
+
+def _shirts_lookup(pipeline: list, as_field: str) -> list:
+    """Etapas que unen cada equipo con sus camisetas (team_id guarda el _id como texto).
+
+    Usa $lookup con localField/foreignField y pipeline (MongoDB 5.0+): la igualdad
+    por team_id y el pipeline interno se resuelven con el índice team_id_id.
+    """
+    return [
+        {"$addFields": {"team_key": {"$toString": "$_id"}}},
+        {"$lookup": {
+            "from": "shirts",
+            "localField": "team_key",
+            "foreignField": "team_id",
+            "pipeline": pipeline,
+            "as": as_field,
+        }},
+    ]
+
+
+async def get_futbol_team_shirts(team_id: str, limit: int = PAGE_SIZE_DEFAULT, after: Optional[str] = None) -> dict:
+    """Equipo, número total de camisetas y una página de ellas en una sola agregación"""
+    if not ObjectId.is_valid(team_id):
+        raise HTTPException(status_code=404, detail="Futbol team not found")
+    page = [{"$sort": {"_id": 1}}, {"$limit": limit + 1}]
+    if after:
+        page.insert(0, {"$match": keyset_filter(after)})
+    pipeline = [
+        {"$match": {"_id": ObjectId(team_id)}},
+        *_shirts_lookup(page, "shirts"),
+        *_shirts_lookup([{"$count": "n"}], "counts"),
+        {"$project": {"name": 1, "country": 1, "shirts": 1,
+                      "shirt_count": {"$ifNull": [{"$first": "$counts.n"}, 0]}}},
+    ]
+    try:
+        cursor = await get_collection("futbol_teams").aggregate(pipeline)
+        docs = await cursor.to_list()
+    except Exception as e:
+        logger.error("Error fetching futbol team shirts: %s", e)
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    if not docs:
+        raise HTTPException(status_code=404, detail="Futbol team not found")
+
+    team = docs[0]
+    shirts = team["shirts"]
+    next_cursor = None
+    if len(shirts) > limit:
+        shirts = shirts[:limit]
+        next_cursor = encode_cursor(shirts[-1]["_id"])
+    item = FutbolTeamShirts.from_document(team, shirts=[Shirt.from_document(shirt) for shirt in shirts])
+    return {"item": item, "next_cursor": next_cursor}
+
+
+async def list_futbol_teams_with_counts(limit: int = PAGE_SIZE_DEFAULT, after: Optional[str] = None) -> dict:
+    """Página de equipos con su número de camisetas, en una sola agregación"""
+    # El conteo depende también de las camisetas
+    key = (versions.collection("futbol_teams"), versions.collection("shirts"), limit, after)
+    try:
+        return await get_flight("futbol_teams_counts").do(key, lambda: _list_futbol_teams_with_counts(limit, after))
+    except TimeoutError as e:
+        logger.error("Error al obtener equipos con conteos: %s", e)
+        raise HTTPException(status_code=500, detail="Error interno al obtener la lista de equipos")
+
+
+async def _list_futbol_teams_with_counts(limit: int, after: Optional[str]) -> dict:
+    pipeline = [
+        {"$match": keyset_filter(after)},
+        {"$sort": {"_id": 1}},
+        {"$limit": limit + 1},
+        *_shirts_lookup([{"$count": "n"}], "counts"),
+        {"$project": {"name": 1, "country": 1,
+                      "shirt_count": {"$ifNull": [{"$first": "$counts.n"}, 0]}}},
+    ]
+    try:
+        cursor = await get_collection("futbol_teams").aggregate(pipeline)
+        teams_data = await cursor.to_list()
+    except Exception as e:
+        logger.error("Error al obtener equipos con conteos: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Error interno al obtener la lista de equipos")
+
+    next_cursor = None
+    if len(teams_data) > limit:
+        teams_data = teams_data[:limit]
+        next_cursor = encode_cursor(teams_data[-1]["_id"])
+    items = [FutbolTeamWithCount.from_document(team) for team in teams_data]
+    return {"items": items, "next_cursor": next_cursor}
+
+
+async def get_futbol_teams_by_ids(ids: list[str]) -> list[BatchItem[FutbolTeam]]:
+    """Varios equipos por id, en el orden pedido y con found=false para los que no existen"""
+    try:
+        return await fetch_by_ids(
+            "futbol_teams", ids,
+            FutbolTeam.from_document,
+        )
+    except Exception as e:
+        logger.error("Error fetching futbol teams by id: %s", e)
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
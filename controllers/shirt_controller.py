@@ -1,12 +1,71 @@
 import logging
+from typing import Optional
 from fastapi import HTTPException
-from models.shirt import Shirt, DeleteMessage
+from pydantic import ValidationError
+from pymongo import InsertOne, ReturnDocument, UpdateOne
+from models.bulk import BatchItem, BulkItemResult, BulkResult
+from models.shirt import EFFECTIVE_PRICE_EXPR, Shirt, ShirtFilter, ShirtPatch, ShirtSuggestion, DeleteMessage
+from utils.bulk import collect_results, execute_bulk, fetch_by_ids, patch_changes, validation_message
+from utils.cache import get_cache
+from utils.conditional import versions
+from utils.indexes import register_query
 from utils.mongodb import get_collection
+from utils.search_index import search_index
+from utils.singleflight import get_flight
+from utils.snapshot import CatalogSnapshot
+from utils.team_index import team_index
+from utils.pagination import (
+    PAGE_SIZE_DEFAULT,
+    STREAM_BATCH_SIZE,
+    document_to_dict,
+    encode_cursor,
+    iter_documents,
+    keyset_filter,
+    parse_projection,
+    sort_spec,
+)
 from bson import ObjectId
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+SHIRT_FIELDS = set(Shirt.model_fields) - {"id"}
+# Campos de los que depende effective_price
+PRICE_FIELDS = {"price", "discount"}
+
+# GET /shirts sin filtros servido ya serializado desde memoria (CATALOG_SNAPSHOT=true, ver utils/snapshot.py)
+shirt_snapshot = CatalogSnapshot("shirts", Shirt.from_document)
+VALID_SIZES = ['S', 'M', 'L', 'XL']
+
+# Consultas que emite este controlador (python -m utils.indexes explain)
+register_query("get_shirt", "shirts", {"_id": ObjectId()})
+register_query("list_shirts", "shirts", {"_id": {"$gt": ObjectId()}}, [("_id", 1)])
+register_query("list_shirts.team_size_price", "shirts",
+               {"team_id": str(ObjectId()), "size": "M", "price": {"$lte": 50}}, [("price", 1), ("_id", 1)])
+register_query("list_shirts.by_price", "shirts", {"price": {"$gte": 10, "$lte": 50}}, [("price", -1), ("_id", -1)])
+register_query("search_shirts", "shirts", {"_id": {"$in": [ObjectId()]}})
+register_query("get_shirts_by_ids", "shirts", {"_id": {"$in": [ObjectId()]}})
+register_query("list_shirts.by_discount", "shirts", {"discount": {"$gte": 10}}, [("discount", -1), ("_id", -1)])
+register_query("list_shirts.by_name", "shirts", {}, [("name", 1), ("_id", 1)])
+register_query("list_shirts.by_effective_price", "shirts",
+               {"effective_price": {"$lte": 50}}, [("effective_price", 1), ("_id", 1)])
+register_query("list_shirts.team_effective_price", "shirts",
+               {"team_id": str(ObjectId()), "effective_price": {"$lte": 50}}, [("effective_price", 1), ("_id", 1)])
+
+
+def validate_shirt(shirt: Shirt):
+    """Validaciones de negocio comunes a todas las escrituras de camisetas"""
+    validate_shirt_fields(shirt.model_dump())
+
+
+def validate_shirt_fields(fields: dict):
+    """Valida solo los campos presentes (sirve también para los cambios parciales de PATCH)"""
+    if "price" in fields and fields["price"] <= 0:
+        raise HTTPException(status_code=400, detail="El precio debe ser mayor que cero.")
+    # El descuento es opcional: null equivale a sin descuento
+    if fields.get("discount") is not None and not 0 <= fields["discount"] <= 100:
+        raise HTTPException(status_code=400, detail="El descuento debe estar entre 0 y 100.")
+    if "size" in fields and fields["size"] not in VALID_SIZES:
+        raise HTTPException(status_code=400, detail="Talla no válida.")
 
 
 
@@ -16,26 +75,23 @@ async def create_shirt(shirt: Shirt) -> Shirt:
         shirt_dict = shirt.dict(exclude={"id"})  # Usar dict() en lugar de model_dump()
 
         # Validaciones básicas del producto
-        if shirt.price <= 0:
-            raise HTTPException(status_code=400, detail="El precio debe ser mayor que cero.")
-        if shirt.discount < 0 or shirt.discount > 100:
-            raise HTTPException(status_code=400, detail="El descuento debe estar entre 0 y 100.")
-        valid_sizes = ['S', 'M', 'L', 'XL']
-        if shirt.size not in valid_sizes:
-            raise HTTPException(status_code=400, detail="Talla no válida.")
-
-        # Verificación de existencia del equipo
-        team_exists = get_collection("futbol_teams").find_one({"_id": ObjectId(shirt.team_id)})
-        if not team_exists:
+        validate_shirt(shirt)
+
+        # Verificación de existencia del equipo (índice en memoria, Mongo solo si no está)
+        if not await team_index.exists(shirt.team_id):
             raise HTTPException(status_code=404, detail="El equipo no existe.")
 
         # Inserción en la base de datos
-        inserted = coll.insert_one(shirt_dict)
+        inserted = await coll.insert_one(shirt_dict)
         shirt.id = str(inserted.inserted_id)
+        search_index.set_shirt(shirt.id, shirt.name, shirt.description, shirt.team_id)
+        versions.bump("shirts", shirt.id)
         return shirt
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error creating shirt: {str(e)}")
+        logger.error("Error creating shirt: %s", e)
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
@@ -43,69 +99,282 @@ async def create_shirt(shirt: Shirt) -> Shirt:
 
 async def get_shirt(shirt_id: str) -> Shirt:
     try:
-        coll = get_collection("shirts")
-        shirt_data = coll.find_one({"_id": ObjectId(shirt_id)})
-        if not shirt_data:
+        cache = get_cache("shirts")
+        cached = await cache.get(shirt_id)
+        if cached is not None:
+            return cached
+
+        # Las peticiones simultáneas a la misma camiseta comparten un solo find_one
+        version = versions.document("shirts", shirt_id)
+        shirt = await get_flight("shirts").do((shirt_id, version), lambda: _load_shirt(shirt_id, version))
+        if shirt is None:
             raise HTTPException(status_code=404, detail="Camiseta encontrada pero sin modificaciones en sus valores.")
-        return Shirt(id=str(shirt_data['_id']), **shirt_data)  # Desempaqueta el resto de los campos
+        return shirt
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error fetching shirt: {str(e)}")
+        logger.error("Error fetching shirt: %s", e)
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
+async def _load_shirt(shirt_id: str, version: int) -> Optional[Shirt]:
+    shirt_data = await get_collection("shirts").find_one({"_id": ObjectId(shirt_id)})
+    if not shirt_data:
+        return None
+    shirt = Shirt.from_document(shirt_data)
+    # Si hubo una escritura mientras tanto, el documento leído puede ser el anterior: no se cachea
+    if versions.document("shirts", shirt_id) == version:
+        await get_cache("shirts").set(shirt_id, shirt)
+    return shirt
+
+
+async def warm_shirt_cache(limit: int) -> int:
+    """Precarga en la caché de lecturas las ``limit`` camisetas más recientes (al arrancar)"""
+    cache = get_cache("shirts")
+    docs = await get_collection("shirts").find({}).sort("_id", -1).limit(limit).to_list()
+    for doc in docs:
+        await cache.set(str(doc["_id"]), Shirt.from_document(doc))
+    return len(docs)
+
+
 
 
 async def update_shirt(shirt_id: str, shirt: Shirt) -> Shirt:
+    """PUT: sustituye todos los campos de la camiseta"""
+    validate_shirt(shirt)
+    return await _apply_shirt_changes(shirt_id, shirt.model_dump(exclude={"id"}))
+
+
+async def patch_shirt(shirt_id: str, patch: ShirtPatch) -> Shirt:
+    """PATCH: modifica solo los campos enviados"""
+    changes = patch_changes(patch)
+    validate_shirt_fields(changes)
+    if not changes:
+        return await get_shirt(shirt_id)
+    return await _apply_shirt_changes(shirt_id, changes)
+
+
+async def _apply_shirt_changes(shirt_id: str, changes: dict) -> Shirt:
+    """Escribe y lee la camiseta en una sola operación atómica (find_one_and_update)"""
+    if not ObjectId.is_valid(shirt_id):
+        raise HTTPException(status_code=404, detail="Camiseta no encontrada.")
+    if "team_id" in changes and not await team_index.exists(changes["team_id"]):
+        raise HTTPException(status_code=404, detail="El equipo no existe.")
+    update = {"$set": changes}
+    if PRICE_FIELDS & changes.keys() and "effective_price" not in changes:
+        # PATCH de solo uno de los dos campos: effective_price se recalcula en el servidor con el
+        # valor guardado del otro, en la misma operación ($literal evita interpretar "$..." como campo)
+        update = [
+            {"$set": {field: {"$literal": value} for field, value in changes.items()}},
+            {"$set": {"effective_price": EFFECTIVE_PRICE_EXPR}},
+        ]
     try:
-        coll = get_collection("shirts")
-        shirt_dict = shirt.dict(exclude={"id"})
-        # Validaciones
-        if shirt.price <= 0:
-            raise HTTPException(status_code=400, detail="El precio debe ser mayor que cero.")
-        if shirt.discount < 0 or shirt.discount > 100:
-            raise HTTPException(status_code=400, detail="El descuento debe estar entre 0 y 100.")
-        valid_sizes = ['S', 'M', 'L', 'XL']
-        if shirt.size not in valid_sizes:
-            raise HTTPException(status_code=400, detail="Talla no válida.")
-        # Verificar que el equipo existe
-        team_exists = get_collection("futbol_teams").find_one({"_id": ObjectId(shirt.team_id)})
-        if not team_exists:
-            raise HTTPException(status_code=404, detail="El equipo no existe.")
-        # Actualizar el documento
-        result = coll.update_one({"_id": ObjectId(shirt_id)}, {"$set": shirt_dict})  
-        if result.modified_count == 0:
-            raise HTTPException(status_code=404, detail="Camiseta no encontrada.")
-        updated_shirt_data = coll.find_one({"_id": ObjectId(shirt_id)})  
-        return Shirt(id=str(updated_shirt_data['_id']), **updated_shirt_data)
+        updated = await get_collection("shirts").find_one_and_update(
+            {"_id": ObjectId(shirt_id)},
+            update,
+            return_document=ReturnDocument.AFTER,
+        )
     except Exception as e:
-        logger.error(f"Error updating shirt: {str(e)}")
+        logger.error("Error updating shirt: %s", e)
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    # Un PUT idéntico al documento actual no es un 404: solo falta si no hay documento
+    if updated is None:
+        raise HTTPException(status_code=404, detail="Camiseta no encontrada.")
+
+    shirt = Shirt.from_document(updated)
+    search_index.set_shirt(shirt_id, shirt.name, shirt.description, shirt.team_id)
+    versions.bump("shirts", shirt_id)
+    # Se invalida en vez de guardar el resultado: dos escrituras simultáneas pueden terminar en otro orden
+    # y dejar cacheada la anterior. La siguiente lectura la rellena si la versión no cambia.
+    await get_cache("shirts").delete(shirt_id)
+    return shirt
 
 
 async def delete_shirt(shirt_id: str) -> DeleteMessage:
     try:
         coll = get_collection("shirts")
         
-        result = coll.delete_one({"_id": ObjectId(shirt_id)})
+        result = await coll.delete_one({"_id": ObjectId(shirt_id)})
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Shirt not found")
+        await get_cache("shirts").delete(shirt_id)
+        search_index.remove_shirt(shirt_id)
+        versions.bump("shirts", shirt_id)
         
         return {"message": "Shirt deleted successfully"}
     
     except Exception as e:
-        logger.error(f"Error deleting Shirt: {str(e)}")
+        logger.error("Error deleting Shirt: %s", e)
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
-async def list_shirts() -> list[Shirt]:
+def shirt_query(filters: Optional[ShirtFilter], after: Optional[str] = None) -> tuple[dict, list]:
+    """Traduce los filtros de GET /shirts a un filtro y un orden de Mongo (con el keyset del cursor)"""
+    filters = filters or ShirtFilter()
+    query = {}
+    if filters.team_id:
+        query["team_id"] = filters.team_id
+    if filters.size:
+        query["size"] = filters.size
+    for field, low, high in (("price", filters.min_price, filters.max_price),
+                             ("discount", filters.min_discount, filters.max_discount),
+                             ("effective_price", filters.min_effective_price, filters.max_effective_price)):
+        if low is not None and high is not None and low > high:
+            raise HTTPException(status_code=400, detail=f"Rango de {field} no válido.")
+        bounds = {}
+        if low is not None:
+            bounds["$gte"] = low
+        if high is not None:
+            bounds["$lte"] = high
+        if bounds:
+            query[field] = bounds
+
+    sort_field = "_id" if filters.sort == "id" else filters.sort
+    direction = 1 if filters.order == "asc" else -1
+    keyset = keyset_filter(after, sort_field, direction)
+    if keyset:
+        query = {"$and": [query, keyset]} if query else keyset
+    return query, sort_spec(sort_field, direction)
+
+
+async def list_shirts(
+    limit: int = PAGE_SIZE_DEFAULT,
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+    filters: Optional[ShirtFilter] = None,
+) -> dict:
+    """Página de camisetas filtrada y ordenada; devuelve los items y el cursor de la siguiente"""
+    # Las peticiones simultáneas de la misma página comparten la consulta
+    key = (versions.collection("shirts"), limit, after, fields, filters.model_dump_json() if filters else None)
+    try:
+        return await get_flight("shirts_list").do(key, lambda: _list_shirts(limit, after, fields, filters))
+    except TimeoutError as e:
+        logger.error("Error al obtener camisetas: %s", e)
+        raise HTTPException(status_code=500, detail="Error interno al obtener la lista de camisetas")
+
+
+async def _list_shirts(limit: int, after: Optional[str], fields: Optional[str], filters: Optional[ShirtFilter]) -> dict:
     try:
         coll = get_collection("shirts")
-        shirts_data = list(coll.find({}))
-        if not shirts_data:
-            return []
+        projection = parse_projection(fields, SHIRT_FIELDS)
+        query, sort = shirt_query(filters, after)
+        sort_field = sort[0][0]
+        if projection and sort_field != "_id":
+            # El cursor necesita el valor del campo de orden aunque no se haya pedido
+            projection = {**projection, sort_field: 1}
+
+        # Se pide un documento extra para saber si hay otra página
+        shirts_data = await coll.find(query, projection).sort(sort).limit(limit + 1).to_list()
 
-        logger.info(f"Shirts data: {shirts_data}")
-        return [Shirt(id=str(shirt['_id']), **shirt) for shirt in shirts_data]
+        next_cursor = None
+        if len(shirts_data) > limit:
+            shirts_data = shirts_data[:limit]
+            last = shirts_data[-1]
+            next_cursor = encode_cursor(last["_id"], sort_field, last.get(sort_field))
+
+        logger.info("Listed shirts", extra={"count": len(shirts_data), "has_next": next_cursor is not None})
+        if projection:
+            # Se quita el campo de orden añadido solo para el cursor
+            extra = sort_field if sort_field != "_id" and sort_field not in parse_projection(fields, SHIRT_FIELDS) else None
+            items = []
+            for shirt in shirts_data:
+                if extra:
+                    shirt.pop(extra, None)
+                items.append(document_to_dict(shirt))
+        else:
+            items = [Shirt.from_document(shirt) for shirt in shirts_data]
+        return {"items": items, "next_cursor": next_cursor}
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error al obtener camisetas: {str(e)}", exc_info=True)
+        logger.error("Error al obtener camisetas: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Error interno al obtener la lista de camisetas")
+
+
+async def stream_shirts(after: Optional[str] = None, fields: Optional[str] = None, filters: Optional[ShirtFilter] = None):
+    """Iterador asíncrono sobre las camisetas filtradas, sin cargarlas en memoria"""
+    coll = get_collection("shirts")
+    projection = parse_projection(fields, SHIRT_FIELDS)
+    query, sort = shirt_query(filters, after)
+    cursor = coll.find(query, projection).sort(sort).batch_size(STREAM_BATCH_SIZE)
+    return iter_documents(cursor)
+
+
+async def bulk_write_shirts(items: list, upsert: bool = False) -> BulkResult:
+    """Crea (o con upsert, crea/actualiza por id) un lote de camisetas con un solo bulk_write"""
+    results: list[Optional[BulkItemResult]] = [None] * len(items)
+    valid: list[tuple[int, Shirt]] = []
+    for index, item in enumerate(items):
+        try:
+            shirt = Shirt.model_validate(item)
+            validate_shirt(shirt)
+            valid.append((index, shirt))
+        except (ValidationError, HTTPException) as e:
+            results[index] = BulkItemResult(index=index, status="error", error=validation_message(e))
+
+    try:
+        # Todos los team_id del lote se resuelven con una sola consulta $in
+        existing_teams = await team_index.existing({shirt.team_id for _, shirt in valid})
+
+        operations, written = [], []
+        for index, shirt in valid:
+            if shirt.team_id not in existing_teams:
+                results[index] = BulkItemResult(index=index, status="error", error="El equipo no existe.")
+                continue
+            shirt_dict = shirt.model_dump(exclude={"id"})
+            if upsert and shirt.id:
+                if not ObjectId.is_valid(shirt.id):
+                    results[index] = BulkItemResult(index=index, status="error", error="ID no válido.")
+                    continue
+                operations.append(UpdateOne({"_id": ObjectId(shirt.id)}, {"$set": shirt_dict}, upsert=True))
+                written.append((index, shirt.id, True))
+            else:
+                shirt_dict["_id"] = ObjectId()
+                operations.append(InsertOne(shirt_dict))
+                written.append((index, str(shirt_dict["_id"]), False))
+
+        upserted, errors = await execute_bulk(get_collection("shirts"), operations)
+    except Exception as e:
+        logger.error("Error in shirts bulk write: %s", e)
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    versions.bump("shirts", *(shirt_id for _, shirt_id, _ in written))
+    cache = get_cache("shirts")
+    shirts_by_index = dict(valid)
+    for op_index, (index, shirt_id, is_upsert) in enumerate(written):
+        if op_index in errors:
+            continue
+        shirt = shirts_by_index[index]
+        search_index.set_shirt(shirt_id, shirt.name, shirt.description, shirt.team_id)
+        if is_upsert:
+            await cache.delete(shirt_id)
+    return collect_results(results, written, upserted, errors)
+
+
+async def search_shirts(q: str, limit: int = 20) -> list[Shirt]:
+    """Camisetas más relevantes para ``q``; el índice en memoria ordena y Mongo hidrata con un $in"""
+    shirt_ids = search_index.search(q, limit)
+    if not shirt_ids:
+        return []
+    try:
+        docs = await get_collection("shirts").find({"_id": {"$in": [ObjectId(s) for s in shirt_ids]}}).to_list()
+    except Exception as e:
+        logger.error("Error searching shirts: %s", e)
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    by_id = {str(doc["_id"]): doc for doc in docs}
+    # Se conserva el orden de relevancia; los ids borrados en otra instancia se omiten
+    return [Shirt.from_document(by_id[shirt_id]) for shirt_id in shirt_ids if shirt_id in by_id]
+
+
+def autocomplete_shirts(q: str, limit: int = 10) -> list[ShirtSuggestion]:
+    """Sugerencias por prefijo servidas solo desde memoria"""
+    return [ShirtSuggestion(**suggestion) for suggestion in search_index.autocomplete(q, limit)]
+
+
+async def get_shirts_by_ids(ids: list[str]) -> list[BatchItem[Shirt]]:
+    """Varias camisetas por id, en el orden pedido y con found=false para las que no existen"""
+    try:
+        return await fetch_by_ids("shirts", ids, Shirt.from_document)
+    except Exception as e:
+        logger.error("Error fetching shirts by id: %s", e)
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
@@ -2,9 +2,10 @@ import os
 import json
 import logging
 import firebase_admin
-import requests
 import base64
+import httpx
 from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
 from firebase_admin import credentials, auth as firebase_auth
 from dotenv import load_dotenv
 
@@ -13,14 +14,19 @@ from models.login import Login
 
 from utils.security import create_jwt_token
 from utils.mongodb import get_collection
+from utils.indexes import register_query
+from utils.http_client import FIREBASE_AUTH_URL, post_json
 
 load_dotenv()
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Consultas que emite este controlador (python -m utils.indexes explain)
+register_query("login", "users", {"email": "usuario@example.com"})
+
 
 def initialize_firebase():
+    """Inicializa firebase_admin una sola vez; lo llama el lifespan de la app al arrancar"""
     if firebase_admin._apps:
         return
 
@@ -40,18 +46,20 @@ def initialize_firebase():
             logger.info("Firebase initialized with JSON file")
 
     except Exception as e:
-        logger.error(f"Failed to initialize Firebase: {e}")
+        logger.error("Failed to initialize Firebase: %s", e)
         raise HTTPException(status_code=500, detail=f"Firebase configuration error: {str(e)}")
 
 
-initialize_firebase()
-
 async def create_user( user: User ) -> User:
 
+    # Sin efecto si el arranque ya lo inicializó; si falló, se reintenta aquí (y da 500)
+    initialize_firebase()
     user_record = {}
     try:
-        user_record = firebase_auth.create_user(
-            email=user.email
+        # El SDK de firebase es bloqueante; se ejecuta fuera del event loop
+        user_record = await run_in_threadpool(
+            firebase_auth.create_user
+            , email=user.email
             , password=user.password
         )
     except Exception as e:
@@ -72,28 +80,35 @@ async def create_user( user: User ) -> User:
         )
 
         user_dict = new_user.model_dump(exclude={"id", "password"})
-        inserted = coll.insert_one(user_dict)
+        inserted = await coll.insert_one(user_dict)
         new_user.id = str(inserted.inserted_id)
         new_user.password = "*********"  # Mask the password in the response
         return new_user
 
     except Exception as e:
-        firebase_auth.delete_user(user_record.uid)
-        logger.error(f"Error creating user: {str(e)}")
+        await run_in_threadpool(firebase_auth.delete_user, user_record.uid)
+        logger.error("Error creating user: %s", e)
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
 async def login(user: Login) -> dict:
     api_key = os.getenv("FIREBASE_API_KEY")
-    url = f"https://identitytoolkit.googleapis.com/v1/accounts:signInWithPassword?key={api_key}"
+    url = f"{FIREBASE_AUTH_URL}/v1/accounts:signInWithPassword"
     payload = {
         "email": user.email
         , "password": user.password
         , "returnSecureToken": True
     }  
 
-    response = requests.post(url, json=payload)
-    response_data = response.json()
+    try:
+        response = await post_json(url, payload, params={"key": api_key})
+        response_data = response.json()
+    except (httpx.HTTPError, ValueError) as e:
+        logger.error("Firebase sign-in request failed: %r", e)
+        raise HTTPException(
+            status_code=503
+            , detail="Servicio de autenticación no disponible"
+        )
 
     if "error" in response_data:
         raise HTTPException(
@@ -102,7 +117,7 @@ async def login(user: Login) -> dict:
         )
 
     coll = get_collection("users")
-    user_info = coll.find_one({ "email": user.email })
+    user_info = await coll.find_one({ "email": user.email })
 
     if not user_info:
         raise HTTPException(
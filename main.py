@@ -1,69 +1,202 @@
+# Se importa antes que nada: el arranque en frío se mide desde aquí (ver utils/startup.py)
+from utils.startup import FirstResponseMiddleware, startup_timer
+
+import os
 import uvicorn
 import logging
+from contextlib import asynccontextmanager
+
+from datetime import datetime, timezone
+from fastapi import APIRouter, FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+# El logging se configura antes de importar los módulos que registran al cargarse
+from utils.logging_config import setup_logging
+setup_logging()
 
-from fastapi import FastAPI, Request
-from controllers.user_controller import create_user, login
+from controllers.user_controller import create_user, login, initialize_firebase
+from controllers.shirt_controller import shirt_snapshot, warm_shirt_cache
+from controllers.futbol_team_controller import futbol_team_snapshot, warm_futbol_team_cache
 from models.user import User
 from models.login import Login
 from utils.security import validateuser, validateadmin
+from utils.cache import CACHE_TTL_SECONDS, CACHE_WARMUP_DOCUMENTS, cache_stats
+from utils.team_index import team_index
+from utils.search_index import search_index
+from utils.singleflight import singleflight_stats
+from utils.snapshot import CATALOG_SNAPSHOT
+from utils.conditional import VERSIONS_CHANGE_STREAM, versions
+from utils.health import health_prober
+from utils.http_client import close_http_client
+from utils.mongodb import WEB_CONCURRENCY, close_mongo_client, connect_mongo
+from utils.indexes import ENSURE_INDEXES_ON_STARTUP, ensure_indexes, explain_queries
+from utils.compression import CompressionMiddleware
+from utils.metrics import MetricsMiddleware, describe, register_collector, render as render_metrics
 
 # Importar routers
 from routes.futbol_team_routes import router as futbol_team_router
 from routes.shirt_routes import router as shirt_router
 
-app = FastAPI()
-
-# Add CORS.
-from fastapi.middleware.cors import CORSMiddleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Allow all origins for development; restrict in production
-    allow_credentials=True,
-    allow_methods=["*"],  # Allow all methods
-    allow_headers=["*"],  # Allow all headers
-)
-
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@app.get("/")
+router = APIRouter()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # uvicorn no acepta peticiones hasta que termina esta parte: lo lento se paga aquí
+    async with startup_timer.phase("firebase"):
+        try:
+            initialize_firebase()
+        except Exception as e:
+            # Solo lo necesita POST /users, que lo reintenta
+            logger.error("Firebase not initialized at startup: %s", e)
+    async with startup_timer.phase("mongo"):
+        try:
+            await connect_mongo()
+        except Exception as e:
+            logger.warning("MongoDB not connected at startup: %s", e)
+    if ENSURE_INDEXES_ON_STARTUP:
+        async with startup_timer.phase("indexes"):
+            try:
+                await ensure_indexes()
+            except Exception as e:
+                logger.warning("Indexes not ensured at startup: %s", e)
+    async with startup_timer.phase("team_index"):
+        try:
+            await team_index.load()
+        except Exception as e:
+            # Sin índice precargado las escrituras de camisetas consultan Mongo
+            logger.warning("Team index not preloaded: %s", e)
+    team_index.start_background_sync()
+    async with startup_timer.phase("search_index"):
+        try:
+            await search_index.load()
+        except Exception as e:
+            # Se irá llenando con las escrituras y la siguiente resincronización
+            logger.warning("Search index not preloaded: %s", e)
+    search_index.start_background_sync()
+    if CACHE_WARMUP_DOCUMENTS:
+        async with startup_timer.phase("cache_warmup"):
+            try:
+                await warm_futbol_team_cache(CACHE_WARMUP_DOCUMENTS)
+                await warm_shirt_cache(CACHE_WARMUP_DOCUMENTS)
+            except Exception as e:
+                logger.warning("Read caches not warmed up: %s", e)
+    if CATALOG_SNAPSHOT and WEB_CONCURRENCY > 1 and not VERSIONS_CHANGE_STREAM:
+        # Sin change streams un worker no se entera de lo que escriben los demás: serviría
+        # un catálogo desfasado hasta la siguiente recarga completa
+        logger.error("CATALOG_SNAPSHOT ignored: %s workers need VERSIONS_CHANGE_STREAM=true", WEB_CONCURRENCY)
+    elif CATALOG_SNAPSHOT:
+        # Si no carga, GET /shirts y /futbol_teams siguen yendo a Mongo hasta el siguiente cambio
+        async with startup_timer.phase("catalog_snapshot"):
+            await futbol_team_snapshot.load()
+            await shirt_snapshot.load()
+    if WEB_CONCURRENCY > 1 and not VERSIONS_CHANGE_STREAM:
+        # Cada proceso tiene sus versiones y su caché de lecturas: sin change streams no ve las
+        # escrituras de los demás hasta que caduca la entrada (CACHE_TTL_SECONDS)
+        logger.warning("Running %s workers without VERSIONS_CHANGE_STREAM: ETags and read caches may be stale "
+                       "for up to %ss", WEB_CONCURRENCY, CACHE_TTL_SECONDS)
+    versions.start_background_sync()
+    startup_timer.ready()
+    # El primer sondeo sale ya; /ready no dice "listo" hasta que Mongo ha contestado
+    health_prober.start_background_sync()
+    yield
+    await health_prober.stop()
+    await shirt_snapshot.stop()
+    await futbol_team_snapshot.stop()
+    await versions.stop()
+    await search_index.stop()
+    await team_index.stop()
+    await close_http_client()
+    await close_mongo_client()
+
+
+# Ayuda de las familias de _cache_metrics por prefijo; las claves de _STAT_COUNTERS solo crecen
+_STAT_HELP = {
+    "cache": "Caché de lecturas por colección",
+    "team_index": "Índice en memoria de los equipos existentes",
+    "search_index": "Índice de búsqueda en memoria",
+    "singleflight": "Lecturas simultáneas coalescidas por grupo",
+    "catalog_snapshot": "Catálogo serializado en memoria por colección",
+}
+_STAT_COUNTERS = {"hits", "misses", "evictions", "expirations", "fallbacks", "searches", "autocompletes",
+                  "calls", "coalesced", "timeouts", "errors", "rebuilds", "full_rebuilds"}
+
+
+def _stat(samples: list, prefix: str, key: str, labels: dict, value):
+    name = f"{prefix}_{key}"
+    describe(name, f"{_STAT_HELP[prefix]}: {key}", "counter" if key in _STAT_COUNTERS else "gauge")
+    samples.append((name, labels, value))
+
+
+def _cache_metrics():
+    samples = []
+    for cache, stats in cache_stats().items():
+        for key in ("hits", "misses", "evictions", "expirations", "size"):
+            if key in stats:
+                _stat(samples, "cache", key, {"cache": cache}, stats[key])
+    for key, value in team_index.stats().items():
+        _stat(samples, "team_index", key, {}, value)
+    for key, value in search_index.stats().items():
+        _stat(samples, "search_index", key, {}, value)
+    for group, stats in singleflight_stats().items():
+        for key, value in stats.items():
+            _stat(samples, "singleflight", key, {"group": group}, value)
+    for snapshot in (shirt_snapshot, futbol_team_snapshot):
+        for key, value in snapshot.stats().items():
+            _stat(samples, "catalog_snapshot", key, {"collection": snapshot.collection}, int(value))
+    return samples
+
+register_collector(_cache_metrics)
+
+@router.get("/")
 def read_root():
     return {"version": "0.0.0"}
 
-@app.get("/health")
+@router.get("/health")
 def health_check():
-    try:
-        return {
-            "status": "healthy", 
-            "timestamp": "2025-08-02", 
-            "service": "ventacamisetas-api",
-            "environment": "production"
-        }
-    except Exception as e:
-        return {"status": "unhealthy", "error": str(e)}
-
-@app.get("/ready")
+    """Liveness: siempre 200; el estado de las dependencias es el del último sondeo"""
+    report = health_prober.report()
+    degraded = any(check["status"] == "down" for check in report["checks"].values())
+    return {
+        "status": "degraded" if degraded else "healthy",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "service": "ventacamisetas-api",
+        "environment": "production",
+        **report,
+    }
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    """Métricas en formato de texto de Prometheus"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+@router.get("/ready")
 def readiness_check():
-    try:
-        from utils.mongodb import t_connection
-        db_status = t_connection()
-        return {
-            "status": "ready" if db_status else "not_ready",
-            "database": "connected" if db_status else "disconnected",
-            "service": "ventacamisetas-api"
-        }
-    except Exception as e:
-        return {"status": "not_ready", "error": str(e)}
-
-@app.post("/users")
+    """Readiness a partir del último sondeo en segundo plano (no consulta Mongo); 503 si no está lista"""
+    ready, reason = health_prober.readiness()
+    mongo = health_prober.checks["mongodb"]
+    body = {
+        "status": "ready" if ready else "not_ready",
+        "database": "connected" if mongo["status"] == "up" else "disconnected",
+        "service": "ventacamisetas-api",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        **health_prober.report(),
+    }
+    if not ready:
+        body["reason"] = reason
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+@router.post("/users")
 async def create_user_endpoint(user: User) -> User:
     return await create_user(user)
 
-@app.post("/login")
+@router.post("/login")
 async def login_access(log: Login) -> dict:
     return await login(log)
 
-@app.get("/exampleadmin")
+@router.get("/exampleadmin")
 @validateadmin
 async def example_admin(request: Request):
     return {
@@ -71,7 +204,7 @@ async def example_admin(request: Request):
         "admin": request.state.admin
     }
 
-@app.get("/exampleuser")
+@router.get("/exampleuser")
 @validateuser
 async def example_user(request: Request):
     return {
@@ -79,10 +212,59 @@ async def example_user(request: Request):
         "email": request.state.email
     }
 
-# Incluir routers de FootballTeam y Shirt
-app.include_router(futbol_team_router, tags=["⚽ Futbol Teams"])
-app.include_router(shirt_router, tags=["👕 Shirt"])
+@router.get("/cache/stats")
+@validateadmin
+async def cache_stats_endpoint(request: Request):
+    """Contadores de aciertos, fallos y expulsiones de las cachés de lectura"""
+    return {**cache_stats(), "team_index": team_index.stats(), "search_index": search_index.stats(),
+            "singleflight": singleflight_stats(),
+            "catalog_snapshot": {s.collection: s.stats() for s in (shirt_snapshot, futbol_team_snapshot)}}
+
+@router.get("/admin/indexes/explain")
+@validateadmin
+async def explain_indexes_endpoint(request: Request):
+    """Plan de ejecución de las consultas registradas; collscan=true indica que falta un índice"""
+    return await explain_queries()
+
+
+def create_app() -> FastAPI:
+    """Construye la app. ``uvicorn main:app`` usa la instancia del módulo;
+    ``uvicorn --factory main:create_app`` crea una nueva."""
+    app = FastAPI(lifespan=lifespan)
+
+    # Add CORS.
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # Allow all origins for development; restrict in production
+        allow_credentials=True,
+        allow_methods=["*"],  # Allow all methods
+        allow_headers=["*"],  # Allow all headers
+        expose_headers=["X-Next-Cursor", "ETag"],  # Cursor de paginación y versión de las respuestas
+    )
+    # Comprime con brotli/gzip según Accept-Encoding (las respuestas pequeñas van tal cual)
+    app.add_middleware(CompressionMiddleware)
+    # Envuelve a los anteriores para medir la petición completa
+    app.add_middleware(MetricsMiddleware)
+    # El más externo: anota la primera respuesta correcta (app_cold_start_seconds) y luego solo deja pasar
+    app.add_middleware(FirstResponseMiddleware)
+
+    app.include_router(router)
+    # Incluir routers de FootballTeam y Shirt
+    app.include_router(futbol_team_router, tags=["⚽ Futbol Teams"])
+    app.include_router(shirt_router, tags=["👕 Shirt"])
+    return app
+
+
+app = create_app()
 
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
\ No newline at end of file
+    port = int(os.getenv("PORT", "8000"))
+    # log_config=None: sin él uvicorn vuelve a poner sus StreamHandler síncronos (sin cola, JSON ni
+    # muestreo) en uvicorn y uvicorn.access; así usan los de setup_logging()
+    if WEB_CONCURRENCY > 1:
+        # Igual que `uvicorn main:app --workers N`: cada proceso importa la app desde cero y
+        # crea en su lifespan su cliente de Mongo (pool de max_pool_size()) y su app de Firebase
+        uvicorn.run("main:app", host="0.0.0.0", port=port, workers=WEB_CONCURRENCY, log_level="info", log_config=None)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=port, log_level="info", log_config=None)
@@ -0,0 +1,45 @@
+from pydantic import BaseModel, Field
+from typing import Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+class BulkItemResult(BaseModel):
+    index: int = Field(
+        description="Posición del elemento en el lote recibido"
+    )
+    status: str = Field(
+        description="Resultado del elemento",
+        examples=["created", "updated", "error"]
+    )
+    id: Optional[str] = Field(
+        default=None,
+        description="ID del documento creado o actualizado"
+    )
+    error: Optional[str] = Field(
+        default=None,
+        description="Motivo del fallo si status es error"
+    )
+
+class BulkResult(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    results: list[BulkItemResult]
+
+class BatchGetRequest(BaseModel):
+    ids: list[str] = Field(
+        description="IDs a consultar; la respuesta sigue este mismo orden",
+        min_length=1
+    )
+
+class BatchItem(BaseModel, Generic[T]):
+    id: str = Field(
+        description="ID pedido"
+    )
+    found: bool = Field(
+        description="False si el ID no existe o no es válido"
+    )
+    item: Optional[T] = Field(
+        default=None,
+        description="Documento encontrado (null si found es false)"
+    )
@@ -0,0 +1,38 @@
+import os
+
+from dotenv import load_dotenv
+from pydantic import BaseModel, ValidationInfo
+
+load_dotenv()
+
+# true: lo leído de Mongo pasa también por los validadores de Python que recalculan datos guardados
+# (p. ej. effective_price), como una petición; útil para comprobar los datos tras una migración
+MODEL_HYDRATION_STRICT = os.getenv("MODEL_HYDRATION_STRICT", "false").lower() == "true"
+
+# Contexto de validación de los documentos leídos de Mongo
+TRUSTED = {"trusted": True}
+
+
+def trusted(info: ValidationInfo) -> bool:
+    """Para los validadores de Python: el dato viene de Mongo y ya se validó al escribirse"""
+    return info.context is TRUSTED
+
+
+class DocumentModel(BaseModel):
+    """Modelo que se construye a partir de documentos de Mongo con ``from_document``.
+
+    No es un camino sin validar: pydantic-core comprueba y convierte todos los
+    campos igual que en una petición. Lo que ahorra es pasar por ``__init__`` con
+    kwargs y, en contexto ``TRUSTED``, los validadores de Python que recalculan
+    datos ya guardados (hoy solo ``effective_price`` de Shirt). Construir el modelo
+    sin validar desde Python (``model_construct`` o rellenando ``__dict__``) resulta
+    más lento que el validador compilado; ver ``benchmarks/bench_hydration.py``.
+    ``_id`` pasa a ``id`` y el resto de claves que no son campos se ignoran.
+    """
+
+    @classmethod
+    def from_document(cls, doc: dict, **extra):
+        values = {**doc, "id": str(doc["_id"]), **extra}
+        context = None if MODEL_HYDRATION_STRICT else TRUSTED
+        # El validador compilado directamente: model_validate solo añade comprobaciones en Python
+        return cls.__pydantic_validator__.validate_python(values, context=context)
@@ -1,8 +1,10 @@
 from pydantic import BaseModel, Field
 from typing import Optional
 from bson import ObjectId
+from models.document import DocumentModel
+from models.shirt import Shirt
 
-class FutbolTeam(BaseModel):
+class FutbolTeam(DocumentModel):
     id: Optional[str] = Field(
         default=None,
         description="ID único del equipo de fútbol"
@@ -20,4 +22,20 @@ class FutbolTeam(BaseModel):
         # Esto permite que Pydantic maneje ObjectId de MongoDB
         json_encoders = {
             ObjectId: str
-        }
\ No newline at end of file
+        }
+
+
+class FutbolTeamPatch(BaseModel):
+    """Cambios parciales de PATCH /futbol_teams/{team_id}: solo se modifican los campos enviados"""
+    name: Optional[str] = None
+    country: Optional[str] = None
+
+
+class FutbolTeamWithCount(FutbolTeam):
+    """Equipo de GET /futbol_teams?include=shirt_counts"""
+    shirt_count: int = Field(description="Número de camisetas del equipo")
+
+
+class FutbolTeamShirts(FutbolTeamWithCount):
+    """Equipo con una página de sus camisetas (GET /futbol_teams/{team_id}/shirts)"""
+    shirts: list[Shirt] = Field(description="Camisetas de la página, ordenadas por id")
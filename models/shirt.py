@@ -1,8 +1,11 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+import math
+from pydantic import BaseModel, Field, ValidationInfo, model_validator
+from typing import Literal, Optional
 from bson import ObjectId
+from pymongo import ASCENDING, IndexModel
+from models.document import DocumentModel, trusted
 
-class Shirt(BaseModel):
+class Shirt(DocumentModel):
     id: Optional[str] = Field(
         default=None,
         description="ID único de la camiseta"
@@ -37,11 +40,89 @@ class Shirt(BaseModel):
         description="Talla de la camiseta",
         examples=["S", "M", "L", "XL"]
     )
+    effective_price: Optional[float] = Field(
+        default=None,
+        description="Precio final con el descuento aplicado; lo calcula el servidor",
+        examples=[53.91]
+    )
+
+    @model_validator(mode="after")
+    def compute_effective_price(self, info: ValidationInfo):
+        # Se guarda en Mongo para poder ordenar y filtrar por él con índice. Lo leído de Mongo ya
+        # lo trae, salvo los documentos anteriores a `python -m utils.migrations effective_price`
+        if trusted(info) and self.effective_price is not None:
+            return self
+        self.effective_price = effective_price(self.price, self.discount)
+        return self
 
     class Config:
         json_encoders = {
             ObjectId: str
         }
 
+def effective_price(price: float, discount: Optional[float]) -> float:
+    """Precio con el descuento aplicado, redondeado al céntimo igual que ``EFFECTIVE_PRICE_EXPR``"""
+    return math.floor(price * (100 - (discount or 0)) + 0.5) / 100
+
+
+# El mismo cálculo como expresión de agregación, para los updates que no conocen
+# el precio y el descuento a la vez (PATCH) y para la migración de utils/migrations.py
+EFFECTIVE_PRICE_EXPR = {"$divide": [
+    {"$floor": {"$add": [
+        {"$multiply": ["$price", {"$subtract": [100, {"$ifNull": ["$discount", 0]}]}]},
+        0.5,
+    ]}},
+    100,
+]}
+
+class ShirtPatch(BaseModel):
+    """Cambios parciales de PATCH /shirts/{shirt_id}: solo se modifican los campos enviados"""
+    team_id: Optional[str] = None
+    name: Optional[str] = None
+    description: Optional[str] = None
+    image: Optional[str] = None
+    price: Optional[float] = Field(default=None, gt=0)
+    discount: Optional[float] = Field(default=None, ge=0, le=100)
+    size: Optional[str] = None
+
+class ShirtFilter(BaseModel):
+    """Filtros y orden de GET /shirts"""
+    team_id: Optional[str] = None
+    size: Optional[str] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    min_discount: Optional[float] = None
+    max_discount: Optional[float] = None
+    min_effective_price: Optional[float] = None
+    max_effective_price: Optional[float] = None
+    sort: Literal["id", "price", "discount", "name", "effective_price"] = "id"
+    order: Literal["asc", "desc"] = "asc"
+
+class ShirtSuggestion(BaseModel):
+    """Sugerencia de GET /shirts/autocomplete (una por nombre de camiseta y equipo)"""
+    id: str = Field(description="ID de una camiseta con este nombre")
+    name: str
+    team_id: str
+    team_name: str
+
 class DeleteMessage(BaseModel):
-    message: str
\ No newline at end of file
+    message: str
+
+# Índices de la colección shirts (se crean al arrancar, ver utils/indexes.py)
+# Los compuestos siguen la regla igualdad -> orden -> rango y terminan en _id,
+# el desempate de la paginación por cursor.
+SHIRT_INDEXES = [
+    # También cubre el conteo por team_id de delete_futbol_team (sustituye a team_id_1)
+    IndexModel([("team_id", ASCENDING), ("price", ASCENDING), ("_id", ASCENDING)], name="team_id_price"),
+    # Página de camisetas de un equipo ($lookup de GET /futbol_teams/{team_id}/shirts)
+    IndexModel([("team_id", ASCENDING), ("_id", ASCENDING)], name="team_id_id"),
+    IndexModel([("team_id", ASCENDING), ("size", ASCENDING), ("price", ASCENDING), ("_id", ASCENDING)], name="team_id_size_price"),
+    IndexModel([("size", ASCENDING), ("price", ASCENDING), ("_id", ASCENDING)], name="size_price"),
+    IndexModel([("price", ASCENDING), ("_id", ASCENDING)], name="price"),
+    IndexModel([("discount", ASCENDING), ("_id", ASCENDING)], name="discount"),
+    # sort=name (orden alfabético del catálogo)
+    IndexModel([("name", ASCENDING), ("_id", ASCENDING)], name="name"),
+    # "Ordenar por precio final" y "menos de 50 € con descuento"
+    IndexModel([("effective_price", ASCENDING), ("_id", ASCENDING)], name="effective_price"),
+    IndexModel([("team_id", ASCENDING), ("effective_price", ASCENDING), ("_id", ASCENDING)], name="team_id_effective_price"),
+]
@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from pydantic import BaseModel, Field, field_validator
 from typing import Optional
+from pymongo import ASCENDING, IndexModel
 import re
 
 class User(BaseModel):
@@ -52,4 +53,10 @@ class User(BaseModel):
             raise ValueError("La contraseña debe contener al menos un número.")
         if not re.search(r"[@$!%*?&]", value):
             raise ValueError("La contraseña debe contener al menos un carácter especial (@$!%*?&).")
-        return value
\ No newline at end of file
+        return value
+
+# Índices de la colección users (se crean al arrancar, ver utils/indexes.py)
+USER_INDEXES = [
+    # login busca por email; además no debe haber dos usuarios con el mismo email
+    IndexModel([("email", ASCENDING)], unique=True, name="email_unique"),
+]
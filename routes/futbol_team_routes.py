@@ -1,12 +1,26 @@
-from fastapi import APIRouter, HTTPException, Request
-from models.futbol_team import FutbolTeam
+from typing import Literal, Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from models.futbol_team import FutbolTeam, FutbolTeamPatch, FutbolTeamShirts, FutbolTeamWithCount
 from controllers.futbol_team_controller import (
     create_futbol_team,
     get_futbol_team,
     update_futbol_team,
+    patch_futbol_team,
     delete_futbol_team,
-    list_futbol_teams  
+    list_futbol_teams,
+    stream_futbol_teams,
+    bulk_write_futbol_teams,
+    get_futbol_team_shirts,
+    list_futbol_teams_with_counts,
+    get_futbol_teams_by_ids,
+    futbol_team_snapshot,
 )
+from models.bulk import BatchGetRequest, BatchItem, BulkResult
+from utils.bulk import parse_ids, read_bulk_payload
+from utils.conditional import conditional
+from utils.responses import FastJSONResponse
+from utils.pagination import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, json_array_stream
 from utils.security import validateadmin, validateuser
 
 router = APIRouter()
@@ -17,22 +31,110 @@ async def create_futbol_team_endpoint(request: Request, team: FutbolTeam) -> Fut
     """Crear un nuevo equipo de fútbol"""
     return await create_futbol_team(team)
 
-@router.get("/futbol_teams", response_model=list[FutbolTeam], tags=["⚽ Futbol Teams"])
-async def list_futbol_teams_endpoint() -> list[FutbolTeam]:
-    """Obtener todos los equipos de fútbol"""
-    return list_futbol_teams()  
+# Las rutas /futbol_teams/bulk van antes que /futbol_teams/{team_id}
+@router.post("/futbol_teams/bulk", response_model=BulkResult, tags=["⚽ Futbol Teams"])
+@validateuser
+async def create_futbol_teams_bulk_endpoint(request: Request) -> BulkResult:
+    """Crear equipos de fútbol en lote (array JSON o NDJSON)"""
+    return await bulk_write_futbol_teams(await read_bulk_payload(request))
+
+@router.put("/futbol_teams/bulk", response_model=BulkResult, tags=["⚽ Futbol Teams"])
+@validateuser
+async def upsert_futbol_teams_bulk_endpoint(request: Request) -> BulkResult:
+    """Crear o actualizar equipos de fútbol en lote; los elementos con id se actualizan"""
+    return await bulk_write_futbol_teams(await read_bulk_payload(request), upsert=True)
+
+@router.post("/futbol_teams/batch", response_model=list[BatchItem[FutbolTeam]], tags=["⚽ Futbol Teams"])
+async def read_futbol_teams_batch_endpoint(body: BatchGetRequest):
+    """Varios equipos por id (para listas largas); igual que GET /futbol_teams?ids=a,b,c"""
+    return await get_futbol_teams_by_ids(parse_ids(body.ids))
+
+@router.get(
+    "/futbol_teams",
+    response_model=list[FutbolTeamWithCount] | list[FutbolTeam] | list[BatchItem[FutbolTeam]],
+    tags=["⚽ Futbol Teams"],
+)
+async def list_futbol_teams_endpoint(
+    request: Request,
+    response: Response,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    after: Optional[str] = Query(None, description="Cursor devuelto en la cabecera X-Next-Cursor"),
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por comas"),
+    stream: bool = Query(False, description="Devuelve todos los equipos como un array JSON en streaming"),
+    include: Optional[Literal["shirt_counts"]] = Query(None, description="shirt_counts añade el número de camisetas de cada equipo"),
+    ids: Optional[str] = Query(None, description="IDs separados por comas; devuelve esos equipos en ese orden"),
+):
+    """Obtener los equipos de fútbol paginados por cursor"""
+    if ids and (stream or fields or after or include):
+        raise HTTPException(status_code=400, detail="ids no se puede combinar con stream, fields, after ni include")
+    if include and (stream or fields):
+        raise HTTPException(status_code=400, detail="include no se puede combinar con stream ni fields")
+    related = ("shirts",) if include else ()
+    cache_headers, not_modified = conditional(request, "futbol_teams", related=related)
+    if not_modified:
+        return not_modified
+    if ids:
+        response.headers.update(cache_headers)
+        return await get_futbol_teams_by_ids(parse_ids(ids))
+    if include:
+        page = await list_futbol_teams_with_counts(limit, after)
+        headers = {**cache_headers, "X-Next-Cursor": page["next_cursor"]} if page["next_cursor"] else cache_headers
+        response.headers.update(headers)
+        return page["items"]
+    if stream:
+        documents = await stream_futbol_teams(after, fields)
+        return StreamingResponse(json_array_stream(documents), media_type="application/json", headers=cache_headers)
+    if not fields:
+        # Sin proyección la página sale ya serializada de memoria si el catálogo está al día
+        snapshot = futbol_team_snapshot.response(request, after, limit, cache_headers)
+        if snapshot is not None:
+            return snapshot
+
+    page = await list_futbol_teams(limit, after, fields)
+    headers = {**cache_headers, "X-Next-Cursor": page["next_cursor"]} if page["next_cursor"] else cache_headers
+    if fields:
+        return FastJSONResponse(page["items"], headers=headers)
+    response.headers.update(headers)
+    return page["items"]
 
 @router.get("/futbol_teams/{team_id}", response_model=FutbolTeam, tags=["⚽ Futbol Teams"])
-async def get_futbol_team_endpoint(team_id: str) -> FutbolTeam:
+async def get_futbol_team_endpoint(request: Request, response: Response, team_id: str) -> FutbolTeam:
     """Obtener un equipo de fútbol por ID"""
+    cache_headers, not_modified = conditional(request, "futbol_teams", team_id)
+    if not_modified:
+        return not_modified
+    response.headers.update(cache_headers)
     return await get_futbol_team(team_id)
 
+@router.get("/futbol_teams/{team_id}/shirts", response_model=FutbolTeamShirts, tags=["⚽ Futbol Teams"])
+async def get_futbol_team_shirts_endpoint(
+    request: Request,
+    response: Response,
+    team_id: str,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    after: Optional[str] = Query(None, description="Cursor devuelto en la cabecera X-Next-Cursor"),
+) -> FutbolTeamShirts:
+    """Equipo con su número de camisetas y una página de ellas, en una sola consulta"""
+    cache_headers, not_modified = conditional(request, "futbol_teams", team_id, related=("shirts",))
+    if not_modified:
+        return not_modified
+    page = await get_futbol_team_shirts(team_id, limit, after)
+    headers = {**cache_headers, "X-Next-Cursor": page["next_cursor"]} if page["next_cursor"] else cache_headers
+    response.headers.update(headers)
+    return page["item"]
+
 @router.put("/futbol_teams/{team_id}", response_model=FutbolTeam, tags=["⚽ Futbol Teams"])
 @validateuser
 async def update_futbol_team_endpoint(request: Request, team_id: str, team: FutbolTeam) -> FutbolTeam:
     """Actualizar un equipo de fútbol"""
     return await update_futbol_team(team_id, team)
 
+@router.patch("/futbol_teams/{team_id}", response_model=FutbolTeam, tags=["⚽ Futbol Teams"])
+@validateuser
+async def patch_futbol_team_endpoint(request: Request, team_id: str, team: FutbolTeamPatch) -> FutbolTeam:
+    """Modificar solo los campos enviados de un equipo"""
+    return await patch_futbol_team(team_id, team)
+
 @router.delete("/futbol_teams/{team_id}", response_model=dict, tags=["⚽ Futbol Teams"])
 @validateuser
 async def delete_futbol_team_endpoint(request: Request, team_id: str) -> dict:
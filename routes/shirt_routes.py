@@ -1,6 +1,13 @@
-from fastapi import APIRouter, Request
-from controllers.shirt_controller import create_shirt, get_shirt, update_shirt, delete_shirt, list_shirts
-from models.shirt import Shirt, DeleteMessage
+from typing import Literal, Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from controllers.shirt_controller import create_shirt, get_shirt, update_shirt, patch_shirt, delete_shirt, list_shirts, stream_shirts, bulk_write_shirts, search_shirts, autocomplete_shirts, get_shirts_by_ids, shirt_snapshot
+from models.bulk import BatchGetRequest, BatchItem, BulkResult
+from models.shirt import Shirt, ShirtFilter, ShirtPatch, ShirtSuggestion, DeleteMessage
+from utils.bulk import parse_ids, read_bulk_payload
+from utils.conditional import conditional
+from utils.responses import FastJSONResponse
+from utils.pagination import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX, json_array_stream
 
 from utils.security import validateadmin, validateuser
 
@@ -14,11 +21,54 @@ async def create_new_shirt(request: Request, shirt: Shirt) -> Shirt:
     return await create_shirt(shirt)
 
 
+# Las rutas /shirts/bulk, /search y /autocomplete van antes que /shirts/{shirt_id} para que no se tomen como id
+@router.post("/shirts/bulk", response_model=BulkResult, tags=["👕 Shirt"])
+@validateuser
+async def create_shirts_bulk(request: Request) -> BulkResult:
+    """Crear camisetas en lote (array JSON o NDJSON); devuelve el resultado de cada elemento"""
+    return await bulk_write_shirts(await read_bulk_payload(request))
+
+
+@router.put("/shirts/bulk", response_model=BulkResult, tags=["👕 Shirt"])
+@validateuser
+async def upsert_shirts_bulk(request: Request) -> BulkResult:
+    """Crear o actualizar camisetas en lote; los elementos con id se actualizan (o se crean con ese id)"""
+    return await bulk_write_shirts(await read_bulk_payload(request), upsert=True)
+
+
+@router.post("/shirts/batch", response_model=list[BatchItem[Shirt]], tags=["👕 Shirt"])
+async def read_shirts_batch(body: BatchGetRequest):
+    """Varias camisetas por id (para listas largas); igual que GET /shirts?ids=a,b,c"""
+    return await get_shirts_by_ids(parse_ids(body.ids))
+
+
+@router.get("/shirts/search", response_model=list[Shirt], tags=["👕 Shirt"])
+async def search_shirts_endpoint(
+    q: str = Query(..., min_length=1, max_length=200, description="Texto a buscar en camisetas y equipos"),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Búsqueda por relevancia en nombre y descripción de la camiseta y nombre y país del equipo"""
+    return await search_shirts(q, limit)
+
+
+@router.get("/shirts/autocomplete", response_model=list[ShirtSuggestion], tags=["👕 Shirt"])
+async def autocomplete_shirts_endpoint(
+    q: str = Query(..., min_length=1, max_length=100, description="Texto escrito hasta ahora"),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """Sugerencias mientras se escribe; la última palabra se trata como prefijo"""
+    return autocomplete_shirts(q, limit)
+
+
 
 
 
 @router.get("/shirts/{shirt_id}", response_model=Shirt, tags=["👕 Shirt"])
-async def read_shirt(shirt_id: str):
+async def read_shirt(request: Request, response: Response, shirt_id: str):
+    cache_headers, not_modified = conditional(request, "shirts", shirt_id)
+    if not_modified:
+        return not_modified
+    response.headers.update(cache_headers)
     return await get_shirt(shirt_id)
 
 
@@ -31,6 +81,13 @@ async def update_existing_shirt(request: Request, shirt_id: str, shirt: Shirt)->
     return await update_shirt(shirt_id, shirt)
 
 
+@router.patch("/shirts/{shirt_id}", response_model=Shirt, tags=["👕 Shirt"])
+@validateuser
+async def patch_existing_shirt(request: Request, shirt_id: str, shirt: ShirtPatch) -> Shirt:
+    """Modificar solo los campos enviados (p. ej. {"price": 59.9})"""
+    return await patch_shirt(shirt_id, shirt)
+
+
 
 
 
@@ -43,6 +100,54 @@ async def remove_shirt(request: Request, shirt_id: str)-> Shirt:
 
 
 
-@router.get("/shirts", response_model=list[Shirt], tags=["👕 Shirt"])
-async def read_shirts():
-    return await list_shirts()
+@router.get("/shirts", response_model=list[Shirt] | list[BatchItem[Shirt]], tags=["👕 Shirt"])
+async def read_shirts(
+    request: Request,
+    response: Response,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    after: Optional[str] = Query(None, description="Cursor devuelto en la cabecera X-Next-Cursor"),
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por comas"),
+    stream: bool = Query(False, description="Devuelve todas las camisetas como un array JSON en streaming"),
+    team_id: Optional[str] = Query(None, description="Solo camisetas de este equipo"),
+    size: Optional[str] = Query(None, description="Talla", examples=["M"]),
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    min_discount: Optional[float] = Query(None, ge=0, le=100),
+    max_discount: Optional[float] = Query(None, ge=0, le=100),
+    min_effective_price: Optional[float] = Query(None, ge=0, description="Precio final (con descuento) mínimo"),
+    max_effective_price: Optional[float] = Query(None, ge=0, description="Precio final (con descuento) máximo"),
+    sort: Literal["id", "price", "discount", "name", "effective_price"] = Query("id", description="Campo de orden"),
+    order: Literal["asc", "desc"] = Query("asc"),
+    ids: Optional[str] = Query(None, description="IDs separados por comas; devuelve esas camisetas en ese orden"),
+):
+    if ids and (stream or fields or after):
+        raise HTTPException(status_code=400, detail="ids no se puede combinar con stream, fields ni after")
+    filters = ShirtFilter(
+        team_id=team_id, size=size,
+        min_price=min_price, max_price=max_price,
+        min_discount=min_discount, max_discount=max_discount,
+        min_effective_price=min_effective_price, max_effective_price=max_effective_price,
+        sort=sort, order=order,
+    )
+    cache_headers, not_modified = conditional(request, "shirts")
+    if not_modified:
+        return not_modified
+    if ids:
+        response.headers.update(cache_headers)
+        return await get_shirts_by_ids(parse_ids(ids))
+    if stream:
+        documents = await stream_shirts(after, fields, filters)
+        return StreamingResponse(json_array_stream(documents), media_type="application/json", headers=cache_headers)
+    if not fields and filters == ShirtFilter():
+        # Sin filtros ni proyección la página sale ya serializada de memoria si el catálogo está al día
+        snapshot = shirt_snapshot.response(request, after, limit, cache_headers)
+        if snapshot is not None:
+            return snapshot
+
+    page = await list_shirts(limit, after, fields, filters)
+    headers = {**cache_headers, "X-Next-Cursor": page["next_cursor"]} if page["next_cursor"] else cache_headers
+    if fields:
+        # Con proyección los documentos son parciales y no encajan en el modelo Shirt
+        return FastJSONResponse(page["items"], headers=headers)
+    response.headers.update(headers)
+    return page["items"]
@@ -0,0 +1,72 @@
+import asyncio
+
+from bson import ObjectId
+from pymongo.results import BulkWriteResult
+
+import controllers.shirt_controller as shirt_controller
+import utils.bulk as bulk
+from utils.cache import LRUTTLCache
+from utils.conditional import Versions
+from utils.search_index import SearchIndex
+from utils.team_index import team_index
+
+
+def shirt_item(**fields) -> dict:
+    return {"team_id": "t1", "name": "n", "description": "d", "image": "i", "price": 59.9, "size": "M", **fields}
+
+
+class FakeShirts:
+    def __init__(self):
+        self.operations = []
+
+    async def bulk_write(self, operations, ordered=True):
+        self.operations.extend(operations)
+        return BulkWriteResult({"upserted": []}, True)
+
+
+def test_bulk_item_errors_do_not_fail_the_batch(monkeypatch):
+    shirts, cache = FakeShirts(), LRUTTLCache()
+    monkeypatch.setattr(shirt_controller, "get_collection", lambda name: shirts)
+    # Instancias nuevas: el test no toca el índice, las versiones ni la caché del módulo
+    monkeypatch.setattr(shirt_controller, "search_index", SearchIndex())
+    monkeypatch.setattr(shirt_controller, "versions", Versions())
+    monkeypatch.setattr(shirt_controller, "get_cache", lambda name: cache)
+
+    async def existing(team_ids):
+        return set(team_ids)
+
+    monkeypatch.setattr(team_index, "existing", existing)
+    items = [shirt_item(discount=None), shirt_item(discount=150), shirt_item(discount=10)]
+    result = asyncio.run(shirt_controller.bulk_write_shirts(items))
+    assert [item.status for item in result.results] == ["created", "error", "created"]
+    assert len(shirts.operations) == 2
+    # discount null es "sin descuento"
+    assert shirts.operations[0]._doc["effective_price"] == 59.9
+
+def test_fetch_by_ids_does_not_cache_documents_written_meanwhile(monkeypatch):
+    versions, cache = Versions(), LRUTTLCache()
+    monkeypatch.setattr(bulk, "versions", versions)
+    monkeypatch.setattr(bulk, "get_cache", lambda name: cache)
+    fresh, written = str(ObjectId()), str(ObjectId())
+
+    class Cursor:
+        async def to_list(self):
+            # Un PUT sobre `written` termina mientras se espera al $in
+            versions.bump("shirts", written)
+            await cache.set(written, {"name": "nuevo"})
+            return [{"_id": ObjectId(fresh), "name": "a"}, {"_id": ObjectId(written), "name": "viejo"}]
+
+    class Collection:
+        def find(self, query):
+            return Cursor()
+
+    monkeypatch.setattr(bulk, "get_collection", lambda name: Collection())
+
+    async def scenario():
+        items = await bulk.fetch_by_ids("shirts", [fresh, written], lambda doc: {"name": doc["name"]})
+        return items, await cache.get(fresh), await cache.get(written)
+
+    items, cached_fresh, cached_written = asyncio.run(scenario())
+    assert [item.found for item in items] == [True, True]
+    assert cached_fresh == {"name": "a"}
+    assert cached_written == {"name": "nuevo"}, "No debe pisar lo escrito por el PUT"
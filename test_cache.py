@@ -0,0 +1,60 @@
+import asyncio
+
+import utils.cache as cache_module
+from utils.cache import LRUTTLCache
+from utils.conditional import Versions
+
+
+def test_lru_eviction():
+    async def scenario():
+        cache = LRUTTLCache(maxsize=2, ttl=60)
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        assert await cache.get("a") == 1  # "a" pasa a ser la más reciente
+        await cache.set("c", 3)
+        assert await cache.get("b") is None, "Debió expulsarse la entrada menos usada"
+        assert await cache.get("a") == 1
+        return cache.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+
+def test_ttl_expiration():
+    async def scenario():
+        cache = LRUTTLCache(maxsize=10, ttl=0)
+        await cache.set("a", 1)
+        return await cache.get("a"), cache.stats()
+
+    value, stats = asyncio.run(scenario())
+    assert value is None, "La entrada debió expirar"
+    assert stats["expirations"] == 1
+
+def test_delete_invalidates():
+    async def scenario():
+        cache = LRUTTLCache()
+        await cache.set("a", 1)
+        await cache.delete("a")
+        return await cache.get("a")
+
+    assert asyncio.run(scenario()) is None
+
+def test_version_bumps_invalidate(monkeypatch):
+    versions = Versions()
+    versions.subscribe(cache_module.invalidate)
+    monkeypatch.setattr(cache_module, "_caches", {})
+
+    async def scenario():
+        cache = cache_module.get_cache("shirts")
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        # Escritura de otra instancia que llega por el change stream
+        versions.bump("shirts", "a")
+        await asyncio.sleep(0)
+        first = (await cache.get("a"), await cache.get("b"))
+        versions.bump("shirts")
+        await asyncio.sleep(0)
+        return first, await cache.get("b")
+
+    assert asyncio.run(scenario()) == ((None, 2), None)
@@ -0,0 +1,24 @@
+from utils.conditional import Versions, _matches, parse_cache_control
+
+
+def test_versions_bump():
+    versions = Versions(max_documents=2)
+    assert versions.document("shirts", "a") == 0
+    versions.bump("shirts", "a")
+    versions.bump("shirts", "b")
+    assert (versions.collection("shirts"), versions.document("shirts", "a")) == (2, 1)
+    assert versions.document("futbol_teams", "a") == 0, "Cada colección lleva su propia versión"
+    versions.bump("shirts", "c")  # Supera el máximo y compacta
+    assert versions.document("shirts", "a") == 3, "Un documento olvidado no puede volver a una versión anterior"
+
+def test_if_none_match():
+    assert _matches('"x-1"', '"x-1"')
+    assert _matches('"x-0", W/"x-1"', '"x-1"')
+    assert not _matches('"x-0"', '"x-1"')
+    assert not _matches("*", '"x-1"')
+
+def test_parse_cache_control():
+    assert parse_cache_control("/shirts=public, max-age=30;/futbol_teams=no-store") == {
+        "/shirts": "public, max-age=30",
+        "/futbol_teams": "no-store",
+    }
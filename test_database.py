@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 from utils.mongodb import get_mongo_client, t_connection, get_collection
 import os
@@ -14,7 +15,7 @@ def test_env_variables():
 
 def test_connect():
     try:
-        connection_result = t_connection()
+        connection_result = asyncio.run(t_connection())
         assert connection_result is True, "La conexion a la BD Fallo"
     except Exception as e:
         pytest.fail( f"Error en la conexion a MongoDB { str(e) } " )
@@ -31,4 +32,4 @@ def test_get_collection():
         coll_users = get_collection("users")
         assert coll_users is not None, "Error al obtener la collection de users"
     except Exception as e:
-        pytest.fail( f"Error en el llamado del cliente { str(e) } " )
\ No newline at end of file
+        pytest.fail( f"Error en el llamado del cliente { str(e) } " )
@@ -0,0 +1,36 @@
+import pytest
+from bson import ObjectId
+from pydantic import ValidationError
+
+import models.document as document
+from models.futbol_team import FutbolTeamShirts
+from models.shirt import Shirt
+
+
+def shirt_doc(**fields) -> dict:
+    return {"_id": ObjectId(), "team_id": "t", "name": "n", "description": "d", "image": "i",
+            "price": 59.9, "discount": 10, "size": "M", "effective_price": 53.91, **fields}
+
+
+def test_trusted_matches_validated():
+    doc = shirt_doc()
+    trusted = Shirt.from_document(doc)
+    assert trusted.model_dump() == Shirt(id=str(doc["_id"]), **doc).model_dump()
+    assert "_id" not in trusted.__dict__
+    # Lo guardado no se recalcula
+    assert Shirt.from_document(shirt_doc(effective_price=50.0)).effective_price == 50.0
+    # Documento anterior a la migración de effective_price
+    legacy = shirt_doc()
+    del legacy["effective_price"]
+    assert Shirt.from_document(legacy).effective_price == 53.91
+
+def test_nested_and_extra_fields():
+    team = {"_id": ObjectId(), "name": "Real Madrid", "country": "España", "shirt_count": 1, "shirts": [shirt_doc()]}
+    item = FutbolTeamShirts.from_document(team, shirts=[Shirt.from_document(s) for s in team["shirts"]])
+    assert item.shirts[0].id == str(team["shirts"][0]["_id"])
+
+def test_strict_mode_revalidates(monkeypatch):
+    monkeypatch.setattr(document, "MODEL_HYDRATION_STRICT", True)
+    with pytest.raises(ValidationError):
+        Shirt.from_document(shirt_doc(price=-1))
+    assert Shirt.from_document(shirt_doc(effective_price=50.0)).effective_price == 53.91
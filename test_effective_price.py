@@ -0,0 +1,16 @@
+from models.shirt import Shirt, effective_price
+
+
+def shirt(**fields) -> Shirt:
+    return Shirt(**{"team_id": "t", "name": "n", "description": "d", "image": "i", "size": "M", **fields})
+
+
+def test_effective_price_rounds_to_cents():
+    assert effective_price(80.0, 25) == 60.0
+    assert effective_price(59.9, 10) == 53.91
+    assert effective_price(49.9, None) == 49.9
+
+def test_model_computes_it_and_ignores_the_client_value():
+    assert shirt(price=59.9, discount=10, effective_price=1).effective_price == 53.91
+    # Documentos guardados antes de la migración
+    assert shirt(price=80.0).effective_price == 80.0
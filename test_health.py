@@ -0,0 +1,39 @@
+import asyncio
+
+from utils.health import HealthProber
+from utils.startup import startup_timer
+
+
+async def ok():
+    pass
+
+async def fail():
+    raise RuntimeError("connection refused")
+
+async def slow():
+    await asyncio.sleep(1)
+
+
+def test_probe_records_state():
+    prober = HealthProber({"mongodb": ok, "firebase": fail}, timeout=0.5)
+    asyncio.run(prober.probe())
+    assert prober.checks["mongodb"]["status"] == "up"
+    assert prober.checks["mongodb"]["last_success_at"] == prober.checks["mongodb"]["checked_at"]
+    assert prober.checks["firebase"]["status"] == "down"
+    assert prober.checks["firebase"]["error"] == "connection refused"
+    assert prober.checks["firebase"]["last_success_at"] is None
+
+    asyncio.run(prober.probe())
+    assert prober.checks["firebase"]["consecutive_failures"] == 2
+
+def test_readiness_depends_on_mongo_only():
+    startup_timer.ready_seconds = startup_timer.ready_seconds or 0.1
+    prober = HealthProber({"mongodb": ok, "firebase": fail})
+    assert prober.readiness() == (False, "mongodb unknown"), "Sin sondeo todavía no está lista"
+    asyncio.run(prober.probe())
+    assert prober.readiness() == (True, "")
+
+    prober = HealthProber({"mongodb": slow}, timeout=0.05)
+    asyncio.run(prober.probe())
+    assert prober.checks["mongodb"]["status"] == "down", "Un ping que no contesta a tiempo cuenta como caído"
+    assert prober.readiness()[0] is False
@@ -0,0 +1,19 @@
+import utils.metrics as metrics
+
+
+def test_collector_families_are_grouped_with_headers(monkeypatch):
+    monkeypatch.setattr(metrics, "_metrics", [])
+    monkeypatch.setattr(metrics, "_collectors", [])
+    monkeypatch.setattr(metrics, "_families", {})
+    metrics.describe("cache_hits", "Aciertos", "counter")
+    metrics.register_collector(lambda: [("cache_hits", {"cache": "a"}, 1), ("cache_size", {"cache": "a"}, 2)])
+    metrics.register_collector(lambda: [("cache_hits", {"cache": "b"}, 3)])
+    assert metrics.render().splitlines() == [
+        "# HELP cache_hits Aciertos",
+        "# TYPE cache_hits counter",
+        'cache_hits{cache="a"} 1',
+        'cache_hits{cache="b"} 3',
+        "# HELP cache_size cache_size",
+        "# TYPE cache_size gauge",
+        'cache_size{cache="a"} 2',
+    ]
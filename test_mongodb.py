@@ -0,0 +1,21 @@
+import logging
+
+import utils.mongodb as mongodb
+from utils.mongodb import max_pool_size
+
+
+def test_max_pool_size_per_worker(monkeypatch):
+    monkeypatch.setattr(mongodb, "MONGO_MAX_POOL_SIZE", 0)
+    # 500 conexiones entre 4 workers, con 2 de monitorización por nodo (3 nodos) en cada uno
+    assert max_pool_size(budget=500, workers=4, servers=3) == 119
+    assert max_pool_size(budget=0, workers=4, servers=3) == 100, "Sin presupuesto se usa el valor del driver"
+
+def test_budget_too_small_warns(monkeypatch, caplog):
+    monkeypatch.setattr(mongodb, "MONGO_MAX_POOL_SIZE", 0)
+    with caplog.at_level(logging.WARNING, logger="utils.mongodb"):
+        assert max_pool_size(budget=10, workers=8, servers=3) == 1, "Nunca menos de una conexión"
+    assert "MONGO_CONNECTION_BUDGET=10 is too small" in caplog.text
+
+def test_manual_pool_size_wins(monkeypatch):
+    monkeypatch.setattr(mongodb, "MONGO_MAX_POOL_SIZE", 20)
+    assert max_pool_size(budget=500, workers=4, servers=3) == 20
@@ -0,0 +1,57 @@
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from utils.pagination import decode_cursor, encode_cursor, keyset_filter, parse_projection, sort_spec
+
+
+def test_cursor_roundtrip():
+    last_id = ObjectId()
+    cursor = encode_cursor(last_id)
+    assert decode_cursor(cursor) == last_id, "El cursor no conserva el _id"
+    assert keyset_filter(cursor) == {"_id": {"$gt": last_id}}
+
+def test_invalid_cursor():
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor("no-es-un-cursor")
+    assert exc.value.status_code == 400
+
+def test_projection():
+    assert parse_projection(None, {"name"}) is None
+    assert parse_projection("name, price", {"name", "price"}) == {"name": 1, "price": 1}
+    with pytest.raises(HTTPException):
+        parse_projection("name,secret", {"name"})
+
+def test_sorted_cursor():
+    last_id = ObjectId()
+    cursor = encode_cursor(last_id, "price", 49.9)
+    assert keyset_filter(cursor, "price", -1) == {
+        "$or": [{"price": {"$lt": 49.9}}, {"price": 49.9, "_id": {"$lt": last_id}}, {"price": None}]
+    }
+    with pytest.raises(HTTPException):
+        keyset_filter(cursor, "discount")
+
+def test_sorted_cursor_with_nulls():
+    last_id = ObjectId()
+    cursor = encode_cursor(last_id, "discount", None)
+    assert keyset_filter(cursor, "discount") == {
+        "$or": [{"discount": None, "_id": {"$gt": last_id}}, {"discount": {"$ne": None}}]
+    }
+    assert keyset_filter(cursor, "discount", -1) == {"discount": None, "_id": {"$lt": last_id}}
+    # Descendente: tras los valores vienen los null
+    assert {"discount": None} in keyset_filter(encode_cursor(last_id, "discount", 10), "discount", -1)["$or"]
+
+@pytest.mark.parametrize("direction", [1, -1])
+def test_paging_through_null_sort_values(direction):
+    mongomock = pytest.importorskip("mongomock")
+    coll = mongomock.MongoClient().db.shirts
+    coll.insert_many([{"discount": None}, {}, {"discount": 10}, {"discount": 20}, {"discount": None}])
+    seen, after = [], None
+    while True:
+        query = keyset_filter(after, "discount", direction)
+        page = list(coll.find(query).sort(sort_spec("discount", direction)).limit(2))
+        seen.extend(doc["_id"] for doc in page)
+        if len(page) < 2:
+            break
+        after = encode_cursor(page[-1]["_id"], "discount", page[-1].get("discount"))
+    assert len(seen) == 5 and len(set(seen)) == 5, "Ninguna página debe saltarse documentos con null"
@@ -0,0 +1,97 @@
+import asyncio
+
+import utils.search_index as search_index_module
+from utils.search_index import SearchIndex
+
+
+def build_index():
+    index = SearchIndex()
+    index.set_team("t1", "Atlético de Madrid", "España")
+    index.set_team("t2", "Boca Juniors", "Argentina")
+    index.set_shirt("s1", "Camiseta local 2025", "Camiseta oficial rojiblanca", "t1")
+    index.set_shirt("s2", "Camiseta visitante 2025", "Camiseta oficial", "t1")
+    index.set_shirt("s3", "Camiseta local 2025", "Camiseta oficial azul y oro", "t2")
+    return index
+
+def test_search_relevance():
+    index = build_index()
+    assert index.search("atletico local")[0] == "s1", "Debe primar quien tiene más términos"
+    assert index.search("ARGENTINA") == ["s3"]
+    assert index.search("nada") == []
+
+def test_autocomplete_prefix():
+    index = build_index()
+    assert {s["team_name"] for s in index.autocomplete("camiseta lo")} == {"Atlético de Madrid", "Boca Juniors"}
+    assert [s["id"] for s in index.autocomplete("boc")] == ["s3"]
+    assert [s["name"] for s in index.autocomplete("atletico vis")] == ["Camiseta visitante 2025"]
+
+def test_incremental_updates():
+    index = build_index()
+    index.remove_shirt("s2")
+    assert index.autocomplete("vis") == []
+    index.set_team("t2", "River Plate", "Argentina")
+    assert index.autocomplete("boc") == []
+    assert [s["id"] for s in index.autocomplete("riv")] == ["s3"]
+    index.set_shirt("s1", "Camiseta retro 1996", "Camiseta oficial", "t1")
+    assert index.search("retro") == ["s1"]
+    assert index.search("rojiblanca") == []
+
+def test_autocomplete_popularity_follows_writes():
+    index = SearchIndex()
+    index.set_team("t1", "Club", "España")
+    for i in range(12):
+        index.set_shirt(f"s{i}", f"Camiseta v{i:02d}", "", "t1")
+    assert [s["name"] for s in index.autocomplete("cam", 3)] == ["Camiseta v00", "Camiseta v01", "Camiseta v02"]
+    # Tras la primera lectura las listas ya están ordenadas: deben recolocarse al escribir
+    for i in range(20):
+        index.set_shirt(f"v11-{i}", "Camiseta v11", "", "t1")
+    index.set_shirt("nueva-1", "Camiseta nueva", "", "t1")
+    index.set_shirt("nueva-2", "Camiseta nueva", "", "t1")
+    assert [s["name"] for s in index.autocomplete("cam", 3)] == ["Camiseta v11", "Camiseta nueva", "Camiseta v00"]
+    for i in range(20):
+        index.remove_shirt(f"v11-{i}")
+    assert [s["name"] for s in index.autocomplete("cam", 2)] == ["Camiseta nueva", "Camiseta v00"]
+
+def test_load_keeps_writes_made_while_loading(monkeypatch):
+    class Cursor:
+        def __init__(self, docs):
+            self.docs = docs
+
+        async def to_list(self):
+            await asyncio.sleep(0.01)
+            return self.docs
+
+    collections = {
+        "futbol_teams": [{"_id": "t1", "name": "Boca Juniors", "country": "Argentina"}],
+        "shirts": [{"_id": "s1", "name": "Camiseta local", "description": "", "team_id": "t1"}],
+    }
+
+    class Collection:
+        def __init__(self, name):
+            self.name = name
+
+        def find(self, *args):
+            return Cursor(collections[self.name])
+
+    monkeypatch.setattr(search_index_module, "get_collection", Collection)
+    index = SearchIndex()
+
+    async def scenario():
+        load = asyncio.create_task(index.load())
+        await asyncio.sleep(0)
+        # Escrituras de este proceso mientras se lee Mongo
+        index.set_shirt("s2", "Camiseta retro", "", "t1")
+        index.remove_shirt("s1")
+        await load
+
+    asyncio.run(scenario())
+    assert index.search("retro") == ["s2"]
+    assert index.search("local") == []
+
+def test_unknown_words_are_not_cached():
+    index = build_index()
+    index.autocomplete("camiseta lo")
+    ranked = dict(index._ranked)
+    for q in ("zzz lo", "qwerty asdf", "camiseta xyz abc"):
+        index.autocomplete(q)
+    assert index._ranked == ranked
@@ -0,0 +1,30 @@
+import pytest
+from fastapi import HTTPException
+
+import utils.security as security
+
+
+@pytest.fixture(autouse=True)
+def secret_key(monkeypatch):
+    monkeypatch.setattr(security, "SECRET_KEY", "clave-de-pruebas-con-al-menos-32-bytes")
+    security._verified_tokens.clear()
+
+def test_malformed_header():
+    for header in [None, "", "Bearer", "Token abc", "Bearer a b"]:
+        with pytest.raises(HTTPException) as exc:
+            security._bearer_token(header)
+        assert exc.value.status_code == 400, f"Cabecera aceptada: {header!r}"
+
+def test_verified_token_is_cached():
+    token = security.create_jwt_token("Ana", "Pérez", "ana@example.com", True, False, "1")
+    claims = security.verify_token(token)
+    assert claims["email"] == "ana@example.com"
+    assert claims["role"] == "user"
+    assert len(security._verified_tokens) == 1
+    assert security.verify_token(token) is claims, "La segunda verificación debe salir de la caché"
+
+def test_invalid_token():
+    with pytest.raises(HTTPException) as exc:
+        security.verify_token("no.es.jwt")
+    assert exc.value.status_code == 401
+    assert not security._verified_tokens
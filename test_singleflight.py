@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from utils.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    executions = 0
+
+    async def load():
+        nonlocal executions
+        executions += 1
+        await asyncio.sleep(0.01)
+        return {"id": "a"}
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("a", load) for _ in range(10)))
+
+    results = asyncio.run(scenario())
+    assert executions == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats()["coalesced"] == 9
+    assert flight.stats()["in_flight"] == 0
+
+def test_errors_reach_every_waiter():
+    flight = SingleFlight()
+
+    async def load():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("connection reset")
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("a", load) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.stats()["errors"] == 1
+
+def test_timeout_frees_the_key():
+    flight = SingleFlight(timeout=0.01)
+
+    async def slow():
+        await asyncio.sleep(1)
+
+    async def fast():
+        return 1
+
+    async def scenario():
+        with pytest.raises(TimeoutError):
+            await flight.do("a", slow)
+        return await flight.do("a", fast)
+
+    assert asyncio.run(scenario()) == 1, "Tras el timeout la siguiente llamada vuelve a ejecutarse"
+    assert flight.stats()["timeouts"] == 1
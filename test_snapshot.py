@@ -0,0 +1,94 @@
+import asyncio
+import json
+
+from bson import ObjectId
+from pydantic import BaseModel
+from starlette.requests import Request
+
+import utils.snapshot as snapshot_module
+from utils.conditional import Versions
+from utils.snapshot import CatalogSnapshot
+
+
+class Item(BaseModel):
+    id: str
+    name: str
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, *args):
+        return FakeCursor(sorted(self.docs, key=lambda doc: doc["_id"]))
+
+    async def to_list(self):
+        return list(self.docs)
+
+
+class FakeCollection:
+    def __init__(self):
+        self.docs = {}
+
+    def find(self, query):
+        docs = list(self.docs.values())
+        if "_id" in query:
+            docs = [doc for doc in docs if doc["_id"] in query["_id"]["$in"]]
+        return FakeCursor(docs)
+
+
+def request() -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/items", "headers": [], "query_string": b""})
+
+
+def page(response) -> list[str]:
+    return [item["name"] for item in json.loads(response.body)]
+
+
+def test_pages_follow_writes(monkeypatch):
+    versions, coll = Versions(), FakeCollection()
+    monkeypatch.setattr(snapshot_module, "versions", versions)
+    monkeypatch.setattr(snapshot_module, "get_collection", lambda name: coll)
+    ids = [ObjectId() for _ in range(3)]
+    for i, oid in enumerate(ids):
+        coll.docs[oid] = {"_id": oid, "name": f"item{i}"}
+    snapshot = CatalogSnapshot("items", lambda doc: Item(id=str(doc["_id"]), name=doc["name"]))
+    headers = {"ETag": '"x"'}
+
+    async def scenario():
+        await snapshot.load()
+        first = snapshot.response(request(), None, 2, headers)
+        assert page(first) == ["item0", "item1"]
+        rest = snapshot.response(request(), first.headers["X-Next-Cursor"], 2, headers)
+        assert page(rest) == ["item2"] and "X-Next-Cursor" not in rest.headers
+
+        coll.docs[ids[1]]["name"] = "renamed"
+        del coll.docs[ids[2]]
+        versions.bump("items", str(ids[1]), str(ids[2]))
+        assert snapshot.response(request(), None, 10, headers) is None, "Desfasado: la ruta debe ir a Mongo"
+        await snapshot._task
+        return page(snapshot.response(request(), None, 10, headers))
+
+    assert asyncio.run(scenario()) == ["item0", "renamed"]
+    assert snapshot.stats()["rebuilds"] == 1
+
+def test_periodic_reload_picks_up_other_instances(monkeypatch):
+    versions, coll = Versions(), FakeCollection()
+    monkeypatch.setattr(snapshot_module, "versions", versions)
+    monkeypatch.setattr(snapshot_module, "get_collection", lambda name: coll)
+    monkeypatch.setattr(snapshot_module, "CATALOG_SNAPSHOT_RELOAD_SECONDS", 0.01)
+    oid = ObjectId()
+    coll.docs[oid] = {"_id": oid, "name": "item0"}
+    snapshot = CatalogSnapshot("items", lambda doc: Item(id=str(doc["_id"]), name=doc["name"]))
+
+    async def scenario():
+        await snapshot.load()
+        # Escritura de otra instancia: aquí no hay versions.bump
+        coll.docs[oid]["name"] = "renamed"
+        await asyncio.sleep(0.05)
+        body = page(snapshot.response(request(), None, 10, {"ETag": '"x"'}))
+        await snapshot.stop()
+        return body
+
+    assert asyncio.run(scenario()) == ["renamed"]
+    assert snapshot.stats()["full_rebuilds"] > 1
@@ -0,0 +1,36 @@
+import asyncio
+
+from utils.startup import FirstResponseMiddleware, StartupTimer
+
+
+def test_phases_and_ready():
+    timer = StartupTimer()
+
+    async def run():
+        async with timer.phase("mongo"):
+            await asyncio.sleep(0)
+
+    asyncio.run(run())
+    timer.ready()
+    names = [name for name, labels, value in timer.samples()]
+    assert names == ["app_startup_phase_seconds", "app_startup_seconds"]
+    assert timer.cold_start_seconds is None
+
+def test_first_successful_response():
+    timer = StartupTimer()
+    statuses = iter([503, 200, 200])
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": next(statuses), "headers": []})
+
+    async def send(message):
+        pass
+
+    middleware = FirstResponseMiddleware(app, timer)
+    asyncio.run(middleware({"type": "http"}, None, send))
+    assert timer.cold_start_seconds is None, "Un 503 no cuenta como primera respuesta correcta"
+    asyncio.run(middleware({"type": "http"}, None, send))
+    first = timer.cold_start_seconds
+    assert first is not None
+    asyncio.run(middleware({"type": "http"}, None, send))
+    assert timer.cold_start_seconds == first
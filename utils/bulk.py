@@ -0,0 +1,137 @@
+import json
+import os
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, Request
+from bson import ObjectId
+from pydantic import BaseModel, ValidationError
+from pymongo.errors import BulkWriteError
+
+from models.bulk import BatchItem, BulkItemResult, BulkResult
+from utils.cache import get_cache
+from utils.conditional import versions
+from utils.mongodb import get_collection
+
+load_dotenv()
+
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "5000"))
+BATCH_GET_MAX_IDS = int(os.getenv("BATCH_GET_MAX_IDS", "500"))
+
+
+async def read_bulk_payload(request: Request) -> list:
+    """Lee el cuerpo de una petición bulk: un array JSON o NDJSON (un objeto por línea)"""
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+    try:
+        if "ndjson" in content_type:
+            items = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            items = json.loads(body)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Cuerpo JSON no válido: {str(e)}")
+
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Se esperaba un array JSON o NDJSON")
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Máximo {BULK_MAX_ITEMS} elementos por lote")
+    return items
+
+
+def patch_changes(patch: BaseModel) -> dict:
+    """Campos enviados en un PATCH; null no se acepta porque los campos del modelo son obligatorios"""
+    changes = patch.model_dump(exclude_unset=True)
+    nulls = [field for field, value in changes.items() if value is None]
+    if nulls:
+        raise HTTPException(status_code=400, detail=f"Campos que no pueden ser null: {', '.join(nulls)}")
+    return changes
+
+
+def validation_message(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in error.errors())
+    if isinstance(error, HTTPException):
+        return str(error.detail)
+    return str(error)
+
+
+async def execute_bulk(coll, operations: list) -> tuple[set, dict]:
+    """Ejecuta un bulk_write no ordenado.
+
+    Devuelve los índices de operación que insertaron vía upsert y los errores por
+    índice de operación; los fallos individuales no detienen al resto del lote.
+    """
+    if not operations:
+        return set(), {}
+    try:
+        result = await coll.bulk_write(operations, ordered=False)
+        return set(result.upserted_ids), {}
+    except BulkWriteError as e:
+        details = e.details
+        upserted = {u["index"] for u in details.get("upserted", [])}
+        errors = {err["index"]: err.get("errmsg", "Write error") for err in details.get("writeErrors", [])}
+        return upserted, errors
+
+
+def collect_results(results: list, written: list, upserted: set, errors: dict) -> BulkResult:
+    """Completa ``results`` con el resultado de cada operación escrita.
+
+    ``written`` tiene, por índice de operación, la tupla (índice del elemento,
+    id del documento, si la operación era un upsert).
+    """
+    for op_index, (index, doc_id, is_upsert) in enumerate(written):
+        if op_index in errors:
+            results[index] = BulkItemResult(index=index, status="error", id=doc_id, error=errors[op_index])
+        elif is_upsert and op_index not in upserted:
+            results[index] = BulkItemResult(index=index, status="updated", id=doc_id)
+        else:
+            results[index] = BulkItemResult(index=index, status="created", id=doc_id)
+
+    counts = {"created": 0, "updated": 0, "error": 0}
+    for item in results:
+        counts[item.status] += 1
+    return BulkResult(created=counts["created"], updated=counts["updated"], failed=counts["error"], results=results)
+
+
+def parse_ids(ids) -> list[str]:
+    """``"a,b,c"`` o una lista -> lista de ids sin vacíos, con el tope BATCH_GET_MAX_IDS"""
+    if isinstance(ids, str):
+        ids = ids.split(",")
+    ids = [i.strip() for i in ids if i and i.strip()]
+    if not ids:
+        raise HTTPException(status_code=400, detail="Se esperaba al menos un id")
+    if len(ids) > BATCH_GET_MAX_IDS:
+        raise HTTPException(status_code=413, detail=f"Máximo {BATCH_GET_MAX_IDS} ids por consulta")
+    return ids
+
+
+async def fetch_by_ids(collection: str, ids: list[str], build) -> list[BatchItem]:
+    """Documentos por id en el orden pedido: caché por elemento y un solo $in para el resto.
+
+    ``build(doc)`` convierte el documento de Mongo en el modelo que se cachea y devuelve.
+    """
+    # Las claves se normalizan como str(ObjectId) (igual que las de la caché por elemento)
+    keys = {i: str(ObjectId(i)) for i in ids if ObjectId.is_valid(i)}
+    cache = get_cache(collection)
+    found = {}
+    for key in set(keys.values()):
+        cached = await cache.get(key)
+        if cached is not None:
+            found[key] = cached
+
+    missing = [key for key in set(keys.values()) if key not in found]
+    if missing:
+        before = {key: versions.document(collection, key) for key in missing}
+        docs = await get_collection(collection).find({"_id": {"$in": [ObjectId(key) for key in missing]}}).to_list()
+        for doc in docs:
+            key = str(doc["_id"])
+            item = build(doc)
+            found[key] = item
+            # Si hubo una escritura mientras tanto, el documento leído puede ser el anterior: no se cachea
+            if versions.document(collection, key) == before[key]:
+                await cache.set(key, item)
+
+    results = []
+    for i in ids:
+        item = found.get(keys.get(i))
+        results.append(BatchItem(id=i, found=item is not None, item=item))
+    return results
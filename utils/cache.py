@@ -0,0 +1,150 @@
+import asyncio
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+from utils.conditional import versions
+
+load_dotenv()
+
+CACHE_MAXSIZE = int(os.getenv("CACHE_MAXSIZE", "10000"))
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "60"))
+# Documentos más recientes de cada colección que se precargan al arrancar (0 = ninguno)
+CACHE_WARMUP_DOCUMENTS = int(os.getenv("CACHE_WARMUP_DOCUMENTS", "0"))
+
+
+class CacheBackend(ABC):
+    """Interfaz de caché usada por los controladores.
+
+    Es asíncrona para que un backend compartido (p. ej. Redis) pueda sustituir al
+    de memoria sin cambiar los controladores; ver ``set_cache_backend``.
+    """
+
+    @abstractmethod
+    async def get(self, key):
+        ...
+
+    @abstractmethod
+    async def set(self, key, value):
+        ...
+
+    @abstractmethod
+    async def delete(self, key):
+        ...
+
+    @abstractmethod
+    async def clear(self):
+        ...
+
+    def stats(self) -> dict:
+        return {}
+
+
+class LRUTTLCache(CacheBackend):
+    """Caché en memoria acotada, con expulsión LRU y expiración por TTL"""
+
+    def __init__(self, maxsize: int = CACHE_MAXSIZE, ttl: float = CACHE_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    async def get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    async def set(self, key, value):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, key):
+        self._data.pop(key, None)
+
+    async def clear(self):
+        self._data.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+_backend_factory = LRUTTLCache
+_caches: dict[str, CacheBackend] = {}
+
+
+def set_cache_backend(factory):
+    """Cambia el backend para las cachés que se creen a partir de ahora"""
+    global _backend_factory
+    _backend_factory = factory
+    _caches.clear()
+
+
+def get_cache(name: str) -> CacheBackend:
+    """Devuelve (creándola si hace falta) la caché con ese nombre"""
+    cache = _caches.get(name)
+    if cache is None:
+        cache = _caches[name] = _backend_factory()
+    return cache
+
+
+def cache_stats() -> dict:
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+
+_invalidations: set[asyncio.Task] = set()
+
+
+def invalidate(collection: str, doc_ids: tuple):
+    """Listener de ``versions.bump``: saca de la caché de la colección lo que cambió.
+
+    Con ``VERSIONS_CHANGE_STREAM`` incluye las escrituras de otras instancias, que si
+    no seguirían sirviéndose desde aquí hasta que caducara la entrada.
+    """
+    cache = _caches.get(collection)
+    if cache is None:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return  # Fuera del bucle de eventos no hay peticiones a las que servir la caché
+    task = loop.create_task(_forget(cache, doc_ids))
+    _invalidations.add(task)
+    task.add_done_callback(_invalidations.discard)
+
+
+async def _forget(cache: CacheBackend, doc_ids: tuple):
+    if not doc_ids:
+        # Cambió la colección entera (p. ej. al reconectar el change stream)
+        await cache.clear()
+    for doc_id in doc_ids:
+        await cache.delete(doc_id)
+
+
+versions.subscribe(invalidate)
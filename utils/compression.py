@@ -0,0 +1,145 @@
+"""Compresión de respuestas negociada con ``Accept-Encoding`` (brotli o gzip).
+
+Middleware ASGI puro: las respuestas de un solo cuerpo solo se comprimen a partir
+de ``COMPRESSION_MIN_SIZE`` bytes (las grandes en un hilo, para no bloquear el
+bucle de eventos); las de streaming se comprimen trozo a trozo. brotli se ofrece
+solo si el paquete ``brotli`` está instalado.
+"""
+import os
+import re
+import zlib
+from typing import Optional
+
+from dotenv import load_dotenv
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional; sin él solo se ofrece gzip
+    brotli = None
+
+load_dotenv()
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_THREAD_MIN_SIZE = int(os.getenv("COMPRESSION_THREAD_MIN_SIZE", str(128 * 1024)))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+# Calidad 4-5 es el punto habitual para contenido dinámico (11 es para estáticos)
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+_CODING = re.compile(r"^\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*$")
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Codificación preferida ("br", "gzip") según ``Accept-Encoding``; None si ninguna"""
+    weights = {}
+    for part in accept_encoding.lower().split(","):
+        match = _CODING.match(part)
+        if match:
+            weights[match.group(1)] = float(match.group(2) or 1)
+    offered = (["br"] if brotli is not None else []) + ["gzip"]
+    best, best_q = None, 0.0
+    for coding in offered:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class _Encoder:
+    def __init__(self, coding: str):
+        self.coding = coding
+        if coding == "br":
+            self._compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes) -> bytes:
+        """Comprime un trozo y lo vacía para que el cliente lo reciba ya"""
+        if self.coding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.coding == "br":
+            return self._compressor.process(data) + self._compressor.finish()
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+def _weaken_etag(headers: MutableHeaders):
+    # El cuerpo comprimido ya no es idéntico byte a byte: un ETag fuerte pasa a débil
+    # (If-None-Match compara en débil, así que el cliente sigue obteniendo 304)
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        coding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        start = None
+        encoder = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, encoder, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                # Se retiene hasta ver el primer trozo del cuerpo y decidir si se comprime
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                headers = MutableHeaders(raw=start["headers"])
+                content_type = headers.get("content-type", "")
+                compressible = content_type.startswith(COMPRESSIBLE_TYPES) and "content-encoding" not in headers
+                if compressible:
+                    headers.add_vary_header("Accept-Encoding")
+                if coding is not None and start["status"] == 304:
+                    # Mismo ETag que el 200 comprimido que tiene el cliente
+                    _weaken_etag(headers)
+                if (not compressible or coding is None or start["status"] in (204, 304)
+                        or (not more_body and len(body) < self.minimum_size)):
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+
+                encoder = _Encoder(coding)
+                headers["Content-Encoding"] = coding
+                _weaken_etag(headers)
+                if not more_body:
+                    if len(body) >= COMPRESSION_THREAD_MIN_SIZE:
+                        body = await run_in_threadpool(encoder.finish, body)
+                    else:
+                        body = encoder.finish(body)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                del headers["Content-Length"]
+                await send(start)
+                await send({"type": "http.response.body", "body": encoder.chunk(body), "more_body": True})
+                return
+
+            data = encoder.chunk(body) if more_body else encoder.finish(body)
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
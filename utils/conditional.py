@@ -0,0 +1,157 @@
+"""GET condicionales: ETag por versión de colección/documento y ``If-None-Match`` -> 304.
+
+Los controladores llaman a ``versions.bump`` tras cada escritura; las rutas de
+lectura calculan el ETag con ``conditional`` *antes* de ir a Mongo, así que un 304
+no consulta la base de datos ni serializa nada.
+
+Las versiones viven en memoria y el ETag lleva la época del proceso, así que una
+instancia nunca acepta el ETag de otra. Con varias instancias, cada una debe
+enterarse además de las escrituras de las demás: ``VERSIONS_CHANGE_STREAM=true``
+sube las versiones a partir de los change streams de shirts y futbol_teams
+(requiere replica set, como Atlas).
+
+``Cache-Control`` por ruta (plantilla de FastAPI), separadas por ``;``::
+
+    CACHE_CONTROL_DEFAULT="no-cache"
+    CACHE_CONTROL_ROUTES="/shirts=public, max-age=30;/futbol_teams/{team_id}=public, max-age=300"
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import secrets
+from collections import defaultdict
+from typing import Optional
+
+from dotenv import load_dotenv
+from fastapi import Request, Response
+
+from utils.mongodb import get_collection
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# "no-cache" permite guardar la respuesta pero obliga a revalidarla con el ETag
+CACHE_CONTROL_DEFAULT = os.getenv("CACHE_CONTROL_DEFAULT", "no-cache")
+# Documentos con versión propia que se recuerdan antes de compactar
+VERSION_TRACK_MAX = int(os.getenv("VERSION_TRACK_MAX", "100000"))
+VERSIONS_CHANGE_STREAM = os.getenv("VERSIONS_CHANGE_STREAM", "false").lower() == "true"
+VERSIONED_COLLECTIONS = ("shirts", "futbol_teams")
+
+
+def parse_cache_control(value: str) -> dict[str, str]:
+    """``"/a=public, max-age=30;/b=no-store"`` -> {"/a": "public, max-age=30", "/b": "no-store"}"""
+    rules = {}
+    for entry in value.split(";"):
+        route, sep, header = entry.partition("=")
+        if sep and route.strip() and header.strip():
+            rules[route.strip()] = header.strip()
+    return rules
+
+
+CACHE_CONTROL_ROUTES = parse_cache_control(os.getenv("CACHE_CONTROL_ROUTES", ""))
+
+
+class Versions:
+    """Contadores de versión por colección y por documento (en memoria, por proceso)"""
+
+    def __init__(self, max_documents: int = VERSION_TRACK_MAX):
+        self.epoch = secrets.token_hex(4)
+        self.max_documents = max_documents
+        self._collections: dict[str, int] = defaultdict(int)
+        self._documents: dict[tuple, int] = {}
+        # Versión de los documentos olvidados al compactar; siempre mayor que la de sus ETag anteriores
+        self._floor: dict[str, int] = defaultdict(int)
+        self._tasks: list[asyncio.Task] = []
+        self._listeners: list = []
+
+    def bump(self, collection: str, *doc_ids: str):
+        """Registra una escritura en la colección (y en los documentos indicados)"""
+        self._collections[collection] += 1
+        version = self._collections[collection]
+        if len(self._documents) + len(doc_ids) > self.max_documents:
+            self._documents.clear()
+            self._floor = defaultdict(int, self._collections)
+        for doc_id in doc_ids:
+            self._documents[(collection, doc_id)] = version
+        for listener in self._listeners:
+            listener(collection, doc_ids)
+
+    def subscribe(self, listener):
+        """``listener(collection, doc_ids)`` se llama tras cada ``bump`` (sin ids: cambió toda la colección)"""
+        self._listeners.append(listener)
+
+    def collection(self, collection: str) -> int:
+        return self._collections[collection]
+
+    def document(self, collection: str, doc_id: str) -> int:
+        return self._documents.get((collection, doc_id), self._floor[collection])
+
+    def start_background_sync(self):
+        if VERSIONS_CHANGE_STREAM:
+            for collection in VERSIONED_COLLECTIONS:
+                self._tasks.append(asyncio.create_task(self._watch_changes(collection)))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _watch_changes(self, collection: str):
+        while True:
+            try:
+                async with await get_collection(collection).watch() as stream:
+                    # Lo escrito mientras no había stream invalida toda la colección
+                    self.bump(collection)
+                    async for change in stream:
+                        key = change.get("documentKey", {}).get("_id")
+                        self.bump(collection, *([str(key)] if key is not None else []))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Versions change stream on %s interrupted: %s", collection, e)
+                await asyncio.sleep(5)
+
+
+versions = Versions()
+
+
+def etag(request: Request, collection: str, doc_id: Optional[str] = None, related: tuple = ()) -> str:
+    """ETag fuerte de la respuesta: versión del documento, o de la colección más la query string.
+
+    ``related`` son otras colecciones cuyo contenido también aparece en la respuesta.
+    """
+    version = versions.document(collection, doc_id) if doc_id is not None else versions.collection(collection)
+    tag = "-".join(str(v) for v in (version, *(versions.collection(c) for c in related)))
+    if doc_id is not None and not request.query_params:
+        return f'"{versions.epoch}-{tag}"'
+    # Cada combinación de filtros/cursor/campos es una representación distinta
+    query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+    variant = hashlib.blake2b(query.encode(), digest_size=6).hexdigest()
+    return f'"{versions.epoch}-{tag}-{variant}"'
+
+
+def _matches(if_none_match: str, tag: str) -> bool:
+    # "*" no se atiende: sin ir a Mongo no se sabe si el recurso existe.
+    # If-None-Match usa comparación débil: W/"x" equivale a "x"
+    candidates = (c.strip().removeprefix("W/") for c in if_none_match.split(","))
+    return tag in candidates
+
+
+def cache_control(request: Request) -> str:
+    route = request.scope.get("route")
+    return CACHE_CONTROL_ROUTES.get(getattr(route, "path", ""), CACHE_CONTROL_DEFAULT)
+
+
+def conditional(
+    request: Request, collection: str, doc_id: Optional[str] = None, related: tuple = ()
+) -> tuple[dict, Optional[Response]]:
+    """Cabeceras de caché de la respuesta y, si el cliente ya tiene esta versión, el 304 a devolver"""
+    tag = etag(request, collection, doc_id, related)
+    headers = {"ETag": tag, "Cache-Control": cache_control(request)}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, tag):
+        return headers, Response(status_code=304, headers=headers)
+    return headers, None
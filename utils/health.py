@@ -0,0 +1,158 @@
+"""Estado de las dependencias comprobado en segundo plano para ``/ready`` y ``/health``.
+
+Un ping a Mongo por cada sonda del orquestador añade carga y, con Mongo en
+apuros, respuestas lentas justo cuando más importan. ``HealthProber`` comprueba
+Mongo y Firebase cada ``HEALTH_PROBE_INTERVAL_SECONDS`` y guarda el resultado;
+las rutas solo leen ese estado.
+
+La instancia deja de estar lista si el último ping a Mongo falló, si es más
+antiguo que ``HEALTH_STALE_SECONDS`` o si el pool de conexiones sigue saturado
+(ocupación >= ``HEALTH_POOL_SATURATION_MAX``) en dos sondeos seguidos. Firebase
+solo afecta a /login y /users: si falla, la instancia sigue lista pero
+``/health`` la marca como degradada.
+"""
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+import firebase_admin
+from dotenv import load_dotenv
+
+from utils.http_client import FIREBASE_AUTH_URL, get_http_client
+from utils.metrics import MONGO_POOL_CONNECTIONS, MONGO_POOL_IN_USE, describe, register_collector
+from utils.mongodb import get_mongo_client
+from utils.startup import startup_timer
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+HEALTH_PROBE_INTERVAL_SECONDS = float(os.getenv("HEALTH_PROBE_INTERVAL_SECONDS", "10"))
+HEALTH_PROBE_TIMEOUT_SECONDS = float(os.getenv("HEALTH_PROBE_TIMEOUT_SECONDS", "2"))
+HEALTH_STALE_SECONDS = float(os.getenv("HEALTH_STALE_SECONDS", str(3 * HEALTH_PROBE_INTERVAL_SECONDS)))
+HEALTH_POOL_SATURATION_MAX = float(os.getenv("HEALTH_POOL_SATURATION_MAX", "1.0"))
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+async def ping_mongo():
+    await get_mongo_client().admin.command("ping")
+
+
+async def ping_firebase():
+    if not firebase_admin._apps:
+        raise RuntimeError("firebase_admin not initialized")
+    # Cualquier respuesta HTTP (un 404 incluido) indica que el servicio contesta
+    response = await get_http_client().get(FIREBASE_AUTH_URL, timeout=HEALTH_PROBE_TIMEOUT_SECONDS)
+    if response.status_code >= 500:
+        raise RuntimeError(f"HTTP {response.status_code}")
+
+
+class HealthProber:
+    def __init__(self, checks: Optional[dict] = None,
+                 interval: float = HEALTH_PROBE_INTERVAL_SECONDS, timeout: float = HEALTH_PROBE_TIMEOUT_SECONDS):
+        self._probes = checks or {"mongodb": ping_mongo, "firebase": ping_firebase}
+        self.interval = interval
+        self.timeout = timeout
+        self.checks = {name: {"status": "unknown"} for name in self._probes}
+        self._checked: dict[str, float] = {}    # nombre -> time.monotonic() del último sondeo
+        self.pool_stats: dict = {}
+        self.saturated_probes = 0
+        self._tasks: list[asyncio.Task] = []
+
+    async def probe(self):
+        """Comprueba todas las dependencias a la vez y registra el resultado"""
+        await asyncio.gather(*(self._check(name, fn) for name, fn in self._probes.items()))
+        self.pool_stats = self.pool()
+        saturation = self.pool_stats.get("saturation", 0.0)
+        self.saturated_probes = self.saturated_probes + 1 if saturation >= HEALTH_POOL_SATURATION_MAX else 0
+
+    async def _check(self, name: str, fn):
+        previous = self.checks[name]
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(fn(), self.timeout)
+            error = None
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        latency_ms = round((time.perf_counter() - start) * 1000, 2)
+        checked_at = _now()
+        result = {
+            "status": "down" if error else "up",
+            "latency_ms": latency_ms,
+            "checked_at": checked_at,
+            "last_success_at": previous.get("last_success_at") if error else checked_at,
+            "consecutive_failures": previous.get("consecutive_failures", 0) + 1 if error else 0,
+        }
+        if error:
+            result["error"] = error
+            if previous.get("status") != "down":
+                logger.warning("Health check %s failed: %s", name, error)
+        elif previous.get("status") == "down":
+            logger.info("Health check %s recovered", name)
+        self.checks[name] = result
+        self._checked[name] = time.monotonic()
+
+    def pool(self) -> dict:
+        """Conexiones del pool de Mongo según los eventos del cliente (ver utils.metrics)"""
+        in_use = int(MONGO_POOL_IN_USE.value())
+        stats = {"open": int(MONGO_POOL_CONNECTIONS.value()), "in_use": in_use}
+        try:
+            max_size = get_mongo_client().options.pool_options.max_pool_size
+        except (AttributeError, ValueError):
+            return stats
+        stats["max_size"] = max_size
+        stats["saturation"] = round(in_use / max_size, 3) if max_size else 0.0
+        return stats
+
+    def readiness(self) -> tuple[bool, str]:
+        """(lista, motivo si no lo está)"""
+        if startup_timer.ready_seconds is None:
+            return False, "starting"
+        mongo = self.checks.get("mongodb", {})
+        if mongo.get("status") != "up":
+            return False, "mongodb " + mongo.get("status", "unknown")
+        if time.monotonic() - self._checked.get("mongodb", 0.0) > HEALTH_STALE_SECONDS:
+            return False, "mongodb check stale"
+        if self.saturated_probes >= 2:
+            return False, "mongodb pool saturated"
+        return True, ""
+
+    def report(self) -> dict:
+        return {"checks": self.checks, "pool": self.pool_stats}
+
+    def start_background_sync(self):
+        self._tasks.append(asyncio.create_task(self._probe_loop()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _probe_loop(self):
+        while True:
+            try:
+                await self.probe()
+            except Exception as e:
+                logger.warning("Health probe failed: %s", e)
+            await asyncio.sleep(self.interval)
+
+    def samples(self):
+        samples = []
+        for name, check in self.checks.items():
+            samples.append(("health_check_up", {"check": name}, 1 if check["status"] == "up" else 0))
+            if "latency_ms" in check:
+                samples.append(("health_check_latency_seconds", {"check": name}, check["latency_ms"] / 1000))
+        return samples
+
+
+health_prober = HealthProber()
+register_collector(health_prober.samples)
+describe("health_check_up", "1 si la dependencia respondió en el último sondeo")
+describe("health_check_latency_seconds", "Latencia del último sondeo de la dependencia")
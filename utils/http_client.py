@@ -0,0 +1,81 @@
+import asyncio
+import logging
+import os
+import random
+from typing import Optional
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Permite apuntar a un servidor local que imite la API REST de Firebase (benchmarks)
+FIREBASE_AUTH_URL = os.getenv("FIREBASE_AUTH_URL", "https://identitytoolkit.googleapis.com").rstrip("/")
+
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_CONCURRENCY = int(os.getenv("HTTP_MAX_CONCURRENCY", "50"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+HTTP_RETRY_BACKOFF = float(os.getenv("HTTP_RETRY_BACKOFF", "0.2"))
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+_client: Optional[httpx.AsyncClient] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Cliente HTTP compartido durante la vida de la app (conexiones keep-alive reutilizadas)"""
+    global _client, _semaphore
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_CONNECTIONS
+            ),
+        )
+        _semaphore = asyncio.Semaphore(HTTP_MAX_CONCURRENCY)
+    return _client
+
+
+def _forget_client_after_fork():
+    # Conexiones y event loop del padre: cada proceso hijo crea su propio cliente
+    global _client, _semaphore
+    _client = None
+    _semaphore = None
+
+
+os.register_at_fork(after_in_child=_forget_client_after_fork)
+
+
+async def close_http_client():
+    global _client, _semaphore
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        _semaphore = None
+
+
+async def post_json(url: str, payload: dict, params: Optional[dict] = None) -> httpx.Response:
+    """POST con concurrencia acotada y reintentos con backoff exponencial.
+
+    Reintenta errores de red, timeouts y respuestas 429/5xx; cualquier otra
+    respuesta (incluidos los 400 de credenciales incorrectas) se devuelve tal cual.
+    """
+    client = get_http_client()
+    for attempt in range(HTTP_RETRIES + 1):
+        try:
+            async with _semaphore:
+                response = await client.post(url, json=payload, params=params)
+            if response.status_code not in RETRY_STATUS or attempt == HTTP_RETRIES:
+                return response
+            logger.warning("POST %s returned %s, retrying", url, response.status_code)
+        except httpx.TransportError as e:
+            if attempt == HTTP_RETRIES:
+                raise
+            logger.warning("POST %s failed (%r), retrying", url, e)
+        await asyncio.sleep(HTTP_RETRY_BACKOFF * 2 ** attempt * (0.5 + random.random()))
@@ -0,0 +1,117 @@
+"""Registro de índices y consultas de MongoDB.
+
+Los índices se declaran junto a los modelos y se crean de forma idempotente al
+arrancar. Los controladores registran la forma de las consultas que emiten para
+poder revisar su plan de ejecución:
+
+    python -m utils.indexes ensure    # crea los índices declarados
+    python -m utils.indexes explain   # sale con código 1 si alguna consulta hace COLLSCAN
+"""
+import asyncio
+import json
+import logging
+import os
+import sys
+from typing import Optional
+
+from dotenv import load_dotenv
+from pymongo.errors import OperationFailure
+
+from models.shirt import SHIRT_INDEXES
+from models.user import USER_INDEXES
+from utils.mongodb import DB, get_collection, get_mongo_client
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+ENSURE_INDEXES_ON_STARTUP = os.getenv("ENSURE_INDEXES_ON_STARTUP", "true").lower() == "true"
+
+INDEXES = {
+    "shirts": SHIRT_INDEXES,
+    "users": USER_INDEXES,
+}
+
+# Consultas representativas por controlador: ver register_query
+QUERIES: list[dict] = []
+
+
+def register_query(name: str, collection: str, filter: dict, sort: Optional[list] = None):
+    """Declara una consulta que emite la app para que ``explain`` revise su plan"""
+    QUERIES.append({"name": name, "collection": collection, "filter": filter, "sort": sort})
+
+
+async def ensure_indexes() -> dict:
+    """Crea los índices declarados; los ya existentes con la misma definición no cambian"""
+    created = {}
+    for collection, indexes in INDEXES.items():
+        try:
+            created[collection] = await get_collection(collection).create_indexes(indexes)
+        except OperationFailure as e:
+            # p. ej. datos duplicados que impiden un índice único: se avisa pero no se bloquea el arranque
+            logger.error("Could not ensure indexes on %s: %s", collection, e)
+            created[collection] = f"error: {e}"
+    return created
+
+
+def _stages(plan) -> list[str]:
+    """Recorre un plan de explain y devuelve todas las etapas que contiene"""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_stages(item))
+    return stages
+
+
+async def explain_queries() -> list[dict]:
+    """Ejecuta explain (queryPlanner) sobre cada consulta registrada y marca los COLLSCAN"""
+    db = get_mongo_client()[DB]
+    report = []
+    for query in QUERIES:
+        command = {"find": query["collection"], "filter": query["filter"]}
+        if query["sort"]:
+            command["sort"] = dict(query["sort"])
+        try:
+            explained = await db.command("explain", command, verbosity="queryPlanner")
+            stages = _stages(explained.get("queryPlanner", {}).get("winningPlan", {}))
+            report.append({
+                "name": query["name"],
+                "collection": query["collection"],
+                "stages": stages,
+                "collscan": "COLLSCAN" in stages,
+            })
+        except OperationFailure as e:
+            report.append({"name": query["name"], "collection": query["collection"], "error": str(e)})
+    return report
+
+
+async def _main(action: str) -> int:
+    # Importar los controladores registra sus consultas
+    import controllers.futbol_team_controller  # noqa: F401
+    import controllers.shirt_controller  # noqa: F401
+    import controllers.user_controller  # noqa: F401
+    import utils.team_index  # noqa: F401
+    # Ejecutado con -m este módulo es __main__; el registro vive en utils.indexes
+    from utils import indexes
+
+    if action == "ensure":
+        print(json.dumps(await indexes.ensure_indexes(), indent=2))
+        return 0
+
+    report = await indexes.explain_queries()
+    for entry in report:
+        status = "COLLSCAN" if entry.get("collscan") else ("ERROR" if "error" in entry else "ok")
+        print(f"{status:<9} {entry['collection']:<14} {entry['name']:<28} {entry.get('stages') or entry.get('error')}")
+    return 1 if any(entry.get("collscan") for entry in report) else 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2 or sys.argv[1] not in ("ensure", "explain"):
+        print("Uso: python -m utils.indexes [ensure|explain]")
+        sys.exit(2)
+    sys.exit(asyncio.run(_main(sys.argv[1])))
@@ -0,0 +1,223 @@
+"""Métricas en formato de texto de Prometheus, sin dependencias externas.
+
+- ``MetricsMiddleware`` (ASGI): latencia por ruta, peticiones en vuelo y códigos de estado.
+- ``MongoCommandListener`` / ``MongoPoolListener``: latencia por colección y comando,
+  y espera para obtener una conexión del pool (se registran en utils/mongodb.py).
+- ``render()`` produce el cuerpo de ``GET /metrics``.
+"""
+import time
+from bisect import bisect_left
+
+from pymongo import monitoring
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name, self.help, self.label_names = name, help, labels
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1.0):
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self):
+        for labels, value in self._values.items():
+            yield self.name, _labels(self.label_names, labels), value
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, *labels, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels):
+        self._values[labels] = value
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name, self.help, self.label_names = name, help, labels
+        self.buckets = buckets
+        # labels -> [conteo por bucket (+Inf al final), suma, total]
+        self._values: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels):
+        entry = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def samples(self):
+        names = self.label_names + ("le",)
+        for labels, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f"{self.name}_bucket", _labels(names, labels + (le,)), cumulative
+            yield f"{self.name}_sum", _labels(self.label_names, labels), total
+            yield f"{self.name}_count", _labels(self.label_names, labels), count
+
+
+_metrics: list = []
+_collectors: list = []
+# Familias de los colectores: nombre -> (ayuda, tipo)
+_families: dict[str, tuple[str, str]] = {}
+
+
+def _register(metric):
+    _metrics.append(metric)
+    return metric
+
+
+def register_collector(collect):
+    """Añade una función que devuelve [(nombre, {labels}, valor)] leída en cada scrape"""
+    _collectors.append(collect)
+
+
+def describe(name: str, help: str, type: str = "gauge"):
+    """Ayuda y tipo de una familia que emite un colector (sin describir: gauge)"""
+    _families[name] = (help, type)
+
+
+def render() -> str:
+    lines = []
+    for metric in _metrics:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        for name, labels, value in metric.samples():
+            lines.append(f"{name}{labels} {value}")
+    # Cada familia una sola vez y con sus muestras juntas, aunque vengan de varios colectores
+    families: dict[str, list] = {}
+    for collect in _collectors:
+        for name, labels, value in collect():
+            families.setdefault(name, []).append(f"{name}{_labels(tuple(labels), tuple(labels.values()))} {value}")
+    for name, samples in families.items():
+        help, type = _families.get(name, (name, "gauge"))
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} {type}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+
+HTTP_REQUEST_DURATION = _register(Histogram(
+    "http_request_duration_seconds", "Latencia de las peticiones HTTP por ruta", ("method", "route")))
+HTTP_REQUESTS = _register(Counter(
+    "http_requests_total", "Peticiones HTTP por ruta y código de estado", ("method", "route", "status")))
+HTTP_IN_FLIGHT = _register(Gauge(
+    "http_requests_in_flight", "Peticiones HTTP en curso"))
+MONGO_COMMAND_DURATION = _register(Histogram(
+    "mongodb_command_duration_seconds", "Latencia de los comandos de MongoDB", ("collection", "command", "outcome")))
+MONGO_POOL_CHECKOUT = _register(Histogram(
+    "mongodb_pool_checkout_seconds", "Espera para obtener una conexión del pool de MongoDB"))
+MONGO_POOL_CHECKOUT_FAILURES = _register(Counter(
+    "mongodb_pool_checkout_failures_total", "Fallos al obtener una conexión del pool", ("reason",)))
+MONGO_POOL_CONNECTIONS = _register(Gauge(
+    "mongodb_pool_connections", "Conexiones abiertas en el pool de MongoDB"))
+MONGO_POOL_IN_USE = _register(Gauge(
+    "mongodb_pool_connections_in_use", "Conexiones del pool de MongoDB prestadas a una operación"))
+AUTH_VERIFY_DURATION = _register(Histogram(
+    "auth_verify_seconds", "Tiempo de verificación de tokens JWT", ("cached",),
+    buckets=(0.00001, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.005)))
+
+
+class MetricsMiddleware:
+    """Middleware ASGI puro (sin BaseHTTPMiddleware) que mide cada petición HTTP"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_FLIGHT.dec()
+            # Se usa la plantilla de la ruta (/shirts/{shirt_id}) para acotar la cardinalidad
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            HTTP_REQUEST_DURATION.observe(elapsed, scope["method"], path)
+            HTTP_REQUESTS.inc(scope["method"], path, str(status))
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    def __init__(self):
+        self._collections: dict[tuple, str] = {}
+
+    def started(self, event):
+        # find/insert/... llevan la colección como valor del comando; getMore en "collection"
+        collection = event.command.get("collection" if event.command_name == "getMore" else event.command_name)
+        key = (event.connection_id, event.request_id)
+        self._collections[key] = collection if isinstance(collection, str) else "-"
+
+    def _finish(self, event, outcome: str):
+        collection = self._collections.pop((event.connection_id, event.request_id), "-")
+        MONGO_COMMAND_DURATION.observe(event.duration_micros / 1_000_000, collection, event.command_name, outcome)
+
+    def succeeded(self, event):
+        self._finish(event, "ok")
+
+    def failed(self, event):
+        self._finish(event, "error")
+
+
+class MongoPoolListener(monitoring.ConnectionPoolListener):
+    def connection_checked_out(self, event):
+        MONGO_POOL_CHECKOUT.observe(event.duration)
+        MONGO_POOL_IN_USE.inc()
+
+    def connection_checked_in(self, event):
+        MONGO_POOL_IN_USE.dec()
+
+    def connection_created(self, event):
+        MONGO_POOL_CONNECTIONS.inc()
+
+    def connection_closed(self, event):
+        MONGO_POOL_CONNECTIONS.dec()
+
+    def connection_check_out_failed(self, event):
+        MONGO_POOL_CHECKOUT.observe(event.duration)
+        MONGO_POOL_CHECKOUT_FAILURES.inc(str(event.reason))
+
+    # El resto de eventos del pool no se miden
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_cleared(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_ready(self, event): pass
+    def connection_check_out_started(self, event): pass
@@ -0,0 +1,42 @@
+"""Migraciones de datos de MongoDB que no se hacen al arrancar.
+
+    python -m utils.migrations effective_price         # rellena effective_price donde falta
+    python -m utils.migrations effective_price --all   # lo recalcula en todas las camisetas
+
+Son idempotentes: se pueden repetir sin efectos (p. ej. tras un despliegue
+escalonado en el que una instancia antigua escribió camisetas sin el campo).
+"""
+import asyncio
+import json
+import sys
+
+from models.shirt import EFFECTIVE_PRICE_EXPR
+from utils.mongodb import get_collection
+
+
+async def backfill_effective_price(recompute: bool = False) -> int:
+    """Calcula effective_price en Mongo con un solo update_many; devuelve los documentos modificados"""
+    query = {} if recompute else {"effective_price": None}  # None también encuentra los que no lo tienen
+    result = await get_collection("shirts").update_many(query, [{"$set": {"effective_price": EFFECTIVE_PRICE_EXPR}}])
+    return result.modified_count
+
+
+MIGRATIONS = {
+    "effective_price": backfill_effective_price,
+}
+
+
+async def _main(name: str, recompute: bool) -> int:
+    modified = await MIGRATIONS[name](recompute)
+    print(json.dumps({"migration": name, "modified": modified}))
+    return 0
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    recompute = "--all" in args
+    names = [arg for arg in args if arg != "--all"]
+    if len(names) != 1 or names[0] not in MIGRATIONS:
+        print(f"Uso: python -m utils.migrations [{'|'.join(MIGRATIONS)}] [--all]")
+        sys.exit(2)
+    sys.exit(asyncio.run(_main(names[0], recompute)))
@@ -1,45 +1,122 @@
 import os
+import asyncio
+import logging
 from dotenv import load_dotenv
-from pymongo import MongoClient
+from pymongo import AsyncMongoClient
 from pymongo.server_api import ServerApi
+from utils.metrics import MONGO_POOL_CONNECTIONS, MONGO_POOL_IN_USE, MongoCommandListener, MongoPoolListener
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Try both variable names for compatibility
 DB = os.getenv("DATABASE_NAME") or os.getenv("MONGO_DB_NAME")
 URI = os.getenv("MONGODB_URI") or os.getenv("URI")
 
-# Validate that we have the required environment variables
-if not DB:
-    raise ValueError("Database name not found. Set DATABASE_NAME or MONGO_DB_NAME environment variable")
-if not URI:
-    raise ValueError("MongoDB URI not found. Set MONGODB_URI or URI environment variable")
+# Conexiones que se abren al arrancar (connect_mongo) y mínimo que mantiene el pool después
+MONGO_WARMUP_CONNECTIONS = int(os.getenv("MONGO_WARMUP_CONNECTIONS", "4"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+
+# Procesos que sirven la app (uvicorn lee la misma variable para --workers)
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+# Conexiones que puede abrir la app en total, sumando todos los procesos (límite del plan de Atlas);
+# 0 deja el tamaño de pool por defecto del driver. MONGO_MAX_POOL_SIZE lo fija a mano por proceso.
+MONGO_CONNECTION_BUDGET = int(os.getenv("MONGO_CONNECTION_BUDGET", "0"))
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "0"))
+# Nodos del replica set: el driver abre 2 conexiones de monitorización a cada uno
+MONGO_REPLICA_SET_SIZE = int(os.getenv("MONGO_REPLICA_SET_SIZE", "3"))
+
+
+def max_pool_size(budget: int = MONGO_CONNECTION_BUDGET, workers: int = WEB_CONCURRENCY,
+                  servers: int = MONGO_REPLICA_SET_SIZE) -> int:
+    """maxPoolSize por proceso para que ``workers`` procesos no pasen de ``budget`` conexiones.
+
+    Las operaciones van al primario, así que el pool solo crece contra él; las de
+    monitorización (2 por nodo y proceso) se descuentan del presupuesto.
+    """
+    if MONGO_MAX_POOL_SIZE:
+        return MONGO_MAX_POOL_SIZE
+    if not budget:
+        return 100  # valor por defecto de pymongo
+    pool = budget // max(1, workers) - 2 * servers
+    if pool < 1:
+        # Con una conexión por proceso ya se pasa del presupuesto: se avisa en vez de ocultarlo
+        logger.warning("MONGO_CONNECTION_BUDGET=%s is too small for %s workers and %s servers: "
+                       "using maxPoolSize=1, about %s connections in total",
+                       budget, workers, servers, max(1, workers) * (1 + 2 * servers))
+        return 1
+    return pool
 
 
 _client = None
+# Proceso que creó _client; un cliente heredado por fork no se puede usar en el hijo
+_client_pid = None
 
 def get_mongo_client():
-    global _client
+    """Devuelve el cliente asíncrono de MongoDB (se crea una sola vez por proceso)"""
+    global _client, _client_pid
     if _client is None:
-        _client = MongoClient(
+        # Se valida aquí y no al importar: importar la app no debe exigir la configuración de Mongo
+        if not DB:
+            raise ValueError("Database name not found. Set DATABASE_NAME or MONGO_DB_NAME environment variable")
+        if not URI:
+            raise ValueError("MongoDB URI not found. Set MONGODB_URI or URI environment variable")
+        _client = AsyncMongoClient(
             URI,
             server_api=ServerApi("1"),
             tls=True,
             tlsAllowInvalidCertificates=True,
-            serverSelectionTimeoutMS=5000  # Timeout más corto
+            serverSelectionTimeoutMS=5000,  # Timeout más corto
+            minPoolSize=MONGO_MIN_POOL_SIZE,
+            maxPoolSize=max_pool_size(),
+            event_listeners=[MongoCommandListener(), MongoPoolListener()]  # Métricas (/metrics)
         )
+        _client_pid = os.getpid()
     return _client
 
+def _forget_client_after_fork():
+    # Sus sockets y su hilo de monitorización son del padre: el hijo crea su propio cliente.
+    # No se cierra (lo cerraría también para el padre). Un cliente asignado desde fuera
+    # (benchmarks) no tiene _client_pid y se conserva.
+    global _client, _client_pid
+    if _client_pid is not None and _client_pid != os.getpid():
+        _client = None
+        _client_pid = None
+        MONGO_POOL_CONNECTIONS.set(0)
+        MONGO_POOL_IN_USE.set(0)
+
+os.register_at_fork(after_in_child=_forget_client_after_fork)
+
+async def connect_mongo(connections: int = MONGO_WARMUP_CONNECTIONS):
+    """Conecta al arrancar y deja ``connections`` conexiones abiertas en el pool.
+
+    Cada ping concurrente ocupa una conexión distinta, así que el handshake TCP/TLS
+    y la autenticación se pagan aquí y no en las primeras peticiones.
+    """
+    client = get_mongo_client()
+    await client.admin.command("ping")
+    connections = min(connections, max_pool_size())
+    if connections > 1:
+        await asyncio.gather(*(client.admin.command("ping") for _ in range(connections)))
+
+async def close_mongo_client():
+    global _client, _client_pid
+    if _client is not None:
+        await _client.close()
+        _client = None
+        _client_pid = None
+
 def get_collection(col):
-    """Obtiene una colección de MongoDB"""
+    """Obtiene una colección asíncrona de MongoDB; sus operaciones deben usarse con await"""
     client = get_mongo_client()
     return client[DB][col]
 
-def t_connection():
+async def t_connection():
     try:
         client = get_mongo_client()
-        client.admin.command("ping")
+        await client.admin.command("ping")
         return True
     except Exception as e:
-        print(f"Error connecting to MongoDB: {e}")
-        return False
\ No newline at end of file
+        logger.warning("Error connecting to MongoDB: %s", e)
+        return False
@@ -0,0 +1,97 @@
+import base64
+import json
+from typing import Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+
+from utils.responses import dumps
+
+PAGE_SIZE_DEFAULT = 100
+PAGE_SIZE_MAX = 1000
+STREAM_BATCH_SIZE = 500
+
+
+def encode_cursor(last_id: ObjectId, sort_field: str = "_id", sort_value=None) -> str:
+    """Cursor opaco para la siguiente página (keyset sobre el campo de orden y _id)"""
+    data = {"id": str(last_id)}
+    if sort_field != "_id":
+        data["s"] = sort_field
+        data["v"] = sort_value
+    raw = json.dumps(data, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> tuple[ObjectId, dict]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded))
+        return ObjectId(data["id"]), data
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
+
+
+def decode_cursor(cursor: str) -> ObjectId:
+    return _decode(cursor)[0]
+
+
+def sort_spec(sort_field: str = "_id", direction: int = 1) -> list:
+    """Orden de Mongo con _id como desempate para que el keyset sea estable"""
+    if sort_field == "_id":
+        return [("_id", direction)]
+    return [(sort_field, direction), ("_id", direction)]
+
+
+def keyset_filter(after: Optional[str], sort_field: str = "_id", direction: int = 1) -> dict:
+    """Filtro de Mongo para empezar justo después del cursor recibido"""
+    if not after:
+        return {}
+    last_id, data = _decode(after)
+    op = "$gt" if direction == 1 else "$lt"
+    if sort_field == "_id":
+        return {"_id": {op: last_id}}
+    if data.get("s") != sort_field:
+        raise HTTPException(status_code=400, detail="El cursor no corresponde al orden solicitado")
+    value = data.get("v")
+    # null (o campo ausente) va antes que cualquier valor en orden ascendente y después en
+    # descendente; {"$gt": null} y {"$lt": null} no encuentran nada, así que se trata aparte
+    if value is None:
+        ties = {sort_field: None, "_id": {op: last_id}}
+        return {"$or": [ties, {sort_field: {"$ne": None}}]} if direction == 1 else ties
+    keyset = [{sort_field: {op: value}}, {sort_field: value, "_id": {op: last_id}}]
+    if direction == -1:
+        keyset.append({sort_field: None})
+    return {"$or": keyset}
+
+
+def parse_projection(fields: Optional[str], allowed) -> Optional[dict]:
+    """Convierte ``fields=a,b`` en una proyección de Mongo; None si no se pidió"""
+    if not fields:
+        return None
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Campos no válidos: {', '.join(unknown)}")
+    return {f: 1 for f in requested}
+
+
+def document_to_dict(doc: dict) -> dict:
+    """Documento de Mongo listo para JSON: _id pasa a ser id"""
+    doc["id"] = str(doc.pop("_id"))
+    return doc
+
+
+async def iter_documents(cursor):
+    async for doc in cursor:
+        yield document_to_dict(doc)
+
+
+async def json_array_stream(documents):
+    """Escribe un array JSON documento a documento según los entrega el cursor"""
+    yield b"["
+    separator = b""
+    async for doc in documents:
+        yield separator + dumps(doc)
+        separator = b","
+    yield b"]"
@@ -0,0 +1,25 @@
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+
+
+def _default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content) -> bytes:
+    """JSON con orjson (UTF-8 sin escapar, como ``ensure_ascii=False``)"""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse serializada con orjson, para las rutas que devuelven dicts ya armados.
+
+    Las rutas con response_model no la necesitan: FastAPI ya las serializa a bytes con
+    Pydantic, y fijarla como ``default_response_class`` desactivaría ese camino.
+    """
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -0,0 +1,352 @@
+import asyncio
+import heapq
+import logging
+import os
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from utils.mongodb import get_collection
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# 0 desactiva la resincronización periódica (las escrituras de este proceso se aplican al momento)
+SEARCH_INDEX_RESYNC_SECONDS = float(os.getenv("SEARCH_INDEX_RESYNC_SECONDS", "300"))
+
+# Peso de cada campo en la relevancia de /shirts/search
+WEIGHTS = {"name": 3.0, "description": 1.0, "team_name": 2.0, "team_country": 1.0}
+
+_WORD = re.compile(r"\w+")
+
+# Camisetas indexadas entre cesiones del bucle de eventos durante load()
+_LOAD_BATCH = 500
+
+
+def tokenize(text: str) -> list[str]:
+    """Palabras en minúsculas y sin tildes ("Camiseta Atlético" -> ["camiseta", "atletico"])"""
+    text = text or ""
+    if text.isascii():
+        # Sin tildes que quitar (la mayoría de nombres): es lo que más cuesta al cargar el índice
+        return _WORD.findall(text.lower())
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return _WORD.findall(text.lower())
+
+
+def _vocab_add(vocab: list, term: str):
+    i = bisect_left(vocab, term)
+    if i == len(vocab) or vocab[i] != term:
+        insort(vocab, term)
+
+
+def _vocab_remove(vocab: list, term: str):
+    i = bisect_left(vocab, term)
+    if i < len(vocab) and vocab[i] == term:
+        del vocab[i]
+
+
+def _prefixed(vocab: list, prefix: str):
+    """Términos del vocabulario ordenado que empiezan por ``prefix``"""
+    for i in range(bisect_left(vocab, prefix), len(vocab)):
+        if not vocab[i].startswith(prefix):
+            break
+        yield vocab[i]
+
+
+class SearchIndex:
+    """Índice invertido en memoria sobre camisetas y equipos.
+
+    ``search`` puntúa por nombre/descripción de la camiseta y nombre/país del
+    equipo. ``autocomplete`` trabaja con títulos distintos (nombre de camiseta +
+    equipo): cada término guarda sus títulos ya ordenados por popularidad, y un
+    prefijo solo lee las cabezas de esas listas, así que el coste depende del
+    número de sugerencias y no del tamaño del catálogo. Las escrituras de los
+    controladores lo actualizan al momento; la resincronización periódica recoge
+    las de otras instancias.
+    """
+
+    def __init__(self):
+        self._shirts: dict[str, tuple] = {}                 # shirt_id -> (name, description, team_id)
+        self._teams: dict[str, tuple] = {}                  # team_id -> (name, country)
+        self._text = defaultdict(dict)                      # término -> {shirt_id: peso}
+        self._team_text = defaultdict(dict)                 # término -> {team_id: peso}
+        self._team_shirts = defaultdict(set)                # team_id -> shirt_ids
+        self._titles = defaultdict(set)                     # (name, team_id) -> shirt_ids
+        self._team_titles = defaultdict(set)                # team_id -> títulos
+        self._title_words: dict[tuple, frozenset] = {}      # título -> palabras del nombre y del equipo
+        self._term_titles = defaultdict(set)                # término -> títulos
+        self._ranked: dict[str, list] = {}                  # término -> títulos ordenados (se calcula al leer)
+        self._vocab: list[str] = []                         # claves de _term_titles, ordenadas
+        self._journal: Optional[list] = None                # escrituras durante load(), para repetirlas
+        self._tasks: list[asyncio.Task] = []
+        self.searches = 0
+        self.autocompletes = 0
+
+    async def load(self):
+        """Reconstruye el índice completo desde Mongo sin bloquear el bucle de eventos"""
+        # Las escrituras que lleguen mientras tanto se apuntan y se repiten sobre el índice nuevo
+        self._journal = []
+        try:
+            teams = await get_collection("futbol_teams").find({}, {"name": 1, "country": 1}).to_list()
+            shirts = await get_collection("shirts").find({}, {"name": 1, "description": 1, "team_id": 1}).to_list()
+            fresh = SearchIndex()
+            for team in teams:
+                fresh.set_team(str(team["_id"]), team.get("name", ""), team.get("country", ""))
+            for index, shirt in enumerate(shirts):
+                fresh.set_shirt(str(shirt["_id"]), shirt.get("name", ""), shirt.get("description", ""), shirt.get("team_id", ""))
+                if index % _LOAD_BATCH == _LOAD_BATCH - 1:
+                    await asyncio.sleep(0)  # Cede el bucle: con cientos de miles de camisetas tarda segundos
+            # Sin await desde aquí hasta sustituir el estado
+            for method, args in self._journal:
+                getattr(fresh, method)(*args)
+        finally:
+            self._journal = None
+        # Se sustituye el estado de golpe para que las lecturas nunca vean un índice a medias
+        tasks, searches, autocompletes = self._tasks, self.searches, self.autocompletes
+        self.__dict__.update(fresh.__dict__)
+        self._tasks, self.searches, self.autocompletes = tasks, searches, autocompletes
+        logger.info("Search index loaded with %s shirts and %s teams", len(self._shirts), len(self._teams))
+
+    def _record(self, method: str, *args):
+        if self._journal is not None:
+            self._journal.append((method, args))
+
+    # --- Escrituras -------------------------------------------------------------
+
+    def set_shirt(self, shirt_id: str, name: str, description: str, team_id: str):
+        self._record("set_shirt", shirt_id, name, description, team_id)
+        self._remove_shirt(shirt_id)
+        self._shirts[shirt_id] = (name, description, team_id)
+        for field, text in (("name", name), ("description", description)):
+            for term in tokenize(text):
+                postings = self._text[term]
+                postings[shirt_id] = postings.get(shirt_id, 0.0) + WEIGHTS[field]
+        self._team_shirts[team_id].add(shirt_id)
+        title = (name, team_id)
+        if title in self._titles:
+            self._recount(title, shirt_id, added=True)
+        else:
+            # Antes de indexarlo: el orden por popularidad ya cuenta esta camiseta
+            self._titles[title].add(shirt_id)
+            self._team_titles[team_id].add(title)
+            self._index_title(title)
+
+    def remove_shirt(self, shirt_id: str):
+        self._record("remove_shirt", shirt_id)
+        self._remove_shirt(shirt_id)
+
+    def _remove_shirt(self, shirt_id: str):
+        previous = self._shirts.pop(shirt_id, None)
+        if previous is None:
+            return
+        name, description, team_id = previous
+        for term in set(tokenize(name)) | set(tokenize(description)):
+            postings = self._text.get(term)
+            if postings is not None:
+                postings.pop(shirt_id, None)
+                if not postings:
+                    del self._text[term]
+        self._team_shirts[team_id].discard(shirt_id)
+        if not self._team_shirts[team_id]:
+            del self._team_shirts[team_id]
+        title = (name, team_id)
+        if len(self._titles[title]) > 1:
+            self._recount(title, shirt_id, added=False)
+            return
+        del self._titles[title]
+        self._team_titles[team_id].discard(title)
+        if not self._team_titles[team_id]:
+            del self._team_titles[team_id]
+        self._unindex_title(title)
+
+    def _recount(self, title: tuple, shirt_id: str, added: bool):
+        """Suma o resta una camiseta al título y lo recoloca en las listas ya ordenadas"""
+        lists = [self._ranked[term] for term in self._title_words.get(title, ()) if term in self._ranked]
+        for ranked in lists:
+            del ranked[bisect_left(ranked, self._rank_key(title), key=self._rank_key)]
+        if added:
+            self._titles[title].add(shirt_id)
+        else:
+            self._titles[title].discard(shirt_id)
+        for ranked in lists:
+            insort(ranked, title, key=self._rank_key)
+
+    def set_team(self, team_id: str, name: str, country: str):
+        self._record("set_team", team_id, name, country)
+        self._remove_team_terms(team_id)
+        self._teams[team_id] = (name, country)
+        for field, text in (("team_name", name), ("team_country", country)):
+            for term in tokenize(text):
+                postings = self._team_text[term]
+                postings[team_id] = postings.get(team_id, 0.0) + WEIGHTS[field]
+        # Los títulos del equipo incluyen sus palabras: se reindexan con los datos nuevos
+        for title in self._team_titles.get(team_id, ()):
+            self._unindex_title(title)
+            self._index_title(title)
+
+    def remove_team(self, team_id: str):
+        self._record("remove_team", team_id)
+        self._remove_team_terms(team_id)
+        self._teams.pop(team_id, None)
+
+    def _remove_team_terms(self, team_id: str):
+        previous = self._teams.get(team_id)
+        if previous is None:
+            return
+        for term in set(tokenize(previous[0])) | set(tokenize(previous[1])):
+            postings = self._team_text.get(term)
+            if postings is not None:
+                postings.pop(team_id, None)
+                if not postings:
+                    del self._team_text[term]
+
+    def _index_title(self, title: tuple):
+        team = self._teams.get(title[1], ("", ""))
+        words = frozenset(tokenize(title[0]) + tokenize(team[0]) + tokenize(team[1]))
+        self._title_words[title] = words
+        for term in words:
+            titles = self._term_titles[term]
+            if not titles:
+                _vocab_add(self._vocab, term)
+            titles.add(title)
+            ranked = self._ranked.get(term)
+            if ranked is not None:
+                # Se mantiene la lista ya ordenada en vez de recalcularla en la siguiente lectura
+                insort(ranked, title, key=self._rank_key)
+
+    def _unindex_title(self, title: tuple):
+        for term in self._title_words.pop(title, ()):
+            titles = self._term_titles.get(term)
+            if titles is None or title not in titles:
+                continue
+            titles.discard(title)
+            ranked = self._ranked.get(term)
+            if ranked is not None:
+                ranked.remove(title)
+            if not titles:
+                del self._term_titles[term]
+                self._ranked.pop(term, None)
+                _vocab_remove(self._vocab, term)
+
+    # --- Lecturas ---------------------------------------------------------------
+
+    def search(self, q: str, limit: int = 20) -> list[str]:
+        """Ids de camiseta ordenados por nº de términos encontrados y luego por peso"""
+        self.searches += 1
+        terms = set(tokenize(q))
+        matched: dict[str, int] = defaultdict(int)
+        scores: dict[str, float] = defaultdict(float)
+        for term in terms:
+            hits: dict[str, float] = dict(self._text.get(term, {}))
+            for team_id, weight in self._team_text.get(term, {}).items():
+                for shirt_id in self._team_shirts.get(team_id, ()):
+                    hits[shirt_id] = hits.get(shirt_id, 0.0) + weight
+            for shirt_id, weight in hits.items():
+                matched[shirt_id] += 1
+                scores[shirt_id] += weight
+        return heapq.nsmallest(limit, scores, key=lambda s: (-matched[s], -scores[s], self._shirts[s][0]))
+
+    def _rank_key(self, title: tuple):
+        # El título entero desempata: cada título tiene una sola posición en la lista
+        return -len(self._titles.get(title, ())), title[0], title[1]
+
+    def _ranked_titles(self, term: str) -> list:
+        """Títulos del término por nº de camisetas; se ordena en la primera lectura y luego se mantiene"""
+        ranked = self._ranked.get(term)
+        if ranked is None:
+            if term not in self._term_titles:
+                # Palabras que no están en el índice: no se guardan (cualquier cliente podría llenar _ranked)
+                return []
+            ranked = self._ranked[term] = sorted(self._term_titles[term], key=self._rank_key)
+        return ranked
+
+    def autocomplete(self, q: str, limit: int = 10) -> list[dict]:
+        """Sugerencias para lo que se está escribiendo: la última palabra cuenta como prefijo"""
+        self.autocompletes += 1
+        words = tokenize(q)
+        if not words:
+            return []
+        *complete, prefix = words
+        wanted = limit * 5
+
+        prefix_terms = list(_prefixed(self._vocab, prefix))
+        required = set(complete)
+        candidates, seen = [], set()
+        if complete:
+            # Se recorre la lista más corta (el término ya escrito más selectivo o los del prefijo)
+            driver = min(required, key=lambda t: len(self._term_titles.get(t, ())))
+            if sum(len(self._term_titles[t]) for t in prefix_terms) < len(self._term_titles.get(driver, ())):
+                sources = [self._ranked_titles(term) for term in prefix_terms]
+            else:
+                sources = [self._ranked_titles(driver)]
+            for ranked in sources:
+                for title in ranked:
+                    title_words = self._title_words[title]
+                    if title not in seen and required <= title_words and any(w.startswith(prefix) for w in title_words):
+                        seen.add(title)
+                        candidates.append(title)
+                        if len(candidates) >= wanted:
+                            break
+                if len(candidates) >= wanted:
+                    break
+        else:
+            # Solo un prefijo: cabeza de la lista de cada término que empieza por él
+            for term in prefix_terms:
+                for title in self._ranked_titles(term)[:limit]:
+                    if title not in seen:
+                        seen.add(title)
+                        candidates.append(title)
+                if len(candidates) >= wanted:
+                    break
+
+        query = " ".join(words)
+        normalized = {title: " ".join(tokenize(title[0])) for title in candidates}
+        candidates.sort(key=lambda t: (not normalized[t].startswith(query), -len(self._titles.get(t, ())), t[0]))
+        suggestions = []
+        for name, team_id in candidates[:limit]:
+            suggestions.append({
+                "id": min(self._titles[(name, team_id)]),
+                "name": name,
+                "team_id": team_id,
+                "team_name": self._teams.get(team_id, ("",))[0],
+            })
+        return suggestions
+
+    # --- Sincronización ---------------------------------------------------------
+
+    def start_background_sync(self):
+        if SEARCH_INDEX_RESYNC_SECONDS > 0:
+            self._tasks.append(asyncio.create_task(self._resync_loop()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _resync_loop(self):
+        while True:
+            await asyncio.sleep(SEARCH_INDEX_RESYNC_SECONDS)
+            try:
+                await self.load()
+            except Exception as e:
+                logger.warning("Search index resync failed: %s", e)
+
+    def stats(self) -> dict:
+        return {
+            "shirts": len(self._shirts),
+            "teams": len(self._teams),
+            "terms": len(self._text) + len(self._team_text),
+            "titles": len(self._titles),
+            "searches": self.searches,
+            "autocompletes": self.autocompletes,
+        }
+
+
+search_index = SearchIndex()
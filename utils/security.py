@@ -1,7 +1,6 @@
 import os
-import secrets
+import time
 import hashlib
-import base64
 import jwt
 
 from datetime import datetime, timedelta
@@ -10,12 +9,18 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from jwt import PyJWTError
 from functools import wraps
+from typing import Optional
+from utils.metrics import AUTH_VERIFY_DURATION
 
 load_dotenv()
 
 SECRET_KEY = os.getenv("SECRET_KEY")
+TOKEN_CACHE_MAXSIZE = int(os.getenv("TOKEN_CACHE_MAXSIZE", "10000"))
 security = HTTPBearer()
 
+# Claims ya verificados, indexados por el sha256 del token: {digest: (exp, claims)}
+_verified_tokens: dict[bytes, tuple[float, dict]] = {}
+
 # Función para crear un JWT
 def create_jwt_token(
         firstname:str
@@ -42,171 +47,124 @@ def create_jwt_token(
     )
     return token
 
-def validateuser(func):
-    @wraps(func)
-    async def wrapper( *args, **kwargs ):
-        request = kwargs.get('request')
-        if not request:
-            raise HTTPException( status_code=400, detail="Request object not found"  )
-
-        authorization: str = request.headers.get("Authorization")
-        if not authorization:
-            raise HTTPException( status_code=400, detail="Authorization header missing"  )
-
-        schema, token = authorization.split()
-        if schema.lower() != "bearer":
-            raise HTTPException( status_code=400, detail="Invalid auth schema"  )
-
-        try:
-            payload = jwt.decode( token , SECRET_KEY, algorithms=["HS256"] )
-
-            email = payload.get("email")
-            firstname = payload.get("firstname")
-            lastname = payload.get("lastname")
-            active = payload.get("active")
-            exp = payload.get("exp")
-            id = payload.get("id")
-
-            if email is None:
-                raise HTTPException( status_code=401 , detail="Token Invalid" )
+def _bearer_token(authorization: Optional[str]) -> str:
+    if not authorization:
+        raise HTTPException( status_code=400, detail="Authorization header missing"  )
+
+    parts = authorization.split()
+    if len(parts) != 2 or parts[0].lower() != "bearer":
+        raise HTTPException( status_code=400, detail="Invalid auth schema"  )
+    return parts[1]
+
+
+def _remember(digest: bytes, exp: float, claims: dict):
+    if len(_verified_tokens) >= TOKEN_CACHE_MAXSIZE:
+        now = time.time()
+        for key in [k for k, (expires, _) in _verified_tokens.items() if expires <= now]:
+            del _verified_tokens[key]
+        if len(_verified_tokens) >= TOKEN_CACHE_MAXSIZE:
+            # Descarta el más antiguo (los dict conservan el orden de inserción)
+            del _verified_tokens[next(iter(_verified_tokens))]
+    _verified_tokens[digest] = (exp, claims)
+
+
+def verify_token(token: str) -> dict:
+    """Verifica un JWT y devuelve sus claims.
+
+    La firma HMAC solo se comprueba la primera vez; después los claims salen de
+    la caché hasta que el token expira.
+    """
+    start = time.perf_counter()
+    digest = hashlib.sha256(token.encode()).digest()
+    cached = _verified_tokens.get(digest)
+    if cached is not None:
+        exp, claims = cached
+        if exp > time.time():
+            AUTH_VERIFY_DURATION.observe(time.perf_counter() - start, "true")
+            return claims
+        del _verified_tokens[digest]
 
-            if datetime.utcfromtimestamp(exp) < datetime.utcnow():
-                raise HTTPException( status_code=401 , detail="Expired token" )
-
-            if not active:
-                raise HTTPException( status_code=401 , detail="Inactive user" )
-
-            request.state.email = email
-            request.state.firstname = firstname
-            request.state.lastname = lastname
-            request.state.id = id
+    try:
+        # jwt.decode ya rechaza los tokens expirados
+        payload = jwt.decode( token , SECRET_KEY, algorithms=["HS256"], options={"require": ["exp"]} )
+    except PyJWTError:
+        raise HTTPException( status_code=401, detail="Invalid token or expired token"  )
 
+    if payload.get("email") is None:
+        raise HTTPException( status_code=401 , detail="Token Invalid" )
 
-        except PyJWTError:
-            raise HTTPException( status_code=401, detail="Invalid token or expired token"  )
+    if not payload.get("active"):
+        raise HTTPException( status_code=401 , detail="Inactive user" )
 
-        return await func( *args, **kwargs )
-    return wrapper
+    admin = bool(payload.get("admin", False))
+    claims = {
+        "id": payload.get("id"),
+        "email": payload.get("email"),
+        "firstname": payload.get("firstname"),
+        "lastname": payload.get("lastname"),
+        "active": payload.get("active"),
+        "admin": admin,
+        "role": "admin" if admin else "user"
+    }
+    _remember(digest, payload["exp"], claims)
+    AUTH_VERIFY_DURATION.observe(time.perf_counter() - start, "false")
+    return claims
 
-def validateadmin(func):
-    @wraps(func)
-    async def wrapper( *args, **kwargs ):
-        request = kwargs.get('request')
-        if not request:
-            raise HTTPException( status_code=400, detail="Request object not found"  )
 
-        authorization: str = request.headers.get("Authorization")
-        if not authorization:
-            raise HTTPException( status_code=400, detail="Authorization header missing"  )
+def authenticate(request: Request, admin: bool = False) -> dict:
+    """Autentica la petición una sola vez y deja los datos del usuario en request.state"""
+    claims = getattr(request.state, "user", None)
+    if claims is None:
+        claims = verify_token(_bearer_token(request.headers.get("Authorization")))
+        request.state.user = claims
+        request.state.email = claims["email"]
+        request.state.firstname = claims["firstname"]
+        request.state.lastname = claims["lastname"]
+        request.state.admin = claims["admin"]
+        request.state.id = claims["id"]
 
-        schema, token = authorization.split()
-        if schema.lower() != "bearer":
-            raise HTTPException( status_code=400, detail="Invalid auth schema"  )
+    if admin and not claims["admin"]:
+        raise HTTPException( status_code=401 , detail="Inactive user or not admin" )
+    return claims
 
-        try:
-            payload = jwt.decode( token , SECRET_KEY, algorithms=["HS256"] )
 
-            email = payload.get("email")
-            firstname = payload.get("firstname")
-            lastname = payload.get("lastname")
-            active = payload.get("active")
-            admin = payload.get("admin")
-            exp = payload.get("exp")
-            id = payload.get("id")
+# Dependencias para FastAPI: Depends(current_user) / Depends(current_admin)
+def current_user(request: Request) -> dict:
+    return authenticate(request)
 
-            if email is None:
-                raise HTTPException( status_code=401 , detail="Token Invalid" )
 
-            if datetime.utcfromtimestamp(exp) < datetime.utcnow():
-                raise HTTPException( status_code=401 , detail="Expired token" )
+def current_admin(request: Request) -> dict:
+    return authenticate(request, admin=True)
 
-            if not active or not admin:
-                raise HTTPException( status_code=401 , detail="Inactive user or not admin" )
 
-            request.state.email = email
-            request.state.firstname = firstname
-            request.state.lastname = lastname
-            request.state.admin = admin
-            request.state.id = id
+def _require(admin: bool):
+    def decorator(func):
+        @wraps(func)
+        async def wrapper( *args, **kwargs ):
+            request = kwargs.get('request')
+            if not request:
+                raise HTTPException( status_code=400, detail="Request object not found"  )
 
+            authenticate(request, admin=admin)
+            return await func( *args, **kwargs )
+        return wrapper
+    return decorator
 
-        except PyJWTError:
-            raise HTTPException( status_code=401, detail="Invalid token or expired token"  )
 
-        return await func( *args, **kwargs )
-    return wrapper
+# Decoradores para endpoints que reciben `request: Request`
+validateuser = _require(admin=False)
+validateadmin = _require(admin=True)
 
 
 # Funciones para FastAPI Dependency Injection
 def validate_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     """Validar token JWT para usuarios autenticados - Para usar con Depends()"""
-    token = credentials.credentials
-    
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-        
-        email = payload.get("email")
-        firstname = payload.get("firstname")
-        lastname = payload.get("lastname")
-        active = payload.get("active")
-        admin = payload.get("admin", False)
-        exp = payload.get("exp")
-        user_id = payload.get("id")
-        
-        if email is None:
-            raise HTTPException(status_code=401, detail="Token Invalid")
-        
-        if datetime.utcfromtimestamp(exp) < datetime.utcnow():
-            raise HTTPException(status_code=401, detail="Expired token")
-        
-        if not active:
-            raise HTTPException(status_code=401, detail="Inactive user")
-        
-        return {
-            "id": user_id,
-            "email": email,
-            "firstname": firstname,
-            "lastname": lastname,
-            "active": active,
-            "role": "admin" if admin else "user"
-        }
-        
-    except PyJWTError:
-        raise HTTPException(status_code=401, detail="Invalid token or expired token")
+    return verify_token(credentials.credentials)
 
 
 def validate_admin(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     """Validar token JWT para administradores - Para usar con Depends()"""
-    token = credentials.credentials
-    
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-        
-        email = payload.get("email")
-        firstname = payload.get("firstname")
-        lastname = payload.get("lastname")
-        active = payload.get("active")
-        admin = payload.get("admin", False)
-        exp = payload.get("exp")
-        user_id = payload.get("id")
-        
-        if email is None:
-            raise HTTPException(status_code=401, detail="Token Invalid")
-        
-        if datetime.utcfromtimestamp(exp) < datetime.utcnow():
-            raise HTTPException(status_code=401, detail="Expired token")
-        
-        if not active or not admin:
-            raise HTTPException(status_code=401, detail="Inactive user or not admin")
-        
-        return {
-            "id": user_id,
-            "email": email,
-            "firstname": firstname,
-            "lastname": lastname,
-            "active": active,
-            "role": "admin"
-        }
-        
-    except PyJWTError:
-        raise HTTPException(status_code=401, detail="Invalid token or expired token")
\ No newline at end of file
+    claims = verify_token(credentials.credentials)
+    if not claims["admin"]:
+        raise HTTPException(status_code=401, detail="Inactive user or not admin")
+    return claims
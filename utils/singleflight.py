@@ -0,0 +1,83 @@
+"""Coalescencia de lecturas idénticas concurrentes ("single-flight").
+
+Cuando muchas peticiones piden a la vez la misma clave que no está en caché
+(p. ej. un lanzamiento de camisetas), solo la primera va a Mongo; las demás
+esperan esa misma llamada y reciben su resultado o su excepción.
+
+Cada llamada compartida tiene un tiempo máximo (``SINGLEFLIGHT_TIMEOUT_SECONDS``):
+si se supera, todas las que esperaban reciben ``TimeoutError`` y la clave queda
+libre para que la siguiente petición lo reintente. Los controladores incluyen la
+versión de ``utils.conditional.versions`` en la clave, así que una lectura que
+empieza después de una escritura nunca se une a una anterior a ella.
+"""
+import asyncio
+import os
+from typing import Awaitable, Callable, Hashable
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SINGLEFLIGHT_ENABLED = os.getenv("SINGLEFLIGHT_ENABLED", "true").lower() == "true"
+SINGLEFLIGHT_TIMEOUT_SECONDS = float(os.getenv("SINGLEFLIGHT_TIMEOUT_SECONDS", "5"))
+
+
+class SingleFlight:
+    """Comparte entre las llamadas concurrentes con la misma clave una sola ejecución"""
+
+    def __init__(self, timeout: float = SINGLEFLIGHT_TIMEOUT_SECONDS):
+        self.timeout = timeout
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable]):
+        """Resultado de ``fn()``; si ya hay una llamada en curso para ``key`` espera la suya"""
+        if not SINGLEFLIGHT_ENABLED:
+            return await fn()
+        task = self._calls.get(key)
+        if task is None:
+            self.calls += 1
+            task = self._calls[key] = asyncio.create_task(self._run(key, fn))
+        else:
+            self.coalesced += 1
+        # shield: si se cancela una petición (cliente desconectado) las demás siguen esperando
+        return await asyncio.shield(task)
+
+    async def _run(self, key: Hashable, fn: Callable[[], Awaitable]):
+        try:
+            return await asyncio.wait_for(fn(), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise TimeoutError(f"Read timed out after {self.timeout}s") from None
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self._calls.pop(key, None)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+        }
+
+
+_flights: dict[str, SingleFlight] = {}
+
+
+def get_flight(name: str) -> SingleFlight:
+    """Devuelve (creándolo si hace falta) el grupo de coalescencia con ese nombre"""
+    flight = _flights.get(name)
+    if flight is None:
+        flight = _flights[name] = SingleFlight()
+    return flight
+
+
+def singleflight_stats() -> dict:
+    return {name: flight.stats() for name, flight in _flights.items()}
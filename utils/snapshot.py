@@ -0,0 +1,233 @@
+"""Catálogo en memoria ya serializado para ``GET /shirts`` y ``GET /futbol_teams`` sin filtros.
+
+Con ``CATALOG_SNAPSHOT=true`` cada instancia guarda el JSON de cada documento,
+ordenado por ``_id``. Una página sin filtros ni proyección se arma uniendo esos
+bytes, sin consultar Mongo ni construir modelos. La primera página por defecto
+se guarda además comprimida (brotli y gzip) si ``CATALOG_SNAPSHOT_PRECOMPRESS``.
+
+El catálogo se actualiza a partir de ``versions.bump``, que llaman los
+controladores tras cada escritura y los change streams (``VERSIONS_CHANGE_STREAM``).
+Solo se vuelven a leer los documentos cambiados, en una tarea en segundo plano.
+Mientras no está al día con la versión de la colección, las peticiones siguen el
+camino normal de Mongo: nunca esperan a la reconstrucción ni reciben un cuerpo
+que no corresponda a su ETag.
+
+Requisito: con varios procesos o instancias, cada uno solo ve sus propias
+escrituras salvo con ``VERSIONS_CHANGE_STREAM=true``. main.py no activa el
+catálogo con ``WEB_CONCURRENCY`` > 1 sin change streams, y la recarga completa
+cada ``CATALOG_SNAPSHOT_RELOAD_SECONDS`` acota lo desfasado que puede quedar con
+varias instancias de un solo proceso.
+"""
+import asyncio
+import gzip
+import logging
+import os
+from bisect import bisect_left, bisect_right, insort
+from typing import Callable, Optional
+
+from bson import ObjectId
+from dotenv import load_dotenv
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from utils.compression import COMPRESSION_GZIP_LEVEL, COMPRESSION_MIN_SIZE, brotli, negotiate
+from utils.conditional import versions
+from utils.mongodb import get_collection
+from utils.pagination import PAGE_SIZE_DEFAULT, decode_cursor, encode_cursor
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+CATALOG_SNAPSHOT = os.getenv("CATALOG_SNAPSHOT", "false").lower() == "true"
+CATALOG_SNAPSHOT_PRECOMPRESS = os.getenv("CATALOG_SNAPSHOT_PRECOMPRESS", "true").lower() == "true"
+# Con más documentos pendientes que estos se recarga la colección entera
+CATALOG_SNAPSHOT_FULL_REBUILD = int(os.getenv("CATALOG_SNAPSHOT_FULL_REBUILD", "1000"))
+# Páginas ya unidas que se recuerdan hasta el siguiente cambio
+CATALOG_SNAPSHOT_PAGES = int(os.getenv("CATALOG_SNAPSHOT_PAGES", "32"))
+# Calidad alta: se comprime una vez por cambio, no una por petición
+CATALOG_SNAPSHOT_BROTLI_QUALITY = int(os.getenv("CATALOG_SNAPSHOT_BROTLI_QUALITY", "9"))
+# Recarga completa periódica: recoge las escrituras de otras instancias (0 la desactiva)
+CATALOG_SNAPSHOT_RELOAD_SECONDS = float(os.getenv("CATALOG_SNAPSHOT_RELOAD_SECONDS", "300"))
+
+_LOAD_BATCH = 500
+
+
+class CatalogSnapshot:
+    """JSON de cada documento de una colección, ordenado por _id, listo para servir por páginas"""
+
+    def __init__(self, collection: str, hydrate: Callable[[dict], BaseModel]):
+        self.collection = collection
+        self._hydrate = hydrate
+        self.enabled = False
+        self.version: Optional[int] = None     # versions.collection() con la que coincide el contenido
+        self._ids: list[str] = []               # hex de los _id; mismo orden que los ObjectId
+        self._items: dict[str, bytes] = {}
+        self._pages: dict[tuple, tuple] = {}    # (after, limit) -> (cuerpo, cursor, {codificación: cuerpo})
+        self._pending: set[str] = set()
+        self._reload = False
+        self._task: Optional[asyncio.Task] = None
+        self._reload_task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.fallbacks = 0
+        self.rebuilds = 0
+        self.full_rebuilds = 0
+
+    async def load(self):
+        """Carga la colección entera y empieza a seguir sus cambios"""
+        self.enabled = True
+        # Antes de leer: lo que se escriba durante la carga queda pendiente para la siguiente vuelta
+        versions.subscribe(self._on_change)
+        self._reload = True
+        self._task = asyncio.create_task(self._rebuild_loop())
+        if CATALOG_SNAPSHOT_RELOAD_SECONDS > 0:
+            self._reload_task = asyncio.create_task(self._reload_loop())
+        await self._task
+
+    async def stop(self):
+        self.enabled = False
+        tasks = [task for task in (self._task, self._reload_task) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = self._reload_task = None
+
+    def _encode(self, doc: dict) -> bytes:
+        # El JSON de Pydantic, igual que el de las respuestas con response_model
+        return self._hydrate(doc).model_dump_json().encode()
+
+    def _on_change(self, collection: str, doc_ids: tuple):
+        if not self.enabled or collection != self.collection:
+            return
+        if doc_ids:
+            self._pending.update(doc_ids)
+        else:
+            self._reload = True
+        self._schedule()
+
+    def _schedule(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._rebuild_loop())
+
+    async def _reload_loop(self):
+        # Las escrituras de otras instancias no llegan por versions.bump
+        while True:
+            await asyncio.sleep(CATALOG_SNAPSHOT_RELOAD_SECONDS)
+            self._reload = True
+            self._schedule()
+
+    async def _rebuild_loop(self):
+        # Las escrituras que llegan durante una vuelta se aplican en la siguiente
+        while self._pending or self._reload:
+            try:
+                if self._reload or len(self._pending) > CATALOG_SNAPSHOT_FULL_REBUILD:
+                    self._reload = False
+                    self._pending.clear()
+                    await self._load_all()
+                else:
+                    await self._apply_pending()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Las peticiones van a Mongo hasta el siguiente cambio, que lo recarga entero
+                logger.warning("Catalog snapshot %s not rebuilt: %s", self.collection, e)
+                self._reload = True
+                return
+
+    async def _load_all(self):
+        # La versión se toma antes de leer: lo escrito después queda pendiente para otra vuelta
+        target = versions.collection(self.collection)
+        ids, items = [], {}
+        cursor = get_collection(self.collection).find({}).sort("_id", 1)
+        for index, doc in enumerate(await cursor.to_list()):
+            doc_id = str(doc["_id"])
+            ids.append(doc_id)
+            items[doc_id] = self._encode(doc)
+            if index % _LOAD_BATCH == _LOAD_BATCH - 1:
+                await asyncio.sleep(0)  # Cede el bucle: las peticiones no esperan a la carga
+        self._ids, self._items = ids, items
+        self.full_rebuilds += 1
+        await self._publish(target)
+        logger.info("Catalog snapshot %s loaded with %s documents", self.collection, len(ids))
+
+    async def _apply_pending(self):
+        target = versions.collection(self.collection)
+        changed, self._pending = self._pending, set()
+        object_ids = [ObjectId(doc_id) for doc_id in changed if ObjectId.is_valid(doc_id)]
+        docs = await get_collection(self.collection).find({"_id": {"$in": object_ids}}).to_list()
+        encoded = {str(doc["_id"]): self._encode(doc) for doc in docs}
+        # Sin await desde aquí: los lectores ven el catálogo antes o después del cambio, nunca a medias
+        for doc_id in changed:
+            if doc_id in encoded:
+                if doc_id not in self._items:
+                    insort(self._ids, doc_id)
+                self._items[doc_id] = encoded[doc_id]
+            elif self._items.pop(doc_id, None) is not None:
+                del self._ids[bisect_left(self._ids, doc_id)]
+        self.rebuilds += 1
+        await self._publish(target)
+
+    async def _publish(self, target: int):
+        self._pages = {}
+        self.version = target
+        if CATALOG_SNAPSHOT_PRECOMPRESS:
+            body, next_cursor = self._join(None, PAGE_SIZE_DEFAULT)
+            encoded = await asyncio.to_thread(_precompress, body)
+            if self.version == target:
+                self._pages[(None, PAGE_SIZE_DEFAULT)] = (body, next_cursor, encoded)
+
+    def _join(self, after: Optional[str], limit: int) -> tuple[bytes, Optional[str]]:
+        start = bisect_right(self._ids, str(decode_cursor(after))) if after else 0
+        page = self._ids[start:start + limit]
+        next_cursor = encode_cursor(ObjectId(page[-1])) if page and start + limit < len(self._ids) else None
+        return b"[" + b",".join(self._items[doc_id] for doc_id in page) + b"]", next_cursor
+
+    def response(self, request: Request, after: Optional[str], limit: int, headers: dict) -> Optional[Response]:
+        """Página servida desde memoria; None si no está al día (la ruta sigue por Mongo)"""
+        if not self.enabled:
+            return None
+        if self.version != versions.collection(self.collection):
+            self.fallbacks += 1
+            return None
+        key = (after, limit)
+        entry = self._pages.get(key)
+        if entry is None:
+            entry = (*self._join(after, limit), {})
+            self._pages[key] = entry
+            if len(self._pages) > CATALOG_SNAPSHOT_PAGES:
+                self._pages.pop(next(iter(self._pages)))
+        body, next_cursor, encoded = entry
+        self.hits += 1
+
+        headers = dict(headers)
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        coding = negotiate(request.headers.get("accept-encoding", "")) if encoded else None
+        if coding in encoded:
+            # CompressionMiddleware deja pasar las respuestas que ya traen Content-Encoding
+            body = encoded[coding]
+            headers["Content-Encoding"] = coding
+            headers["Vary"] = "Accept-Encoding"
+            # Igual que las comprimidas por el middleware: el ETag pasa a débil
+            headers["ETag"] = "W/" + headers["ETag"].removeprefix("W/")
+        return Response(body, media_type="application/json", headers=headers)
+
+    def stats(self) -> dict:
+        return {
+            "documents": len(self._ids),
+            "bytes": sum(len(item) for item in self._items.values()) if self.enabled else 0,
+            "current": self.enabled and self.version == versions.collection(self.collection),
+            "hits": self.hits,
+            "fallbacks": self.fallbacks,
+            "rebuilds": self.rebuilds,
+            "full_rebuilds": self.full_rebuilds,
+        }
+
+
+def _precompress(body: bytes) -> dict[str, bytes]:
+    if len(body) < COMPRESSION_MIN_SIZE:
+        return {}
+    encoded = {"gzip": gzip.compress(body, COMPRESSION_GZIP_LEVEL)}
+    if brotli is not None:
+        encoded["br"] = brotli.compress(body, quality=CATALOG_SNAPSHOT_BROTLI_QUALITY)
+    return encoded
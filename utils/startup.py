@@ -0,0 +1,85 @@
+"""Tiempos de arranque en frío: importación, fases del lifespan y primera respuesta.
+
+``main.py`` importa este módulo antes que nada, así que ``IMPORT_STARTED`` marca
+el inicio de la carga de la app. ``cold_start_seconds`` va desde ahí hasta la
+primera respuesta correcta (< 500), que es lo que nota el primer usuario tras un
+despliegue o un escalado. Todo se publica en ``/metrics`` y se registra en el log::
+
+    app_startup_phase_seconds{phase="mongo"} 0.41
+    app_cold_start_seconds 1.87
+"""
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+
+# Antes de importar nada de la app (utils.metrics ya carga pymongo)
+IMPORT_STARTED = time.perf_counter()
+
+from utils.metrics import describe, register_collector  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    def __init__(self, started: float = IMPORT_STARTED):
+        self.started = started
+        self.phases: dict[str, float] = {}
+        self.ready_seconds: Optional[float] = None
+        self.cold_start_seconds: Optional[float] = None
+
+    @asynccontextmanager
+    async def phase(self, name: str):
+        """Mide una fase del arranque (también si falla)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - start
+
+    def ready(self):
+        """Fin del lifespan: a partir de aquí uvicorn acepta peticiones"""
+        self.ready_seconds = time.perf_counter() - self.started
+        phases = {name: round(seconds, 3) for name, seconds in self.phases.items()}
+        logger.info("Startup finished in %.3fs", self.ready_seconds, extra={"phases": phases})
+
+    def first_response(self):
+        self.cold_start_seconds = time.perf_counter() - self.started
+        logger.info("Cold start: first successful response %.3fs after import", self.cold_start_seconds)
+
+    def samples(self):
+        samples = [("app_startup_phase_seconds", {"phase": name}, round(seconds, 6))
+                   for name, seconds in self.phases.items()]
+        if self.ready_seconds is not None:
+            samples.append(("app_startup_seconds", {}, round(self.ready_seconds, 6)))
+        if self.cold_start_seconds is not None:
+            samples.append(("app_cold_start_seconds", {}, round(self.cold_start_seconds, 6)))
+        return samples
+
+
+startup_timer = StartupTimer()
+register_collector(startup_timer.samples)
+describe("app_startup_phase_seconds", "Duración de cada fase del arranque")
+describe("app_startup_seconds", "Desde la importación hasta el fin del lifespan")
+describe("app_cold_start_seconds", "Desde la importación hasta la primera respuesta correcta")
+
+
+class FirstResponseMiddleware:
+    """Middleware ASGI que anota la primera respuesta correcta y después solo deja pasar"""
+
+    def __init__(self, app, timer: StartupTimer = startup_timer):
+        self.app = app
+        self.timer = timer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.timer.cold_start_seconds is not None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if (message["type"] == "http.response.start" and message["status"] < 500
+                    and self.timer.cold_start_seconds is None):
+                self.timer.first_response()
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import os
+
+from bson import ObjectId
+from dotenv import load_dotenv
+
+from utils.indexes import register_query
+from utils.mongodb import get_collection
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# 0 desactiva la resincronización periódica
+TEAM_INDEX_RESYNC_SECONDS = float(os.getenv("TEAM_INDEX_RESYNC_SECONDS", "300"))
+# Los change streams requieren un replica set (Atlas lo es; un mongod suelto no)
+TEAM_INDEX_CHANGE_STREAM = os.getenv("TEAM_INDEX_CHANGE_STREAM", "false").lower() == "true"
+
+register_query("team_index.existing", "futbol_teams", {"_id": {"$in": [ObjectId()]}})
+
+
+class TeamIndex:
+    """Conjunto en memoria con los _id de los equipos existentes.
+
+    Evita un find_one a futbol_teams en cada escritura de camisetas; si un id no
+    está en el índice se consulta Mongo antes de darlo por inexistente.
+    """
+
+    def __init__(self):
+        self._ids: set[str] = set()
+        self._tasks: list[asyncio.Task] = []
+        self.hits = 0
+        self.fallbacks = 0
+
+    async def load(self):
+        """Carga (o recarga) todos los ids desde Mongo"""
+        coll = get_collection("futbol_teams")
+        docs = await coll.find({}, {"_id": 1}).to_list()
+        self._ids = {str(doc["_id"]) for doc in docs}
+        logger.info("Team index loaded with %s teams", len(self._ids))
+
+    def add(self, team_id: str):
+        self._ids.add(team_id)
+
+    def discard(self, team_id: str):
+        self._ids.discard(team_id)
+
+    async def exists(self, team_id: str) -> bool:
+        if team_id in self._ids:
+            self.hits += 1
+            return True
+        if not ObjectId.is_valid(team_id):
+            return False
+
+        self.fallbacks += 1
+        found = await get_collection("futbol_teams").find_one({"_id": ObjectId(team_id)}, {"_id": 1})
+        if found:
+            self._ids.add(team_id)
+        return found is not None
+
+    async def existing(self, team_ids) -> set[str]:
+        """Subconjunto de ``team_ids`` que existe; los que falten se resuelven con un solo $in"""
+        found = {team_id for team_id in team_ids if team_id in self._ids}
+        self.hits += len(found)
+        missing = [ObjectId(t) for t in team_ids if t not in found and ObjectId.is_valid(t)]
+        if missing:
+            self.fallbacks += 1
+            docs = await get_collection("futbol_teams").find({"_id": {"$in": missing}}, {"_id": 1}).to_list()
+            for doc in docs:
+                self._ids.add(str(doc["_id"]))
+                found.add(str(doc["_id"]))
+        return found
+
+    def start_background_sync(self):
+        if TEAM_INDEX_RESYNC_SECONDS > 0:
+            self._tasks.append(asyncio.create_task(self._resync_loop()))
+        if TEAM_INDEX_CHANGE_STREAM:
+            self._tasks.append(asyncio.create_task(self._watch_changes()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _resync_loop(self):
+        while True:
+            await asyncio.sleep(TEAM_INDEX_RESYNC_SECONDS)
+            try:
+                await self.load()
+            except Exception as e:
+                logger.warning("Team index resync failed: %s", e)
+
+    async def _watch_changes(self):
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "delete"]}}}]
+        while True:
+            try:
+                async with await get_collection("futbol_teams").watch(pipeline) as stream:
+                    # Recarga tras (re)conectar para no perder cambios ocurridos sin stream
+                    await self.load()
+                    async for change in stream:
+                        team_id = str(change["documentKey"]["_id"])
+                        if change["operationType"] == "insert":
+                            self.add(team_id)
+                        else:
+                            self.discard(team_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Team index change stream interrupted: %s", e)
+                await asyncio.sleep(5)
+
+    def stats(self) -> dict:
+        return {"size": len(self._ids), "hits": self.hits, "fallbacks": self.fallbacks}
+
+
+team_index = TeamIndex()